@@ -0,0 +1,101 @@
+"""
+Benchmark: stdlib JSON vs orjson for a 10k-row recommendations payload.
+
+Compares FastAPI's default path (jsonable_encoder + JSONResponse, with
+UUIDs pre-converted via str()) against returning ORJSONResponse directly
+with native UUID/date/Decimal values.
+
+Usage: python benchmarks/bench_json_responses.py [--rows 10000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "fastapi_app"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import ORJSONResponse
+
+
+def build_payload(rows: int, stringify: bool) -> dict:
+    """Build a recommendations-shaped payload with `rows` services."""
+    conv = str if stringify else (lambda v: v)
+    categories = []
+    per_category = 50
+    for c in range(max(1, rows // per_category)):
+        services = []
+        for s in range(per_category):
+            risk_score = float((c * s) % 25)
+            services.append({
+                "service_subclass_id": f"SVC_{c}_{s}",
+                "service_subclass_label": f"Service {c}.{s}",
+                "service_subclass_description": "In-home assistance with activities of daily living",
+                "linked_hazards": [{
+                    "hazard_code": f"HZ_{s % 40}",
+                    "hazard_type": "adl",
+                    "hazard_item": "transfers",
+                    "hazard_diagnosis_code": "",
+                    "risk_id": conv(uuid.uuid4()),
+                    "assessed_on": conv(date(2025, 1, 1 + s % 28)),
+                    "updated_at": conv(datetime(2025, 1, 1, 12, s % 60)),
+                    "estimated_cost": float(Decimal("42.50")) if stringify else Decimal("42.50"),
+                    "risk_score": risk_score,
+                    "severity": 4,
+                    "likelihood": 5,
+                    "notes": "",
+                }],
+                "priority": "Medium",
+                "max_risk_score": risk_score,
+            })
+        categories.append({
+            "service_class_id": f"CLS_{c}",
+            "service_class_label": f"Class {c}",
+            "service_class_description": "",
+            "services": services,
+            "total_risk_score": sum(s["max_risk_score"] for s in services),
+            "hazard_count": len(services),
+        })
+    return {
+        "patient_id": str(uuid.uuid4()),
+        "service_categories": categories,
+        "total_services": rows,
+        "total_service_categories": len(categories),
+    }
+
+
+def time_it(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    legacy_payload = build_payload(args.rows, stringify=True)
+    native_payload = build_payload(args.rows, stringify=False)
+
+    legacy = time_it(lambda: JSONResponse(jsonable_encoder(legacy_payload)).body, args.repeat)
+    native = time_it(lambda: ORJSONResponse(native_payload).body, args.repeat)
+    size = len(ORJSONResponse(native_payload).body)
+
+    print(f"payload: {args.rows} services, {size / 1024:.0f} KiB")
+    print(f"jsonable_encoder + JSONResponse: {legacy * 1000:8.2f} ms  ({args.rows / legacy:,.0f} rows/s)")
+    print(f"ORJSONResponse (native types):   {native * 1000:8.2f} ms  ({args.rows / native:,.0f} rows/s)")
+    print(f"speedup: {legacy / native:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
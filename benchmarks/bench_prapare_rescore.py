@@ -0,0 +1,59 @@
+"""
+Benchmark: batch (NumPy) vs scalar PRAPARE domain scoring and Z-codes, with
+a parity check of the batch results against the /prapare/submit functions.
+
+The scalar rate is measured on a sample and extrapolated; the batch rate
+covers the full cohort. The target is rescoring 1M stored assessments in
+minutes, so the compute side should be well under that.
+
+Usage: python benchmarks/bench_prapare_rescore.py [--assessments 1000000] [--scalar-sample 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "fastapi_app"))
+
+import numpy as np
+
+from models.prapare_schemas import PRAPARESubmission
+from prapare_rescore import check_parity, random_assessments, rescore
+from prapare_rules import active_rules
+from routers.prapare import calculate_prapare_domain_scores, generate_prapare_z_codes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assessments", type=int, default=1_000_000)
+    parser.add_argument("--scalar-sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rules = active_rules()
+    cols = random_assessments(rules.fields, args.assessments)
+
+    start = time.perf_counter()
+    rescore(rules, cols)
+    batch = time.perf_counter() - start
+
+    sample = [
+        PRAPARESubmission.model_construct(**{
+            c: (None if np.isnan(cols[c][i]) else int(cols[c][i])) for c in rules.fields
+        })
+        for i in range(min(args.scalar_sample, args.assessments))
+    ]
+    start = time.perf_counter()
+    for submission in sample:
+        generate_prapare_z_codes(submission, calculate_prapare_domain_scores(submission))
+    scalar = (time.perf_counter() - start) * args.assessments / len(sample)
+
+    mismatches = check_parity(rules, {c: v[:len(sample)] for c, v in cols.items()})
+
+    print(f"{args.assessments} assessments")
+    print(f"  batch:  {batch:8.2f}s  ({args.assessments / batch:,.0f}/s)")
+    print(f"  scalar: {scalar:8.2f}s  ({args.assessments / scalar:,.0f}/s, {scalar / args.assessments * 1e6:.1f}us each, extrapolated from {len(sample)})")
+    print(f"  parity: {mismatches} mismatches in {len(sample)} assessments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: per-request serialization cost of /prapare/by_patient and
+/prapare/summary.
+
+"validated" is the previous path: build the dict field by field, construct
+PRAPAREQuestionnaireResponse with full validation, then let FastAPI dump it
+to JSON. "shared" is models/prapare_serializer.py: one pass over the selected
+columns, no validation, orjson straight from the dict.
+
+Usage: python benchmarks/bench_prapare_serializer.py [--requests 20000]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "fastapi_app"))
+
+from models.prapare_schemas import PRAPAREQuestionnaireResponse
+from models.prapare_serializer import BOOL_FIELDS, READ_COLUMNS, prapare_response_dict
+from responses import dumps
+
+
+def sample_row():
+    Row = namedtuple("Row", [c.name for c in READ_COLUMNS])
+    values = {c.name: None for c in READ_COLUMNS}
+    values.update({name: 0 for name in BOOL_FIELDS})
+    values.update(
+        prapare_id=uuid.uuid4(), patient_id=uuid.uuid4(), date_completed=datetime.date(2025, 6, 1),
+        created_at=datetime.datetime(2025, 6, 1, 9, 30), assessed_by="RN Field", notes="Lives alone",
+        hispanic=0, farm_work=0, military_service=1, primary_language=0, household_size=2,
+        housing_situation=2, housing_worry=1, education_level=1, employment_status=3,
+        primary_insurance=2, annual_income=1, unmet_food=1, transportation_barrier=1,
+        social_contact=1, stress_level=4, incarceration_history=0, feel_safe=2,
+        domestic_violence=0, food_worry=1, food_didnt_last=1, need_food_help=0,
+        raw_responses={"source": "tablet"}, z_codes=["Z59.1", "Z59.4", "Z59.3"],
+    )
+    return Row(**values)
+
+
+def validated(row) -> bytes:
+    data = prapare_response_dict(row)
+    data["prapare_id"] = str(data["prapare_id"])
+    data["patient_id"] = str(data["patient_id"])
+    model = PRAPAREQuestionnaireResponse(**data)
+    return model.model_dump_json().encode()
+
+
+def shared(row) -> bytes:
+    return dumps(prapare_response_dict(row))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    row = sample_row()
+    for name, fn in (("validated", validated), ("shared", shared)):
+        fn(row)
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            fn(row)
+        per_request = (time.perf_counter() - start) / args.requests
+        print(f"{name:10s} {per_request * 1e6:8.1f} us/request  ({len(fn(row))} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: JSON vs MessagePack wire size and encode/decode latency for the
+PRAPARE submission and the recommendations payload, plus estimated transfer
+time on a 3G link.
+
+Usage: python benchmarks/bench_wire_formats.py [--services 200] [--link-kbps 384]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import typing
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src", "fastapi_app"))
+
+import msgpack
+import orjson
+
+from bench_json_responses import build_payload
+from models.prapare_schemas import PRAPARESubmission
+from responses import dumps, packb
+
+
+def prapare_payload() -> dict:
+    """A fully populated PRAPARE submission, as a tablet would send it."""
+    payload = {"patient_id": str(uuid.uuid4()), "date_completed": "2025-06-01", "assessed_by": "RN Field"}
+    for name, field in PRAPARESubmission.model_fields.items():
+        if name in payload or name in ("raw_responses", "z_codes", "created_at"):
+            continue
+        if field.annotation is bool:
+            payload[name] = False
+        elif typing.get_origin(field.annotation) is typing.Literal:
+            payload[name] = typing.get_args(field.annotation)[1]
+        elif field.annotation is int:
+            payload[name] = 3
+    payload["notes"] = "Lives alone; daughter visits weekly."
+    return payload
+
+
+def time_it(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, payload, repeat: int, link_kbps: float):
+    encoders = {
+        "json (stdlib)": (lambda: json.dumps(payload, default=str).encode(), json.loads),
+        "json (orjson)": (lambda: dumps(payload), orjson.loads),
+        "msgpack": (lambda: packb(payload), lambda b: msgpack.unpackb(b, raw=False)),
+    }
+    print(f"\n{label}")
+    print(f"  {'format':<14}{'bytes':>10}{'gzip':>10}{'encode ms':>12}{'decode ms':>12}{'3G ms':>10}")
+    for name, (encode, decode) in encoders.items():
+        body = encode()
+        enc = time_it(encode, repeat)
+        dec = time_it(lambda: decode(body), repeat)
+        transfer_ms = len(body) * 8 / link_kbps
+        print(f"  {name:<14}{len(body):>10}{len(gzip.compress(body)):>10}"
+              f"{enc * 1000:>12.3f}{dec * 1000:>12.3f}{transfer_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=200, help="services in the recommendations payload")
+    parser.add_argument("--link-kbps", type=float, default=384.0, help="link speed used for the transfer estimate")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    report("PRAPARE submission", prapare_payload(), args.repeat, args.link_kbps)
+    report(f"Recommendations ({args.services} services)",
+           orjson.loads(dumps(build_payload(args.services, stringify=True))), args.repeat, args.link_kbps)
+
+
+if __name__ == "__main__":
+    main()
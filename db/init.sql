@@ -454,12 +454,18 @@ CREATE TABLE sx_code_hazard_map (
     PRIMARY KEY (sx_code)
 );
 
--- Diagnosis code to hazard
+-- Diagnosis code to hazard. A rule is an exact code, a prefix covering a
+-- code family (E11 -> E11.9, E11.65, ...) or an inclusive category range
+-- (dx_code..dx_code_end, e.g. E08..E13); the most specific match wins.
+-- Prefixes and ranges need not exist in dx_codes, so there is no FK.
 CREATE TABLE dx_code_hazard_map (
-    dx_code TEXT NOT NULL REFERENCES dx_codes(code),
+    dx_code TEXT NOT NULL,
+    match_type TEXT NOT NULL DEFAULT 'exact' CHECK (match_type IN ('exact', 'prefix', 'range')),
+    dx_code_end TEXT,
     hazard_subclass_id TEXT REFERENCES hazard_subclasses(subclass_id),
     hazard_class_id TEXT REFERENCES hazard_classes(class_id),
-    PRIMARY KEY (dx_code)
+    PRIMARY KEY (dx_code, match_type),
+    CHECK ((match_type = 'range') = (dx_code_end IS NOT NULL))
 );
 
 -- Medication code to hazard (optional, for high-risk meds)
@@ -562,3 +568,257 @@ CREATE TABLE recommendation_report (
     costs JSONB,
     content TEXT
 );
+
+-- 14. Keyset pagination indexes (match the ORDER BY of the list endpoints)
+CREATE INDEX idx_patients_name_keyset ON patients ((COALESCE(name, '')), patient_id);
+CREATE INDEX idx_contractors_name_keyset ON contractors (name, contractor_id);
+CREATE INDEX idx_services_category_keyset ON services ((COALESCE(service_category, '')), service_name, service_id);
+CREATE INDEX idx_community_resources_name_keyset ON community_resources (name, resource_id);
+
+-- 15. Per-patient lookup indexes (latest-row and snapshot queries)
+CREATE INDEX idx_patient_history_patient_created ON patient_history (patient_id, created_at DESC);
+CREATE INDEX idx_hazards_patient ON hazards (patient_id);
+CREATE INDEX idx_risks_patient ON risks (patient_id);
+CREATE INDEX idx_social_risks_patient ON social_risks (patient_id);
+-- One PRAPARE summary row per patient; /prapare/submit upserts on it
+CREATE UNIQUE INDEX uq_questionnaire_summary_prapare ON questionnaire_summary (patient_id) WHERE prapare_id IS NOT NULL;
+
+-- 16. Table versions (bumped once per writing statement; used to build ETags
+-- for reference-data endpoints)
+CREATE TABLE table_versions (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, version, updated_at)
+    VALUES (TG_TABLE_NAME, 1, NOW())
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = table_versions.version + 1,
+            updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'dx_codes', 'tx_codes', 'rx_codes', 'sx_codes',
+        'dx_code_hazard_map',
+        'contractors', 'services', 'costs',
+        'community_resources', 'sdoh_mitigation_subclasses', 'sdoh_mitigations'
+    ] LOOP
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+             FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()',
+            t || '_version_bump', t
+        );
+    END LOOP;
+END $$;
+
+-- 17. Sync change log (offline tablets pull deltas from here). One row per
+-- synced record holding its latest change; the writing transaction id is the
+-- row version used for conflict detection on push.
+CREATE SEQUENCE sync_change_seq;
+
+CREATE TABLE sync_changes (
+    table_name TEXT NOT NULL,
+    row_id UUID NOT NULL,
+    patient_id UUID,
+    op CHAR(1) NOT NULL CHECK (op IN ('U', 'D')),  -- U=insert/update, D=delete
+    txid BIGINT NOT NULL DEFAULT txid_current(),
+    change_seq BIGINT NOT NULL DEFAULT nextval('sync_change_seq'),
+    PRIMARY KEY (table_name, row_id)
+);
+CREATE INDEX idx_sync_changes_cursor ON sync_changes (txid, change_seq);
+CREATE INDEX idx_sync_changes_patient ON sync_changes (patient_id, txid, change_seq);
+
+-- TG_ARGV[0] = primary key column, TG_ARGV[1] = patient_id column
+CREATE OR REPLACE FUNCTION log_sync_change() RETURNS TRIGGER AS $$
+DECLARE
+    rec JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := to_jsonb(OLD);
+    ELSE
+        rec := to_jsonb(NEW);
+    END IF;
+    INSERT INTO sync_changes (table_name, row_id, patient_id, op)
+    VALUES (
+        TG_TABLE_NAME,
+        (rec ->> TG_ARGV[0])::uuid,
+        (rec ->> TG_ARGV[1])::uuid,
+        CASE WHEN TG_OP = 'DELETE' THEN 'D' ELSE 'U' END
+    )
+    ON CONFLICT (table_name, row_id) DO UPDATE
+        SET patient_id = EXCLUDED.patient_id,
+            op = EXCLUDED.op,
+            txid = EXCLUDED.txid,
+            change_seq = EXCLUDED.change_seq;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT[];
+BEGIN
+    FOREACH t SLICE 1 IN ARRAY ARRAY[
+        ['patients', 'patient_id'],
+        ['patient_history', 'history_id'],
+        ['adl_answers', 'adl_id'],
+        ['iadl_answers', 'iadl_id'],
+        ['prapare_answers', 'prapare_id'],
+        ['hazards', 'hazard_id'],
+        ['risks', 'risk_id'],
+        ['social_risks', 'social_risk_id'],
+        ['recommendation_settings', 'rec_id'],
+        -- Logged for incremental analytics exports; not sent to tablets
+        ['questionnaire_summary', 'summary_id']
+    ] LOOP
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I
+             FOR EACH ROW EXECUTE FUNCTION log_sync_change(%L, %L)',
+            t[1] || '_sync_log', t[1], t[2], 'patient_id'
+        );
+    END LOOP;
+END $$;
+
+-- 18. Bulk assessment import jobs (POST /import/{assessment_type})
+CREATE TABLE import_jobs (
+    job_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    assessment_type TEXT NOT NULL,      -- adl, iadl, prapare
+    format TEXT NOT NULL,               -- csv, ndjson
+    status TEXT NOT NULL DEFAULT 'queued', -- queued, running, merging, completed, failed
+    rows_read INTEGER DEFAULT 0,
+    rows_valid INTEGER DEFAULT 0,
+    rows_rejected INTEGER DEFAULT 0,
+    rows_unknown_patient INTEGER,
+    rows_merged INTEGER,
+    errors JSONB DEFAULT '[]',          -- first rejected rows: line, field, error
+    detail TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+-- 19. Code usage counters for /codes/* (how often each code appears across
+-- patient_history; maintained incrementally so top-N is an index read)
+CREATE TABLE code_usage (
+    code_type TEXT NOT NULL,            -- dx, tx, rx, sx
+    code TEXT NOT NULL,
+    usage_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (code_type, code)
+);
+CREATE INDEX idx_code_usage_top ON code_usage (code_type, usage_count DESC, code);
+
+CREATE OR REPLACE FUNCTION history_code_occurrences(h patient_history)
+RETURNS TABLE (code_type TEXT, code TEXT) AS $$
+    SELECT 'dx', unnest(h.dx_codes)
+    UNION ALL SELECT 'tx', unnest(h.tx_codes)
+    UNION ALL SELECT 'rx', unnest(h.rx_codes)
+    UNION ALL SELECT 'sx', unnest(h.sx_codes)
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION maintain_code_usage() RETURNS TRIGGER AS $$
+DECLARE
+    added patient_history[] := '{}';
+    removed patient_history[] := '{}';
+    deltas code_usage[];
+BEGIN
+    -- Statement-level: +1 per code occurrence in the new rows, -1 per
+    -- occurrence in the old rows, summed over the whole statement and applied
+    -- as one upsert in key order, so concurrent writers lock counters in the
+    -- same order. code_usage has no table_versions bump (the /codes/* ETag
+    -- hashes the top-N list itself), so writers only meet on the counters.
+    IF TG_OP <> 'DELETE' THEN
+        added := ARRAY(SELECT n FROM new_rows n);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        removed := ARRAY(SELECT o FROM old_rows o);
+    END IF;
+    deltas := ARRAY(
+        SELECT ROW(d.code_type, d.code, SUM(d.delta)::bigint)::code_usage
+        FROM (
+            SELECT c.code_type, c.code, 1 AS delta
+            FROM unnest(added) h, history_code_occurrences(h) c
+            UNION ALL
+            SELECT c.code_type, c.code, -1
+            FROM unnest(removed) h, history_code_occurrences(h) c
+        ) d
+        WHERE d.code IS NOT NULL
+        GROUP BY d.code_type, d.code
+        HAVING SUM(d.delta) <> 0
+    );
+    -- Updates that leave the codes alone change nothing
+    IF cardinality(deltas) > 0 THEN
+        INSERT INTO code_usage (code_type, code, usage_count)
+        SELECT code_type, code, usage_count FROM unnest(deltas)
+        ORDER BY code_type, code
+        ON CONFLICT (code_type, code) DO UPDATE
+            SET usage_count = code_usage.usage_count + EXCLUDED.usage_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reset_code_usage() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM code_usage;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event (and no UPDATE OF column list)
+CREATE TRIGGER patient_history_code_usage
+    AFTER INSERT ON patient_history
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_code_usage();
+CREATE TRIGGER patient_history_code_usage_update
+    AFTER UPDATE ON patient_history
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_code_usage();
+CREATE TRIGGER patient_history_code_usage_delete
+    AFTER DELETE ON patient_history
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_code_usage();
+CREATE TRIGGER patient_history_code_usage_truncate
+    AFTER TRUNCATE ON patient_history
+    FOR EACH STATEMENT EXECUTE FUNCTION reset_code_usage();
+
+-- Backfill from any history loaded before the trigger existed
+INSERT INTO code_usage (code_type, code, usage_count)
+SELECT code_type, code, COUNT(*)
+FROM (
+    SELECT 'dx' AS code_type, unnest(dx_codes) AS code FROM patient_history
+    UNION ALL SELECT 'tx', unnest(tx_codes) FROM patient_history
+    UNION ALL SELECT 'rx', unnest(rx_codes) FROM patient_history
+    UNION ALL SELECT 'sx', unnest(sx_codes) FROM patient_history
+) u
+WHERE code IS NOT NULL
+GROUP BY code_type, code
+ON CONFLICT (code_type, code) DO UPDATE SET usage_count = EXCLUDED.usage_count;
+
+-- 20. Analytics export watermarks (analytics_export.py). txid is the snapshot
+-- horizon of the last export; the next incremental export reads sync_changes
+-- from there.
+CREATE TABLE analytics_export_watermarks (
+    table_name TEXT PRIMARY KEY,
+    txid BIGINT NOT NULL,
+    rows_exported BIGINT NOT NULL DEFAULT 0,
+    mode TEXT NOT NULL CHECK (mode IN ('full', 'incremental')),
+    exported_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- 21. Seed checksums (db/seeds/copy_loader.py). One row per reference table:
+-- the hash of the rows last seeded into it, so an unchanged table is skipped.
+CREATE TABLE seed_checksums (
+    table_name TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    seeded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,134 @@
+"""
+Bulk loader for full code catalogs (ICD-10-CM, CPT, RxNorm, ...) into
+dx_codes / tx_codes / rx_codes / sx_codes.
+
+Rows are streamed into a temp table with COPY and merged with one
+INSERT ... ON CONFLICT (code) DO UPDATE, so reloading a newer release
+updates descriptions in place.
+
+Usage:
+    python catalog_loader.py dx icd10cm_codes_2025.txt --format icd10cm
+    python catalog_loader.py dx icd10cm_order_2025.txt --format icd10cm-order
+    python catalog_loader.py rx rxnorm_codes.tsv --format tsv
+    python catalog_loader.py tx cpt.csv --format csv --header
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.dirname(__file__))
+
+from seed_runner import DB_CONFIG
+
+CATALOG_TABLES = {
+    "dx": "dx_codes",
+    "tx": "tx_codes",
+    "rx": "rx_codes",
+    "sx": "sx_codes",
+}
+
+COPY_CHUNK_ROWS = 50000
+
+
+def _icd10cm_code(raw):
+    """CMS ICD-10-CM files list codes without the dot (E119 -> E11.9)."""
+    return raw if len(raw) <= 3 else f"{raw[:3]}.{raw[3:]}"
+
+
+def read_catalog(path, fmt, header=False):
+    """Yield (code, description) pairs from a catalog file."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "icd10cm":
+            # icd10cm_codes_*.txt: code, whitespace, description
+            for line in f:
+                parts = line.rstrip("\n").split(None, 1)
+                if len(parts) == 2:
+                    yield _icd10cm_code(parts[0].strip()), parts[1].strip()
+            return
+        if fmt == "icd10cm-order":
+            # icd10cm_order_*.txt, fixed width: order number (1-5), code (7-13),
+            # header flag (15, 1 = billable), short description (17-76), long
+            # description (78-). Only billable codes are loaded, the same set
+            # as the codes file.
+            for line in f:
+                line = line.rstrip("\r\n")
+                if len(line) > 77 and line[14] == "1":
+                    yield _icd10cm_code(line[6:13].strip()), line[77:].strip()
+            return
+        reader = csv.reader(f, delimiter="\t" if fmt == "tsv" else ",")
+        if header:
+            next(reader, None)
+        for row in reader:
+            if len(row) >= 2 and row[0].strip():
+                yield row[0].strip(), row[1].strip()
+
+
+def _copy_chunk(cur, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert("COPY catalog_stage (code, description) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def load_catalog(cur, code_type, rows):
+    """COPY (code, description) rows into the catalog table for code_type.
+
+    Returns (rows read, rows inserted or updated).
+    """
+    table = CATALOG_TABLES[code_type]
+    cur.execute("CREATE TEMP TABLE catalog_stage (code TEXT, description TEXT) ON COMMIT DROP")
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= COPY_CHUNK_ROWS:
+            _copy_chunk(cur, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        _copy_chunk(cur, chunk)
+        total += len(chunk)
+    # A release file can repeat a code; keep one row per code for ON CONFLICT.
+    cur.execute(f"""
+        INSERT INTO {table} (code, description)
+        SELECT DISTINCT ON (code) code, description
+        FROM catalog_stage
+        WHERE description <> ''
+        ORDER BY code
+        ON CONFLICT (code) DO UPDATE SET description = EXCLUDED.description
+        WHERE {table}.description IS DISTINCT FROM EXCLUDED.description
+    """)
+    return total, cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a code catalog with COPY")
+    parser.add_argument("code_type", choices=sorted(CATALOG_TABLES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "tsv", "icd10cm", "icd10cm-order"], default="csv")
+    parser.add_argument("--header", action="store_true", help="skip the first line (csv/tsv)")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        cur = conn.cursor()
+        started = time.perf_counter()
+        total, changed = load_catalog(cur, args.code_type, read_catalog(args.path, args.format, args.header))
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        print(f"✅ Loaded {total} rows into {CATALOG_TABLES[args.code_type]} ({changed} inserted/updated) in {elapsed:.1f}s")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error loading catalog: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
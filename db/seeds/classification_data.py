@@ -5,6 +5,14 @@ This includes hazard classes, service classes, and their mappings.
 import psycopg2
 import uuid
 
+from copy_loader import copy_upsert
+from seed_tasks import seed_task
+
+@seed_task(writes=(
+    "hazard_classes", "hazard_subclasses", "service_classes", "service_subclasses",
+    "social_hazards", "social_hazards_subclasses", "sdoh_mitigations", "sdoh_mitigation_subclasses",
+    "sdoh_mitigation_map",
+))
 def seed_classification_data(cur):
     """Seed hazard classes, service classes, and mapping tables"""
     
@@ -23,11 +31,7 @@ def seed_classification_data(cur):
         ("MED", "Medical Complexity", "Multiple or complex medical conditions"),        
     ]
     
-    for hc in hazard_classes:
-        cur.execute("""
-            INSERT INTO hazard_classes (class_id, label, description)
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, hc)
+    copy_upsert(cur, "hazard_classes", ("class_id", "label", "description"), hazard_classes)
     print(f"Seeded {len(hazard_classes)} hazard classes")
 
     # Hazard subclasses (specific items)
@@ -129,11 +133,7 @@ def seed_classification_data(cur):
         ("IADL_FIN_DEP", "IADL_NONVEHICLE", "Financial Dependency", "Unable to manage finances")
     ]
     
-    for hs in hazard_subclasses:
-        cur.execute("""
-            INSERT INTO hazard_subclasses (subclass_id, parent_class_id, label, description)
-            VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (hs[0], hs[1], hs[2], hs[3]))
+    copy_upsert(cur, "hazard_subclasses", ("subclass_id", "parent_class_id", "label", "description"), hazard_subclasses)
     print(f"Seeded {len(hazard_subclasses)} hazard subclasses")
 
     # Service classes (parent categories) - from seed_codes.py
@@ -151,11 +151,7 @@ def seed_classification_data(cur):
         ("SVC_SOC_SUP", "Social/Environmental Support", "Support for social/environmental risks")
     ]
     
-    for sc in service_classes:
-        cur.execute("""
-            INSERT INTO service_classes (class_id, label, description)
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, sc)
+    copy_upsert(cur, "service_classes", ("class_id", "label", "description"), service_classes)
     print(f"Seeded {len(service_classes)} service classes")
 
     # Service subclasses (specific services) - from seed_codes.py
@@ -236,11 +232,7 @@ def seed_classification_data(cur):
         ("SVC_ISOL", "SVC_SOC_SUP", "Social support", "Support for isolation/loneliness")
     ]
     
-    for ss in service_subclasses:
-        cur.execute("""
-            INSERT INTO service_subclasses (subclass_id, parent_class_id, label, description)
-            VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (ss[0], ss[1], ss[2], ss[3]))
+    copy_upsert(cur, "service_subclasses", ("subclass_id", "parent_class_id", "label", "description"), service_subclasses)
     print(f"Seeded {len(service_subclasses)} service subclasses")
     
     # --- Social Hazard Classes (SDOH-related hazards) ---
@@ -269,11 +261,7 @@ def seed_classification_data(cur):
         ('LOW_NEED_UNMET_NEEDS', 'Low Need Unmet Needs', 'Unmet needs that require ongoing assistance')
     ]
     
-    for class_id, label, description in social_hazard_classes:
-        cur.execute("""
-            INSERT INTO social_hazards (class_id, label, description) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (class_id, label, description))
+    copy_upsert(cur, "social_hazards", ("class_id", "label", "description"), social_hazard_classes)
     print(f"Seeded {len(social_hazard_classes)} social hazard classes")
     
     # --- Social Hazard Subclasses ---
@@ -334,11 +322,7 @@ def seed_classification_data(cur):
         ('OTHER', 'Other Needs', 'LOW_NEED_UNMET_NEEDS', 'Lack access to other resources')
     ]
     
-    for subclass_id, label, parent_class_id, description in social_hazard_subclasses:
-        cur.execute("""
-            INSERT INTO social_hazards_subclasses (subclass_id, label, parent_class_id, description) 
-            VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (subclass_id, label, parent_class_id, description))
+    copy_upsert(cur, "social_hazards_subclasses", ("subclass_id", "label", "parent_class_id", "description"), social_hazard_subclasses)
     print(f"Seeded {len(social_hazard_subclasses)} social hazard subclasses")
     
     # --- SDOH Mitigation Classes (Resource/Service Classes for Social Risks) ---
@@ -354,11 +338,7 @@ def seed_classification_data(cur):
         ('safety', 'Safety Services', 'Safety and crisis intervention services')
     ]
     
-    for class_id, label, description in sdoh_mitigation_classes:
-        cur.execute("""
-            INSERT INTO sdoh_mitigations (class_id, label, description) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (class_id, label, description))
+    copy_upsert(cur, "sdoh_mitigations", ("class_id", "label", "description"), sdoh_mitigation_classes)
     print(f"Seeded {len(sdoh_mitigation_classes)} SDOH mitigation classes")
     
     # --- SDOH Mitigation Subclasses ---
@@ -409,11 +389,7 @@ def seed_classification_data(cur):
         ('emergency_services', 'Safety Services', 'safety', 'Crisis intervention and safety services'),
     ]
     
-    for subclass_id, label, parent_class_id, description in sdoh_mitigation_subclasses:
-        cur.execute("""
-            INSERT INTO sdoh_mitigation_subclasses (subclass_id, label, parent_class_id, description) 
-            VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (subclass_id, label, parent_class_id, description))
+    copy_upsert(cur, "sdoh_mitigation_subclasses", ("subclass_id", "label", "parent_class_id", "description"), sdoh_mitigation_subclasses)
     print(f"Seeded {len(sdoh_mitigation_subclasses)} SDOH mitigation subclasses")
     
     # --- SDOH Mitigation Mappings (Social Hazard → Service Mappings) ---
@@ -586,14 +562,17 @@ def seed_classification_data(cur):
         ('UTILITIES', 'benefits_advocacy', 'legal')
     ]
     
-    for social_hazard_subclass_id, mitigation_subclass_id, mitigation_class_id in sdoh_mitigation_mappings:
-        cur.execute("""
-            INSERT INTO sdoh_mitigation_map (social_hazard_subclass_id, mitigation_subclass_id, mitigation_class_id) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (social_hazard_subclass_id, mitigation_subclass_id, mitigation_class_id))
+    copy_upsert(cur, "sdoh_mitigation_map", ("social_hazard_subclass_id", "mitigation_subclass_id", "mitigation_class_id"), sdoh_mitigation_mappings)
     print(f"Seeded {len(sdoh_mitigation_mappings)} SDOH mitigation mappings")
  
 
+@seed_task(
+    writes=(
+        "adl_item_hazard_map", "iadl_item_hazard_map", "sx_code_hazard_map",
+        "dx_code_hazard_map", "rx_code_hazard_map", "prapare_item_hazard_map",
+    ),
+    reads=("hazard_classes", "hazard_subclasses", "social_hazards", "social_hazards_subclasses", "sx_codes", "rx_codes"),
+)
 def seed_assessment_hazard_mappings(cur):
     """Seed mappings between assessment scores/codes and hazards"""
     
@@ -619,11 +598,7 @@ def seed_assessment_hazard_mappings(cur):
         ("bathing", 0, 0, "ADL_BATH_DEP", "ADL_LIGHT"),
     ]
     
-    for adl_item, score_min, score_max, hazard_subclass_id, hazard_class_id in adl_item_hazard_map:
-        cur.execute("""
-            INSERT INTO adl_item_hazard_map (adl_item, score_min, score_max, hazard_subclass_id, hazard_class_id) 
-            VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (adl_item, score_min, score_max, hazard_subclass_id, hazard_class_id))
+    copy_upsert(cur, "adl_item_hazard_map", ("adl_item", "score_min", "score_max", "hazard_subclass_id", "hazard_class_id"), adl_item_hazard_map)
     print(f"Seeded {len(adl_item_hazard_map)} ADL item hazard mappings")
     
     # --- IADL Item to Hazard Mapping (Lawton IADL) ---
@@ -638,11 +613,7 @@ def seed_assessment_hazard_mappings(cur):
         ("finances", 0, 0, "IADL_FIN_DEP", "IADL_NONVEHICLE"),
     ]
     
-    for iadl_item, score_min, score_max, hazard_subclass_id, hazard_class_id in iadl_item_hazard_map:
-        cur.execute("""
-            INSERT INTO iadl_item_hazard_map (iadl_item, score_min, score_max, hazard_subclass_id, hazard_class_id) 
-            VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (iadl_item, score_min, score_max, hazard_subclass_id, hazard_class_id))
+    copy_upsert(cur, "iadl_item_hazard_map", ("iadl_item", "score_min", "score_max", "hazard_subclass_id", "hazard_class_id"), iadl_item_hazard_map)
     print(f"Seeded {len(iadl_item_hazard_map)} IADL item hazard mappings")
     
     # --- Symptom Code to Hazard Mapping ---
@@ -654,29 +625,30 @@ def seed_assessment_hazard_mappings(cur):
         ("R41.3", "COG_MEM", "COG"),               # Memory loss (child + parent)
     ]
     
-    for sx_code, hazard_subclass_id, hazard_class_id in sx_code_hazard_map:
-        cur.execute("""
-            INSERT INTO sx_code_hazard_map (sx_code, hazard_subclass_id, hazard_class_id) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (sx_code, hazard_subclass_id, hazard_class_id))
+    copy_upsert(cur, "sx_code_hazard_map", ("sx_code", "hazard_subclass_id", "hazard_class_id"), sx_code_hazard_map)
     print(f"Seeded {len(sx_code_hazard_map)} symptom code hazard mappings")
     
     # --- Diagnosis Code to Hazard Mapping ---
+    # Format: (dx_code, match_type, dx_code_end, hazard_subclass_id, hazard_class_id)
+    # Prefix rules cover a whole ICD-10 family; the most specific rule wins.
     dx_code_hazard_map = [
-        ("G30.9", "COG_MEM", "COG"),          # Alzheimer's (child + parent)
-        ("F03.90", "COG_MEM", "COG"),         # Dementia (child + parent)
-        ("I69.351", "MOB_WALK", "MOB"),       # Hemiplegia (child + parent)
-        ("M81.0", "MOB_WALK", "MOB"),         # Osteoporosis (child + parent)
-        ("E11.9", "MED_ENDO", "MED"),         # Type 2 Diabetes (endocrine subclass)
-        ("F32.9", "MOOD_DEP", "DX_MOOD_BEHAVIORAL"),        # Depression (child + parent)
-        ("I10", "MED_CARDIO", "MED"),         # Essential Hypertension (cardiovascular subclass)
+        ("G30.9", "exact", None, "COG_MEM", "COG"),          # Alzheimer's (child + parent)
+        ("F03.90", "exact", None, "COG_MEM", "COG"),         # Dementia (child + parent)
+        ("I69.351", "exact", None, "MOB_WALK", "MOB"),       # Hemiplegia (child + parent)
+        ("M81.0", "exact", None, "MOB_WALK", "MOB"),         # Osteoporosis (child + parent)
+        ("E11.9", "exact", None, "MED_ENDO", "MED"),         # Type 2 Diabetes (endocrine subclass)
+        ("F32.9", "exact", None, "MOOD_DEP", "DX_MOOD_BEHAVIORAL"),        # Depression (child + parent)
+        ("I10", "exact", None, "MED_CARDIO", "MED"),         # Essential Hypertension (cardiovascular subclass)
+        ("G30", "prefix", None, "COG_MEM", "COG"),           # Alzheimer's disease, all types
+        ("F01", "range", "F03", "COG_MEM", "COG"),           # Vascular, other and unspecified dementia
+        ("I69", "prefix", None, "MOB_WALK", "MOB"),          # Sequelae of cerebrovascular disease
+        ("M80", "range", "M81", "MOB_WALK", "MOB"),          # Osteoporosis with/without fracture
+        ("E08", "range", "E13", "MED_ENDO", "MED"),          # Diabetes mellitus, all types
+        ("F32", "range", "F33", "MOOD_DEP", "DX_MOOD_BEHAVIORAL"),         # Depressive episodes
+        ("I10", "range", "I16", "MED_CARDIO", "MED"),        # Hypertensive diseases
     ]
     
-    for dx_code, hazard_subclass_id, hazard_class_id in dx_code_hazard_map:
-        cur.execute("""
-            INSERT INTO dx_code_hazard_map (dx_code, hazard_subclass_id, hazard_class_id) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (dx_code, hazard_subclass_id, hazard_class_id))
+    copy_upsert(cur, "dx_code_hazard_map", ("dx_code", "match_type", "dx_code_end", "hazard_subclass_id", "hazard_class_id"), dx_code_hazard_map)
     print(f"Seeded {len(dx_code_hazard_map)} diagnosis code hazard mappings")
     
     # --- Prescription Code to Hazard Mapping ---
@@ -686,11 +658,7 @@ def seed_assessment_hazard_mappings(cur):
         ("RX004", None, "MED"),                    # Metformin (diabetes, parent only)
     ]
     
-    for rx_code, hazard_subclass_id, hazard_class_id in rx_code_hazard_map:
-        cur.execute("""
-            INSERT INTO rx_code_hazard_map (rx_code, hazard_subclass_id, hazard_class_id) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (rx_code, hazard_subclass_id, hazard_class_id))
+    copy_upsert(cur, "rx_code_hazard_map", ("rx_code", "hazard_subclass_id", "hazard_class_id"), rx_code_hazard_map)
     print(f"Seeded {len(rx_code_hazard_map)} prescription code hazard mappings")
     
     # --- PRAPARE Item to Social Hazard Mapping ---
@@ -772,15 +740,15 @@ def seed_assessment_hazard_mappings(cur):
         ("household_size", 7, 20, "OVERCROWDING", "LOW_NEED_HOUSING")  # Large household (7+ people)
     ]
     
-    for prapare_item, score_min, score_max, social_hazard_subclass_id, social_hazard_class_id in prapare_item_hazard_map:
-        cur.execute("""
-            INSERT INTO prapare_item_hazard_map (prapare_item, score_min, score_max, social_hazard_subclass_id, social_hazard_class_id) 
-            VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (prapare_item, score_min, score_max, social_hazard_subclass_id, social_hazard_class_id))
+    copy_upsert(cur, "prapare_item_hazard_map", ("prapare_item", "score_min", "score_max", "social_hazard_subclass_id", "social_hazard_class_id"), prapare_item_hazard_map)
     print(f"Seeded {len(prapare_item_hazard_map)} PRAPARE item hazard mappings")
 
 
 
+@seed_task(
+    writes=("hazard_service_map", "parent_hazard_service_map"),
+    reads=("hazard_classes", "hazard_subclasses", "service_classes", "service_subclasses"),
+)
 def seed_hazard_service_mappings(cur):
     """Seed mappings between hazards and appropriate services using direct ID-based mappings"""
     
@@ -856,7 +824,7 @@ def seed_hazard_service_mappings(cur):
 
     ]
     
-    cur.executemany("INSERT INTO hazard_service_map (hazard_subclass_id, service_subclass_id, parent_service_class_id) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING", hazard_service_map)
+    copy_upsert(cur, "hazard_service_map", ("hazard_subclass_id", "service_subclass_id", "parent_service_class_id"), hazard_service_map)
     print(f"Seeded {len(hazard_service_map)} hazard-service mappings")
     
     # --- Parent Hazard to Service Class Mappings ---
@@ -873,5 +841,5 @@ def seed_hazard_service_mappings(cur):
         ("MED", "SVC_MED_MGMT"),
     ]
     
-    cur.executemany("INSERT INTO parent_hazard_service_map (hazard_class_id, service_class_id) VALUES (%s, %s) ON CONFLICT DO NOTHING", parent_hazard_service_map)
+    copy_upsert(cur, "parent_hazard_service_map", ("hazard_class_id", "service_class_id"), parent_hazard_service_map)
     print(f"Seeded {len(parent_hazard_service_map)} parent hazard-service mappings")
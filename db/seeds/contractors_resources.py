@@ -2,10 +2,13 @@
 Contractors, costs, community resources, and resource costs seeding.
 Comprehensive seeding for both clinical and social service providers.
 """
-import uuid
 import psycopg2
 
+from copy_loader import copy_upsert
+from seed_tasks import seed_id, seed_task
 
+
+@seed_task(writes=("contractors", "services", "costs"))
 def seed_contractors_and_costs(cur):
     """Seed contractors and their service costs with frequency"""
     
@@ -20,11 +23,10 @@ def seed_contractors_and_costs(cur):
         ("Comfort Keepers", '{"phone": "828-555-0106", "email": "comfort@comfortkeepers.com", "address": "678 Long Shoals Rd, Arden, NC 28704"}', "In-home senior care, companion care, personal care, safety monitoring")
     ]
     
-    for name, contact_info, qualifications in contractors:
-        cur.execute("""
-            INSERT INTO contractors (name, contact_info, qualifications) 
-            VALUES (%s, %s, %s) ON CONFLICT DO NOTHING
-        """, (name, contact_info, qualifications))
+    contractor_map = {contractor[0]: seed_id("contractor", contractor[0]) for contractor in contractors}
+    copy_upsert(cur, "contractors", ("contractor_id", "name", "contact_info", "qualifications"), [
+        (contractor_map[contractor[0]], *contractor) for contractor in contractors
+    ])
     
     print(f"Seeded {len(contractors)} contractors")
     
@@ -43,24 +45,13 @@ def seed_contractors_and_costs(cur):
         ("Transportation Services", "Transport", "2 trips weekly", "Medical appointment transportation")
     ]
     
-    service_ids = []
-    for service_name, service_category, default_frequency, description in sample_services:
-        service_id = str(uuid.uuid4())
-        service_ids.append(service_id)
-        cur.execute("""
-            INSERT INTO services (service_id, service_name, service_category, default_frequency, description) 
-            VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (service_id, service_name, service_category, default_frequency, description))
+    service_map = {service[0]: seed_id("service", service[0]) for service in sample_services}
+    copy_upsert(cur, "services", ("service_id", "service_name", "service_category", "default_frequency", "description"), [
+        (service_map[service[0]], *service) for service in sample_services
+    ])
     
     print(f"Seeded {len(sample_services)} services")
     
-    # Get contractor and service IDs for cost mapping
-    cur.execute("SELECT contractor_id, name FROM contractors")
-    contractor_map = {name: contractor_id for contractor_id, name in cur.fetchall()}
-    
-    cur.execute("SELECT service_id, service_name FROM services")
-    service_map = {name: service_id for service_id, name in cur.fetchall()}
-    
     # --- Seed Contractor Service Costs (with weekly frequency) ---
     print("Seeding contractor service costs...")
     costs_data = [
@@ -111,16 +102,14 @@ def seed_contractors_and_costs(cur):
         (contractor_map["Home Instead Senior Care"], service_map["Transportation Services"], 40.00, "per trip", 2, "Private Pay")
     ]
     
-    for contractor_id, service_id, amount, billing_cycle, weekly_freq, payer in costs_data:
-        cost_id = str(uuid.uuid4())
-        cur.execute("""
-            INSERT INTO costs (cost_id, contractor_id, service_id, amount, billing_cycle, weekly_frequency, payer) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (cost_id, contractor_id, service_id, amount, billing_cycle, weekly_freq, payer))
+    copy_upsert(cur, "costs", ("cost_id", "contractor_id", "service_id", "amount", "billing_cycle", "weekly_frequency", "payer"), [
+        (seed_id("cost", cost[0], cost[1], cost[4]), *cost) for cost in costs_data
+    ])
     
     print(f"Seeded {len(costs_data)} contractor service costs")
 
 
+@seed_task(writes=("community_resources", "resource_costs"), reads=("sdoh_mitigation_subclasses",))
 def seed_community_resources_and_costs(cur):
     """Seed comprehensive community resources and their costs"""
     
@@ -260,19 +249,19 @@ def seed_community_resources_and_costs(cur):
     
     # Insert community resources
     resource_ids = []
+    resource_rows = []
     for resource in community_resources:
-        resource_id = str(uuid.uuid4())
+        resource_id = seed_id("community_resource", resource['name'])
         resource_ids.append((resource_id, resource['subclass_id']))
-        cur.execute("""
-            INSERT INTO community_resources (
-                resource_id, resource_subclass_id, name, description, address, city, 
-                zip_code, phone, website, cost_info, operating_hours, appointment_required
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (
+        resource_rows.append((
             resource_id, resource['subclass_id'], resource['name'], resource['description'],
             resource['address'], resource['city'], resource['zip_code'], resource['phone'],
             resource['website'], resource['cost_info'], resource['hours'], resource['appointment_required']
         ))
+    copy_upsert(cur, "community_resources", (
+        "resource_id", "resource_subclass_id", "name", "description", "address", "city",
+        "zip_code", "phone", "website", "cost_info", "operating_hours", "appointment_required"
+    ), resource_rows)
     
     print(f"Seeded {len(community_resources)} community resources")
     
@@ -301,13 +290,9 @@ def seed_community_resources_and_costs(cur):
         (resource_ids[8][0], 'per_case', 0.00, 'free', 1, '125% of Federal Poverty Level', 'Free')
     ]
     
-    for resource_id, service_type, amount, billing_cycle, weekly_freq, eligibility, payer in resource_costs:
-        cost_id = str(uuid.uuid4())
-        cur.execute("""
-            INSERT INTO resource_costs (
-                resource_cost_id, resource_id, service_type, amount, billing_cycle, 
-                weekly_frequency, eligibility_requirements, payer
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (cost_id, resource_id, service_type, amount, billing_cycle, weekly_freq, eligibility, payer))
+    copy_upsert(cur, "resource_costs", (
+        "resource_cost_id", "resource_id", "service_type", "amount", "billing_cycle",
+        "weekly_frequency", "eligibility_requirements", "payer"
+    ), [(seed_id("resource_cost", cost[0], cost[1], cost[4]), *cost) for cost in resource_costs])
     
     print(f"Seeded {len(resource_costs)} resource costs")
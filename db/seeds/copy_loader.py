@@ -0,0 +1,159 @@
+"""
+COPY-based bulk loading for the seed sets.
+
+copy_upsert() streams rows into a temp staging table with COPY FROM STDIN and
+merges them into the target with one INSERT ... SELECT ... ON CONFLICT, in
+place of one INSERT round trip per row. Each call records its row counts and
+timing so SeedManager can print a per-table summary.
+
+While checksums are in use (see seed_tasks.run_seed_tasks), a table whose
+rows hash to the checksum recorded in seed_checksums on the last run is not
+loaded again.
+"""
+import csv
+import hashlib
+import io
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+COPY_CHUNK_ROWS = 50000
+COPY_NULL = "\\N"
+
+# (table, rows staged, rows inserted or updated or None if skipped, seconds) since the last take_timings()
+_timings: List[Tuple[str, int, Optional[int], float]] = []
+
+# table -> checksum recorded on the last run; None when checksums are not in use
+_checksums: Optional[Dict[str, str]] = None
+
+
+def _array_literal(values) -> str:
+    items = []
+    for v in values:
+        if v is None:
+            items.append("NULL")
+        else:
+            items.append('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _copy_chunk(cur, stage: str, columns: Sequence[str], rows: List[Sequence]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(v) for v in row])
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY {stage} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", buffer
+    )
+
+
+def load_checksums(cur) -> Dict[str, str]:
+    cur.execute("SELECT table_name, checksum FROM seed_checksums")
+    return dict(cur.fetchall())
+
+
+def use_checksums(checksums: Optional[Dict[str, str]]):
+    """Skip and record tables by checksum (a dict from load_checksums), or stop with None."""
+    global _checksums
+    _checksums = checksums
+
+
+def rows_checksum(columns: Sequence[str], rows: Sequence[Sequence]) -> str:
+    payload = json.dumps([list(columns), rows], default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def copy_upsert(cur, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+                conflict: Optional[Sequence[str]] = None, update: Optional[Sequence[str]] = None) -> int:
+    """COPY rows into table, merging on conflict.
+
+    Without `update` conflicting rows are skipped (ON CONFLICT DO NOTHING, on
+    `conflict` if given, otherwise on any constraint). With `update` the listed
+    columns are overwritten on `conflict`, and the last staged row per key wins.
+    Returns the number of rows inserted or updated (0 if skipped by checksum).
+    """
+    if update and not conflict:
+        raise ValueError(f"copy_upsert({table}): update requires conflict columns")
+    started = time.perf_counter()
+    checksum = None
+    if _checksums is not None:
+        rows = list(rows)
+        checksum = rows_checksum(columns, rows)
+        if _checksums.get(table) == checksum:
+            _timings.append((table, len(rows), None, time.perf_counter() - started))
+            return 0
+    stage = f"{table}_stage"
+    cols = ", ".join(columns)
+
+    # Only the loaded columns are staged, so no defaults or sequences fire here.
+    cur.execute(f"DROP TABLE IF EXISTS {stage}")
+    cur.execute(f"CREATE TEMP TABLE {stage} AS SELECT {cols} FROM {table} WITH NO DATA")
+    staged = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= COPY_CHUNK_ROWS:
+            _copy_chunk(cur, stage, columns, chunk)
+            staged += len(chunk)
+            chunk = []
+    if chunk:
+        _copy_chunk(cur, stage, columns, chunk)
+        staged += len(chunk)
+
+    if update:
+        keys = ", ".join(conflict)
+        assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in update)
+        changed = " OR ".join(f"{table}.{c} IS DISTINCT FROM EXCLUDED.{c}" for c in update)
+        cur.execute(f"""
+            INSERT INTO {table} ({cols})
+            SELECT DISTINCT ON ({keys}) {cols} FROM {stage}
+            ORDER BY {keys}, ctid DESC
+            ON CONFLICT ({keys}) DO UPDATE SET {assignments}
+            WHERE {changed}
+        """)
+    else:
+        target = f"({', '.join(conflict)}) " if conflict else ""
+        cur.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} ON CONFLICT {target}DO NOTHING")
+    merged = cur.rowcount
+    cur.execute(f"DROP TABLE {stage}")
+    if checksum is not None:
+        cur.execute("""
+            INSERT INTO seed_checksums (table_name, checksum, row_count, seeded_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (table_name) DO UPDATE SET
+                checksum = EXCLUDED.checksum, row_count = EXCLUDED.row_count, seeded_at = EXCLUDED.seeded_at
+        """, (table, checksum, staged))
+
+    _timings.append((table, staged, merged, time.perf_counter() - started))
+    return merged
+
+
+def take_timings() -> List[Tuple[str, int, Optional[int], float]]:
+    """Timings recorded since the last call, oldest first."""
+    timings = list(_timings)
+    _timings.clear()
+    return timings
+
+
+def print_timings(timings: List[Tuple[str, int, Optional[int], float]]):
+    if not timings:
+        return
+    width = max(len(t[0]) for t in timings)
+    print(f"\n{'table':<{width}}  {'rows':>7}  {'new':>7}  {'ms':>8}")
+    for table, staged, merged, seconds in timings:
+        new = "skipped" if merged is None else merged
+        print(f"{table:<{width}}  {staged:>7}  {new:>7}  {seconds * 1000:>8.1f}")
+    total = sum(t[3] for t in timings)
+    merged = sum(t[2] or 0 for t in timings)
+    print(f"{'total':<{width}}  {sum(t[1] for t in timings):>7}  {merged:>7}  {total * 1000:>8.1f}")
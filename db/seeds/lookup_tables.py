@@ -4,6 +4,10 @@ These are relatively stable reference values.
 """
 import psycopg2
 
+from copy_loader import copy_upsert
+from seed_tasks import seed_task
+
+@seed_task(writes=("severity_levels", "frequency_levels", "caregiver_services"))
 def seed_lookup_tables(cur):
     """Seed severity levels, frequency levels, and other lookup tables"""
     
@@ -15,7 +19,7 @@ def seed_lookup_tables(cur):
         ("3", "Severe", 3, 0.5, "Severe, substantial interference, distress"),
         ("4", "Extreme", 4, 0.2, "Extreme, disabling, prevents activities, constant"),
     ]
-    cur.executemany("INSERT INTO severity_levels (severity_code, label, ordinal, utility_weight, description) VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING", severity_levels)
+    copy_upsert(cur, "severity_levels", ("severity_code", "label", "ordinal", "utility_weight", "description"), severity_levels)
     print(f"Seeded {len(severity_levels)} severity levels")
 
     # Frequency levels
@@ -27,7 +31,7 @@ def seed_lookup_tables(cur):
         ("4", "Hourly", 4, "Occurs every hour or more frequently"),
         ("5", "Constant", 5, "Always present"),
     ]
-    cur.executemany("INSERT INTO frequency_levels (frequency_code, label, ordinal, description) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING", frequency_levels)
+    copy_upsert(cur, "frequency_levels", ("frequency_code", "label", "ordinal", "description"), frequency_levels)
     print(f"Seeded {len(frequency_levels)} frequency levels")
 
     # Caregiver services (HCPCS/CPT codes)
@@ -54,9 +58,5 @@ def seed_lookup_tables(cur):
         ("T1021", "Home health aide services", "Home health aide or certified nurse assistant per hour", 40.00, "Home Health")
     ]
     
-    for service in caregiver_services:
-        cur.execute("""
-            INSERT INTO caregiver_services (service_code, service_name, description, typical_cost, category)
-            VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, service)
+    copy_upsert(cur, "caregiver_services", ("service_code", "service_name", "description", "typical_cost", "category"), caregiver_services)
     print(f"Seeded {len(caregiver_services)} caregiver services")
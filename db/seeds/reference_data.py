@@ -4,6 +4,10 @@ that don't change frequently and are used across the system.
 """
 import psycopg2
 
+from copy_loader import copy_upsert
+from seed_tasks import seed_task
+
+@seed_task(writes=("dx_codes", "tx_codes", "rx_codes", "sx_codes"))
 def seed_medical_codes(cur):
     """Seed medical diagnosis, treatment, and prescription codes"""
     
@@ -37,7 +41,7 @@ def seed_medical_codes(cur):
         ("R53.83", "Other fatigue"),
         ("R26.9", "Unspecified abnormalities of gait and mobility")
     ]
-    cur.executemany("INSERT INTO dx_codes (code, description) VALUES (%s, %s) ON CONFLICT DO NOTHING", dx_codes)
+    copy_upsert(cur, "dx_codes", ("code", "description"), dx_codes)
     print(f"Seeded {len(dx_codes)} diagnosis codes")
 
     # Treatment codes (CPT)
@@ -68,7 +72,7 @@ def seed_medical_codes(cur):
         ("99407", "Smoking cessation counseling, intensive"),
         ("90658", "Influenza virus vaccine")
     ]
-    cur.executemany("INSERT INTO tx_codes (code, description) VALUES (%s, %s) ON CONFLICT DO NOTHING", tx_codes)
+    copy_upsert(cur, "tx_codes", ("code", "description"), tx_codes)
     print(f"Seeded {len(tx_codes)} treatment codes")
 
     # Prescription codes
@@ -99,7 +103,7 @@ def seed_medical_codes(cur):
         ("RX024", "Rivastigmine"),
         ("RX025", "Tamsulosin")
     ]
-    cur.executemany("INSERT INTO rx_codes (code, description) VALUES (%s, %s) ON CONFLICT DO NOTHING", rx_codes)
+    copy_upsert(cur, "rx_codes", ("code", "description"), rx_codes)
     print(f"Seeded {len(rx_codes)} prescription codes")
 
     # Symptom codes (ICD-10 symptom codes)  
@@ -130,7 +134,7 @@ def seed_medical_codes(cur):
         ("L98.9", "Skin problems"),
         ("R13.10", "Dysphagia (Difficulty swallowing)")
     ]
-    cur.executemany("INSERT INTO sx_codes (code, description) VALUES (%s, %s) ON CONFLICT DO NOTHING", sx_codes)
+    copy_upsert(cur, "sx_codes", ("code", "description"), sx_codes)
     print(f"Seeded {len(sx_codes)} symptom codes")
 
     #   ("SX01", "Cough"),
@@ -7,6 +7,8 @@ import uuid
 import json
 from datetime import datetime, date
 
+from copy_loader import copy_upsert
+
 def seed_sample_patients(cur):
     """Seed sample patients for testing"""
     
@@ -35,15 +37,11 @@ def seed_sample_patients(cur):
         }
     ]
     
-    patient_ids = []
-    for patient in sample_patients:
-        patient_id = str(uuid.uuid4())
-        patient_ids.append(patient_id)
-        cur.execute("""
-            INSERT INTO patients (patient_id, name, dob, gender, phone, email)
-            VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (patient_id, patient['name'], patient['dob'], 
-              patient['gender'], patient['phone'], patient['email']))
+    patient_ids = [str(uuid.uuid4()) for _ in sample_patients]
+    copy_upsert(cur, "patients", ("patient_id", "name", "dob", "gender", "phone", "email"), [
+        (patient_id, patient['name'], patient['dob'], patient['gender'], patient['phone'], patient['email'])
+        for patient_id, patient in zip(patient_ids, sample_patients)
+    ])
     
     print(f"Seeded {len(sample_patients)} sample patients")
     return patient_ids
@@ -76,18 +74,18 @@ def seed_sample_patient_history(cur, patient_ids):
         }
     ]
     
-    for record in history_records:
-        history_id = str(uuid.uuid4())
-        cur.execute("""
-            INSERT INTO patient_history (
-                history_id, patient_id, dx_codes, tx_codes, rx_codes, sx_codes, created_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING
-        """, (
-            history_id, record['patient_id'], 
-            record['dx_codes'], record['tx_codes'], 
+    created_at = datetime.now()
+    copy_upsert(cur, "patient_history", (
+        "history_id", "patient_id", "dx_codes", "tx_codes", "rx_codes", "sx_codes", "created_at"
+    ), [
+        (
+            str(uuid.uuid4()), record['patient_id'],
+            record['dx_codes'], record['tx_codes'],
             record['rx_codes'], record['sx_codes'],
-            datetime.now()
-        ))
+            created_at
+        )
+        for record in history_records
+    ])
     
     print(f"Seeded {len(history_records)} patient history records")
 
@@ -121,18 +119,15 @@ def seed_sample_adl_data(cur, patient_ids):
         }
     ]
     
-    for record in adl_records:
-        cur.execute("""
-            INSERT INTO adl_answers (
-                patient_id, date_completed, feeding, bathing, grooming, dressing, 
-                bowels, bladder, toilet_use, transfers, mobility, stairs, answers
-            ) VALUES (%s, CURRENT_DATE, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (patient_id, date_completed) DO NOTHING
-        """, (
-            record['patient_id'], record['feeding'], record['bathing'], record['grooming'],
-            record['dressing'], record['bowels'], record['bladder'], record['toilet_use'],
-            record['transfers'], record['mobility'], record['stairs'], record['answers']
-        ))
+    adl_items = (
+        "feeding", "bathing", "grooming", "dressing", "bowels", "bladder",
+        "toilet_use", "transfers", "mobility", "stairs", "answers"
+    )
+    copy_upsert(
+        cur, "adl_answers", ("patient_id", "date_completed") + adl_items,
+        [(record['patient_id'], date.today(), *(record[item] for item in adl_items)) for record in adl_records],
+        conflict=("patient_id", "date_completed"),
+    )
     
     print(f"Seeded {len(adl_records)} ADL assessment records")
 
@@ -163,18 +158,15 @@ def seed_sample_iadl_data(cur, patient_ids):
         }
     ]
     
-    for record in iadl_records:
-        cur.execute("""
-            INSERT INTO iadl_answers (
-                patient_id, date_completed, telephone, shopping, food_preparation, housekeeping,
-                laundry, transportation, medication, finances, answers
-            ) VALUES (%s, CURRENT_DATE, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (patient_id, date_completed) DO NOTHING
-        """, (
-            record['patient_id'], record['telephone'], record['shopping'], record['food_preparation'],
-            record['housekeeping'], record['laundry'], record['transportation'],
-            record['medication'], record['finances'], record['answers']
-        ))
+    iadl_items = (
+        "telephone", "shopping", "food_preparation", "housekeeping",
+        "laundry", "transportation", "medication", "finances", "answers"
+    )
+    copy_upsert(
+        cur, "iadl_answers", ("patient_id", "date_completed") + iadl_items,
+        [(record['patient_id'], date.today(), *(record[item] for item in iadl_items)) for record in iadl_records],
+        conflict=("patient_id", "date_completed"),
+    )
     
     print(f"Seeded {len(iadl_records)} IADL assessment records")
 
@@ -311,40 +303,23 @@ def seed_sample_prapare_data(cur, patient_ids):
         }
     ]
     
-    for record in prapare_responses:
-        prapare_id = str(uuid.uuid4())
-        cur.execute("""
-            INSERT INTO prapare_answers (
-                prapare_id, patient_id, date_completed, assessed_by, notes,
-                hispanic, race_white, race_black, race_asian, race_native_hawaiian,
-                race_pacific_islander, race_american_indian, race_other, race_no_answer,
-                farm_work, military_service, primary_language, household_size, housing_situation,
-                housing_worry, education_level, employment_status, primary_insurance,
-                annual_income, unmet_food, unmet_clothing, unmet_utilities, unmet_childcare,
-                unmet_healthcare, unmet_phone, unmet_other, unmet_no_answer,
-                transportation_barrier, social_contact, stress_level, incarceration_history,
-                feel_safe, domestic_violence, food_worry, food_didnt_last, need_food_help,
-                z_codes, raw_responses
-            ) VALUES (
-                %s, %s, CURRENT_DATE, 'System', 'Sample data',
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, '{}'::jsonb
-            ) ON CONFLICT DO NOTHING
-        """, (
-            prapare_id, record['patient_id'], record['hispanic'], record['race_white'],
-            record['race_black'], record['race_asian'], record['race_native_hawaiian'],
-            record['race_pacific_islander'], record['race_american_indian'],
-            record['race_other'], record['race_no_answer'], record['farm_work'],
-            record['military_service'], record['primary_language'], record['household_size'], record['housing_situation'],
-            record['housing_worry'], record['education_level'], record['employment_status'],
-            record['primary_insurance'], record['annual_income'], record['unmet_food'],
-            record['unmet_clothing'], record['unmet_utilities'], record['unmet_childcare'],
-            record['unmet_healthcare'], record['unmet_phone'], record['unmet_other'],
-            record['unmet_no_answer'], record['transportation_barrier'], record['social_contact'],
-            record['stress_level'], record['incarceration_history'], record['feel_safe'],
-            record['domestic_violence'], record['food_worry'], record['food_didnt_last'],
-            record['need_food_help'], record['z_codes']
-        ))
+    prapare_items = (
+        "hispanic", "race_white", "race_black", "race_asian", "race_native_hawaiian",
+        "race_pacific_islander", "race_american_indian", "race_other", "race_no_answer",
+        "farm_work", "military_service", "primary_language", "household_size", "housing_situation",
+        "housing_worry", "education_level", "employment_status", "primary_insurance",
+        "annual_income", "unmet_food", "unmet_clothing", "unmet_utilities", "unmet_childcare",
+        "unmet_healthcare", "unmet_phone", "unmet_other", "unmet_no_answer",
+        "transportation_barrier", "social_contact", "stress_level", "incarceration_history",
+        "feel_safe", "domestic_violence", "food_worry", "food_didnt_last", "need_food_help",
+        "z_codes"
+    )
+    copy_upsert(cur, "prapare_answers", (
+        "prapare_id", "patient_id", "date_completed", "assessed_by", "notes", "raw_responses"
+    ) + prapare_items, [
+        (str(uuid.uuid4()), record['patient_id'], date.today(), 'System', 'Sample data', {},
+         *(record[item] for item in prapare_items))
+        for record in prapare_responses
+    ])
     
     print(f"Seeded {len(prapare_responses)} PRAPARE assessment records")
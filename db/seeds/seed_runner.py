@@ -1,7 +1,9 @@
 """
 Main seed runner that orchestrates all database seeding operations.
 This replaces the monolithic seed_codes.py with a modular approach.
+Every seed set is bulk-loaded with COPY (see copy_loader.py).
 """
+import argparse
 import os
 import sys
 import psycopg2
@@ -23,6 +25,8 @@ from sample_patients import (
     seed_sample_patients, seed_sample_patient_history, 
     seed_sample_adl_data, seed_sample_iadl_data, seed_sample_prapare_data
 )
+from copy_loader import take_timings, print_timings
+from seed_tasks import SEED_WORKERS, run_seed_tasks
 
 # Database configuration
 DB_CONFIG = {
@@ -36,8 +40,10 @@ DB_CONFIG = {
 class SeedManager:
     """Manages database seeding operations with environment control"""
     
-    def __init__(self, environment: str = 'development'):
+    def __init__(self, environment: str = 'development', workers: int = SEED_WORKERS, force: bool = False):
         self.environment = environment
+        self.workers = workers
+        self.force = force
         self.conn = None
         self.cur = None
         
@@ -64,26 +70,15 @@ class SeedManager:
         print("\n=== SEEDING REFERENCE DATA ===")
         
         try:
-            # Medical codes (dx, tx, rx, sx)
-            seed_medical_codes(self.cur)
-            
-            # Lookup tables (severity, frequency, services)
-            seed_lookup_tables(self.cur)
-            
-            # Classification system (hazards, services, mappings)
-            seed_classification_data(self.cur)  # Now includes all hazards + SDOH mitigations
-            seed_assessment_hazard_mappings(self.cur)  # All assessment-to-hazard mappings
-            seed_hazard_service_mappings(self.cur)
-            
-            # Contractors, services, and cost data
-            seed_contractors_and_costs(self.cur)  # Clinical service providers and costs
-            seed_community_resources_and_costs(self.cur)  # Social service resources and costs
-            
-            self.conn.commit()
+            # Every @seed_task seeder (codes, lookups, classification, mappings,
+            # contractors, community resources) in dependency order, each on
+            # its own connection; unchanged tables are skipped by checksum.
+            run_seed_tasks(lambda: psycopg2.connect(**DB_CONFIG), workers=self.workers, force=self.force)
+            print_timings(take_timings())
             print("✅ Reference data seeded successfully")
             
         except Exception as e:
-            self.conn.rollback()
+            take_timings()
             print(f"❌ Error seeding reference data: {e}")
             raise
     
@@ -106,10 +101,12 @@ class SeedManager:
             seed_sample_prapare_data(self.cur, patient_ids)
             
             self.conn.commit()
+            print_timings(take_timings())
             print("✅ Sample data seeded successfully")
             
         except Exception as e:
             self.conn.rollback()
+            take_timings()
             print(f"❌ Error seeding sample data: {e}")
             raise
     
@@ -136,8 +133,18 @@ class SeedManager:
 
 def main():
     """Main entry point"""
-    # Get environment from command line or default to development
-    environment = sys.argv[1] if len(sys.argv) > 1 else 'development'
+    # Load-testing cohort: seed_runner.py synthetic --patients N
+    if len(sys.argv) > 1 and sys.argv[1] == 'synthetic':
+        from synthetic_cohort import main as synthetic_main
+        synthetic_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Seed reference data (and sample data outside production)")
+    parser.add_argument("environment", nargs="?", default="development")
+    parser.add_argument("--workers", type=int, default=SEED_WORKERS, help="reference seeders run concurrently")
+    parser.add_argument("--force", action="store_true", help="reload tables even if their seed checksum is unchanged")
+    args = parser.parse_args()
+    environment = args.environment
     
     # Validate environment
     valid_environments = ['development', 'test', 'production']
@@ -147,7 +154,7 @@ def main():
         sys.exit(1)
     
     # Run seeding
-    seeder = SeedManager(environment=environment)
+    seeder = SeedManager(environment=environment, workers=args.workers, force=args.force)
     seeder.seed_all()
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+"""
+Dependency graph for the reference-data seeders.
+
+Each seeder declares the tables it writes and the tables it needs first (FK
+targets) with @seed_task. run_seed_tasks() starts every seeder whose inputs
+are loaded, each on its own connection and transaction, so independent
+branches run in parallel. copy_upsert keeps a checksum of each table's seed
+rows in seed_checksums and skips tables whose rows have not changed since
+the last run.
+"""
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Sequence, Set
+
+import copy_loader
+
+SEED_WORKERS = 4
+# Namespace for seed row ids, so reference rows get the same id on every run
+SEED_NAMESPACE = uuid.UUID("6f1c2a52-5d0e-4a8e-9c43-1d2b7f0e8a10")
+
+
+class SeedTask:
+    def __init__(self, fn: Callable, writes: Sequence[str], reads: Sequence[str]):
+        self.fn = fn
+        self.name = fn.__name__
+        self.writes = tuple(writes)
+        self.reads = tuple(reads)
+
+
+SEED_TASKS: Dict[str, SeedTask] = {}
+
+
+def seed_task(writes: Sequence[str], reads: Sequence[str] = ()):
+    """Register a reference seeder fn(cur) with the tables it writes and reads."""
+    def register(fn):
+        SEED_TASKS[fn.__name__] = SeedTask(fn, writes, reads)
+        return fn
+    return register
+
+
+def seed_id(*parts) -> str:
+    """Stable UUID for a seed row identified by its natural key."""
+    return str(uuid.uuid5(SEED_NAMESPACE, "|".join(str(p) for p in parts)))
+
+
+def task_dependencies(tasks: Dict[str, SeedTask]) -> Dict[str, Set[str]]:
+    """task -> tasks that write a table it reads."""
+    writers = {}
+    for task in tasks.values():
+        for table in task.writes:
+            if table in writers:
+                raise ValueError(f"{table} is written by both {writers[table]} and {task.name}")
+            writers[table] = task.name
+    return {
+        task.name: {writers[t] for t in task.reads if t in writers and writers[t] != task.name}
+        for task in tasks.values()
+    }
+
+
+def _run_task(connect: Callable, task: SeedTask) -> float:
+    started = time.perf_counter()
+    conn = connect()
+    try:
+        task.fn(conn.cursor())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return time.perf_counter() - started
+
+
+def run_seed_tasks(connect: Callable, workers: int = SEED_WORKERS, force: bool = False):
+    """Run every registered seeder in dependency order, independent ones concurrently.
+
+    connect() must return a new DB-API connection. Each seeder commits on its
+    own, so a failure leaves the seeders that already finished in place.
+    With force, tables are reloaded even if their checksum is unchanged.
+    """
+    conn = connect()
+    try:
+        checksums = {} if force else copy_loader.load_checksums(conn.cursor())
+    finally:
+        conn.close()
+
+    pending = task_dependencies(SEED_TASKS)
+    running = {}
+    copy_loader.use_checksums(checksums)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[pool.submit(_run_task, connect, SEED_TASKS[name])] = name
+                if not running:
+                    raise RuntimeError(f"Seed task dependency cycle among: {', '.join(sorted(pending))}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    seconds = future.result()
+                    print(f"  {name} finished in {seconds * 1000:.0f} ms")
+                    for deps in pending.values():
+                        deps.discard(name)
+    finally:
+        copy_loader.use_checksums(None)
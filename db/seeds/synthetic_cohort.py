@@ -0,0 +1,401 @@
+"""
+Deterministic synthetic cohort for load testing.
+
+Generates N patients (up to millions) with an ADL/IADL assessment, a medical
+history, a PRAPARE assessment, hazards/risks and recommendation settings.
+Distributions are driven by two latent per-patient values, frailty (ADL/IADL
+impairment, risk severity) and deprivation (PRAPARE unmet needs), so the
+scores are correlated the way real cohorts are. Codes are drawn from the
+seeded catalogs with a long-tailed popularity, hazards come from the
+adl/iadl_item_hazard_map rules, and Z-codes from the PRAPARE rules file used
+by the API.
+
+The cohort is split into fixed-size shards; each shard has its own RNG
+stream (seed, shard), so the same seed always produces the same rows no
+matter how many workers run. Shards are generated and COPY-loaded in
+parallel worker processes, each on its own connection and transaction.
+Reruns with the same seed are no-ops (ON CONFLICT DO NOTHING).
+
+The patient_history trigger that updates shared rows (the code_usage
+counters) is disabled for the load, so shards don't queue on the same row
+locks, and code_usage is rebuilt once at the end.
+
+Usage:
+    python seed_runner.py synthetic --patients 1000000 [--seed 42] [--workers 8]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import psycopg2
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src", "fastapi_app"))
+
+from copy_loader import copy_upsert, print_timings, take_timings
+from prapare_rules import load_rules
+from seed_runner import DB_CONFIG
+
+SHARD_PATIENTS = 10000
+# patient_history triggers that write shared rows; off while shards load
+BULK_LOAD_DISABLED_TRIGGERS = ("patient_history_code_usage",)
+DEFAULT_SEED = 42
+# Fixed so a seed reproduces the same dates on any day
+AS_OF = date(2025, 6, 30)
+SYNTHETIC_CREATED_AT = datetime(2025, 6, 30, 12, 0)
+
+FIRST_NAMES = (
+    "Mary", "Patricia", "Linda", "Barbara", "Elizabeth", "Dorothy", "Helen", "Margaret", "Ruth", "Betty",
+    "James", "John", "Robert", "William", "Richard", "Charles", "Joseph", "Thomas", "George", "Donald",
+)
+LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Martin", "Lee",
+)
+GENDERS = (("Female", 0.58), ("Male", 0.41), ("Other", 0.01))
+
+# Barthel item maxima (see gradio_app/forms/adl.py)
+ADL_MAX = {
+    "feeding": 2, "bathing": 1, "grooming": 1, "dressing": 2, "bowels": 2,
+    "bladder": 2, "toilet_use": 2, "transfers": 3, "mobility": 3, "stairs": 2,
+}
+IADL_ITEMS = (
+    "telephone", "shopping", "food_preparation", "housekeeping",
+    "laundry", "transportation", "medication", "finances",
+)
+
+# Answer code -> probability, in code order (codes as in init.sql)
+PRAPARE_CHOICES = {
+    "hispanic": (0.78, 0.17, 0.03, 0.02),
+    "farm_work": (0.95, 0.03, 0.02),
+    "military_service": (0.80, 0.17, 0.03),
+    "primary_language": (0.85, 0.13, 0.02),
+    "housing_situation": (0.03, 0.07, 0.87, 0.03),
+    "housing_worry": (0.70, 0.15, 0.12, 0.03),
+    "education_level": (0.14, 0.33, 0.18, 0.09, 0.14, 0.08, 0.02, 0.02),
+    "employment_status": (0.06, 0.08, 0.10, 0.73, 0.03),
+    "primary_insurance": (0.02, 0.14, 0.62, 0.0, 0.14, 0.05, 0.02, 0.01),
+    "annual_income": (0.15, 0.30, 0.25, 0.13, 0.09, 0.05, 0.03),
+    "transportation_barrier": (0.82, 0.10, 0.06, 0.02),
+    "social_contact": (0.45, 0.25, 0.17, 0.10, 0.03),
+    "stress_level": (0.30, 0.30, 0.20, 0.12, 0.05, 0.01, 0.02),
+    "incarceration_history": (0.94, 0.04, 0.02),
+    "feel_safe": (0.04, 0.08, 0.85, 0.03),
+    "domestic_violence": (0.95, 0.03, 0.02),
+    "food_worry": (0.72, 0.18, 0.07, 0.01, 0.02),
+    "food_didnt_last": (0.75, 0.16, 0.06, 0.01, 0.02),
+    "need_food_help": (0.85, 0.12, 0.01, 0.02),
+}
+RACES = (
+    ("race_white", 0.70), ("race_black", 0.15), ("race_asian", 0.05), ("race_american_indian", 0.02),
+    ("race_native_hawaiian", 0.005), ("race_pacific_islander", 0.005), ("race_other", 0.04), ("race_no_answer", 0.03),
+)
+# Base rate of each unmet need at deprivation 1.0
+UNMET_NEEDS = {
+    "unmet_food": 0.6, "unmet_clothing": 0.3, "unmet_utilities": 0.5,
+    "unmet_childcare": 0.05, "unmet_healthcare": 0.4, "unmet_phone": 0.2, "unmet_other": 0.1,
+}
+FREQUENCIES = (("Daily", 0.35), ("Weekly", 0.40), ("Monthly", 0.15), ("As needed", 0.10))
+
+PRAPARE_COLUMNS = (
+    tuple(PRAPARE_CHOICES) + tuple(race for race, _ in RACES) + tuple(UNMET_NEEDS) + ("unmet_no_answer", "household_size")
+)
+
+
+def load_catalogs(cur, seed):
+    """Everything the workers draw from, read once from the seeded reference tables."""
+    catalogs = {}
+    rng = np.random.default_rng(seed)
+    for kind in ("dx", "tx", "rx", "sx"):
+        cur.execute(f"SELECT code FROM {kind}_codes ORDER BY code")
+        codes = [r[0] for r in cur.fetchall()]
+        if not codes:
+            raise RuntimeError(f"{kind}_codes is empty - seed the reference data first")
+        # Long-tailed popularity over a seed-dependent order of the catalog
+        codes = [codes[i] for i in rng.permutation(len(codes))]
+        weights = 1.0 / np.arange(1, len(codes) + 1) ** 0.8
+        catalogs[kind] = (codes, weights / weights.sum())
+
+    cur.execute("SELECT adl_item, score_min, score_max, hazard_subclass_id FROM adl_item_hazard_map ORDER BY 1, 4")
+    catalogs["adl_hazards"] = cur.fetchall()
+    cur.execute("SELECT iadl_item, score_min, score_max, hazard_subclass_id FROM iadl_item_hazard_map ORDER BY 1, 4")
+    catalogs["iadl_hazards"] = cur.fetchall()
+
+    cur.execute("""
+        SELECT m.hazard_subclass_id, s.label, c.label
+        FROM hazard_service_map m
+        JOIN service_subclasses s ON s.subclass_id = m.service_subclass_id
+        LEFT JOIN service_classes c ON c.class_id = m.parent_service_class_id
+        ORDER BY 1, 2
+    """)
+    services = {}
+    for hazard, label, category in cur.fetchall():
+        services.setdefault(hazard, []).append((label, category))
+    catalogs["services"] = services
+    return catalogs
+
+
+def _uuids(rng, n):
+    raw = rng.bytes(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+
+def _choice(rng, options, n):
+    values, p = zip(*options)
+    return [values[i] for i in rng.choice(len(values), size=n, p=p)]
+
+
+def _code_arrays(rng, catalog, mean, n, minimum=0):
+    """n arrays of distinct codes, sizes ~ minimum + Poisson(mean)."""
+    codes, weights = catalog
+    counts = minimum + rng.poisson(mean, size=n)
+    drawn = rng.choice(len(codes), size=int(counts.sum()), p=weights)
+    arrays = []
+    start = 0
+    for count in counts.tolist():
+        arrays.append([codes[i] for i in dict.fromkeys(drawn[start:start + count].tolist())])
+        start += count
+    return arrays
+
+
+def _z_code_lists(rules, answers, n):
+    cols = {f: answers[f].astype(float) if f in answers else np.full(n, np.nan) for f in rules.fields}
+    masks = rules.z_code_masks(cols, rules.score_columns(cols))
+    return [[code for code, hit in zip(rules.z_codes, row) if hit] for row in masks.tolist()]
+
+
+_rules = None
+
+
+def generate_shard(catalogs, seed, shard, start, count):
+    """Rows for patients [start, start + count), as {table: (columns, rows)} in insert order."""
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    rng = np.random.default_rng([seed, shard])
+    n = count
+    patient_ids = _uuids(rng, n)
+    frailty = rng.beta(2.0, 4.0, size=n)
+    deprivation = rng.beta(1.5, 6.0, size=n)
+
+    # --- patients ---
+    ages = np.minimum(65 + rng.gamma(2.0, 6.0, size=n), 104)
+    birth_days = (ages * 365.25).astype(int) + rng.integers(0, 365, size=n)
+    first = rng.integers(0, len(FIRST_NAMES), size=n).tolist()
+    last = rng.integers(0, len(LAST_NAMES), size=n).tolist()
+    genders = _choice(rng, GENDERS, n)
+    patients = [
+        (
+            patient_ids[i], f"{FIRST_NAMES[first[i]]} {LAST_NAMES[last[i]]}",
+            AS_OF - timedelta(days=int(birth_days[i])), genders[i],
+            f"555-{(start + i) % 10000:04d}", f"synthetic.{start + i}@example.org",
+        )
+        for i in range(n)
+    ]
+
+    # --- history ---
+    dx = _code_arrays(rng, catalogs["dx"], 2.5, n, minimum=1)
+    tx = _code_arrays(rng, catalogs["tx"], 2.0, n)
+    rx = _code_arrays(rng, catalogs["rx"], 1.5 + 4 * frailty, n)
+    sx = _code_arrays(rng, catalogs["sx"], 1.0, n)
+    history_ids = _uuids(rng, n)
+    history = [
+        (history_ids[i], patient_ids[i], dx[i], tx[i], rx[i], sx[i], SYNTHETIC_CREATED_AT)
+        for i in range(n)
+    ]
+
+    # --- ADL / IADL (higher frailty -> lower scores) ---
+    adl = {
+        item: np.clip(np.rint(top * (1 - frailty) + rng.normal(0, 0.5, size=n)), 0, top).astype(int)
+        for item, top in ADL_MAX.items()
+    }
+    iadl = {item: (rng.random(n) > frailty * 1.3).astype(int) for item in IADL_ITEMS}
+    assessed_on = [AS_OF - timedelta(days=int(d)) for d in rng.integers(0, 365, size=n)]
+    adl_rows = [
+        (patient_ids[i], assessed_on[i], *(int(adl[item][i]) for item in ADL_MAX), None)
+        for i in range(n)
+    ]
+    iadl_rows = [
+        (patient_ids[i], assessed_on[i], *(int(iadl[item][i]) for item in IADL_ITEMS), None)
+        for i in range(n)
+    ]
+
+    # --- PRAPARE (higher deprivation -> more unmet needs) ---
+    answers = {field: rng.choice(len(p), size=n, p=p) for field, p in PRAPARE_CHOICES.items()}
+    race = rng.choice(len(RACES), size=n, p=[p for _, p in RACES])
+    for j, (column, _) in enumerate(RACES):
+        answers[column] = (race == j).astype(int)
+    for column, rate in UNMET_NEEDS.items():
+        answers[column] = (rng.random(n) < deprivation * rate * 3).astype(int)
+    answers["unmet_no_answer"] = (rng.random(n) < 0.02).astype(int)
+    answers["household_size"] = 1 + rng.poisson(0.8, size=n)
+    z_codes = _z_code_lists(_rules, answers, n)
+    prapare_ids = _uuids(rng, n)
+    prapare_values = np.column_stack([answers[c] for c in PRAPARE_COLUMNS]).tolist()
+    prapare_rows = [
+        (prapare_ids[i], patient_ids[i], assessed_on[i], "Synthetic", None, *prapare_values[i], z_codes[i])
+        for i in range(n)
+    ]
+
+    # --- hazards, risks, recommendation settings ---
+    found = [dict() for _ in range(n)]
+    for rules, scores in ((catalogs["adl_hazards"], adl), (catalogs["iadl_hazards"], iadl)):
+        for item, low, high, subclass in rules:
+            if item not in scores or subclass is None:
+                continue
+            for i in np.flatnonzero((scores[item] >= low) & (scores[item] <= high)).tolist():
+                found[i].setdefault(subclass, item)
+    pairs = [(i, subclass, item) for i in range(n) for subclass, item in found[i].items()]
+    m = len(pairs)
+    hazard_ids = _uuids(rng, m)
+    risk_ids = _uuids(rng, m)
+    rec_ids = _uuids(rng, m)
+    owner = np.array([i for i, _, _ in pairs], dtype=int)
+    severity = np.round(np.clip(rng.normal(2 + 6 * frailty[owner], 1.5), 0, 10), 1).tolist()
+    likelihood = np.clip(np.rint(rng.normal(1 + 4 * frailty[owner], 1.0)), 0, 6).astype(int).tolist()
+    picks = rng.random(m).tolist()
+    frequencies = _choice(rng, FREQUENCIES, m)
+    costs = np.round(rng.lognormal(4.0, 0.6, size=m), 2).tolist()
+    selected = (rng.random(m) < 0.85).tolist()
+
+    hazards, risks, settings = [], [], []
+    for k, (i, subclass, item) in enumerate(pairs):
+        hazards.append((hazard_ids[k], patient_ids[i], item, subclass))
+        score = severity[k] * likelihood[k]
+        risks.append((risk_ids[k], hazard_ids[k], patient_ids[i], severity[k], likelihood[k], score))
+        options = catalogs["services"].get(subclass)
+        if options:
+            label, category = options[int(picks[k] * len(options))]
+            priority = "High" if score >= 30 else "Medium" if score >= 12 else "Low"
+            settings.append((
+                rec_ids[k], patient_ids[i], subclass, label, category,
+                frequencies[k], costs[k], priority, selected[k],
+            ))
+
+    return {
+        "patients": (("patient_id", "name", "dob", "gender", "phone", "email"), patients),
+        "patient_history": (
+            ("history_id", "patient_id", "dx_codes", "tx_codes", "rx_codes", "sx_codes", "created_at"), history
+        ),
+        "adl_answers": (("patient_id", "date_completed") + tuple(ADL_MAX) + ("answers",), adl_rows),
+        "iadl_answers": (("patient_id", "date_completed") + IADL_ITEMS + ("answers",), iadl_rows),
+        "prapare_answers": (
+            ("prapare_id", "patient_id", "date_completed", "assessed_by", "notes") + PRAPARE_COLUMNS + ("z_codes",),
+            prapare_rows,
+        ),
+        "hazards": (("hazard_id", "patient_id", "description", "hazard_type"), hazards),
+        "risks": (("risk_id", "hazard_id", "patient_id", "severity", "likelihood", "risk_score"), risks),
+        "recommendation_settings": (
+            ("rec_id", "patient_id", "hazard_code", "service_description", "service_category",
+             "frequency", "estimated_cost", "priority", "selected"),
+            settings,
+        ),
+    }
+
+
+def _seed_shard(task):
+    catalogs, seed, shard, start, count = task
+    tables = generate_shard(catalogs, seed, shard, start, count)
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        cur = conn.cursor()
+        for table, (columns, rows) in tables.items():
+            copy_upsert(cur, table, columns, rows)
+        conn.commit()
+        return take_timings()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _set_bulk_load_triggers(cur, enabled):
+    for trigger in BULK_LOAD_DISABLED_TRIGGERS:
+        cur.execute(f"ALTER TABLE patient_history {'ENABLE' if enabled else 'DISABLE'} TRIGGER {trigger}")
+
+
+def rebuild_code_usage(cur):
+    """Recount code_usage from patient_history (as in init.sql)."""
+    cur.execute("""
+        INSERT INTO code_usage (code_type, code, usage_count)
+        SELECT code_type, code, COUNT(*)
+        FROM (
+            SELECT 'dx' AS code_type, unnest(dx_codes) AS code FROM patient_history
+            UNION ALL SELECT 'tx', unnest(tx_codes) FROM patient_history
+            UNION ALL SELECT 'rx', unnest(rx_codes) FROM patient_history
+            UNION ALL SELECT 'sx', unnest(sx_codes) FROM patient_history
+        ) u
+        WHERE code IS NOT NULL
+        GROUP BY code_type, code
+        ORDER BY code_type, code
+        ON CONFLICT (code_type, code) DO UPDATE SET usage_count = EXCLUDED.usage_count
+    """)
+
+
+def seed_synthetic_cohort(patients, seed=DEFAULT_SEED, workers=None):
+    """Generate and load `patients` synthetic patients; returns per-table timings summed over shards."""
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        catalogs = load_catalogs(conn.cursor(), seed)
+        _set_bulk_load_triggers(conn.cursor(), False)
+        conn.commit()
+    finally:
+        conn.close()
+
+    tasks = [
+        (catalogs, seed, shard, start, min(SHARD_PATIENTS, patients - start))
+        for shard, start in enumerate(range(0, patients, SHARD_PATIENTS))
+    ]
+    totals = {}
+    done = 0
+    try:
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            for timings in pool.imap_unordered(_seed_shard, tasks):
+                for table, staged, merged, seconds in timings:
+                    t = totals.setdefault(table, [0, 0, 0.0])
+                    t[0] += staged
+                    t[1] += merged
+                    t[2] += seconds
+                done += 1
+                print(f"  shard {done}/{len(tasks)} loaded")
+    finally:
+        # Shards that committed before a failure are counted too
+        started = time.perf_counter()
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            cur = conn.cursor()
+            _set_bulk_load_triggers(cur, True)
+            rebuild_code_usage(cur)
+            conn.commit()
+        finally:
+            conn.close()
+        print(f"  code_usage rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return [(table, *t) for table, t in totals.items()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="seed_runner.py synthetic", description="Seed a synthetic cohort for load testing")
+    parser.add_argument("--patients", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    print(f"\n🌱 Seeding {args.patients} synthetic patients (seed {args.seed})")
+    started = time.perf_counter()
+    try:
+        timings = seed_synthetic_cohort(args.patients, args.seed, args.workers)
+    except Exception as e:
+        print(f"❌ Error seeding synthetic cohort: {e}")
+        raise
+    print_timings(timings)
+    print(f"✅ Synthetic cohort seeded in {time.perf_counter() - started:.1f}s (table times are summed over workers)")
+
+
+if __name__ == "__main__":
+    main()
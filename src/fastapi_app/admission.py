@@ -0,0 +1,185 @@
+"""
+Admission control: per-lane concurrency limits with bounded wait queues.
+
+Each request is assigned to a lane by method and path prefix. Heavy report
+and auto-generate routes share a small lane, bulk imports and exports (which
+hold their slot for minutes) get an even smaller one, interactive form
+submits get a reserved lane of their own, and everything else goes to the
+default lane, so a burst of reports can never take all workers from ADL/IADL
+saves and a few exports can never starve report generation. When a
+lane's queue is full (or a queued request waits too long) the client gets
+429 with Retry-After.
+
+Limits are set with ADMISSION_<LANE>_CONCURRENCY / ADMISSION_<LANE>_QUEUE and
+route rules with ADMISSION_<LANE>_ROUTES ("POST /adl/submit,GET /fhir/" ...).
+"""
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+
+from responses import dumps
+
+HEAVY_ROUTES = [
+    "POST /recommendations/generate_report",
+    "POST /risk/auto_generate",
+    "POST /social_risk/auto_generate",
+    "GET /recommendations/by_patient",
+]
+
+# Streamed or BackgroundTask jobs that run inside the request for minutes
+BULK_ROUTES = [
+    "GET /fhir/",
+    "POST /import/",
+    "POST /analytics/",
+]
+
+INTERACTIVE_ROUTES = [
+    "POST /adl/submit",
+    "POST /iadl/submit",
+    "POST /prapare/submit",
+    "POST /history/submit",
+    "POST /patients/create",
+    "POST /risk/create",
+    "POST /risk/update",
+    "POST /social_risk/create",
+    "POST /social_risk/update",
+    "POST /recommendations/save",
+    "POST /sync/push",
+]
+
+# Never queued or rejected (health checks, docs, the stats endpoint itself)
+EXEMPT_PATHS = {"/", "/admission/stats", "/docs", "/openapi.json"}
+
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+
+def _routes(lane: str, default: List[str]) -> List[Tuple[str, str]]:
+    raw = os.getenv(f"ADMISSION_{lane.upper()}_ROUTES")
+    entries = [r.strip() for r in raw.split(",") if r.strip()] if raw else default
+    rules = []
+    for entry in entries:
+        method, _, prefix = entry.partition(" ")
+        rules.append((method.upper(), prefix))
+    return rules
+
+
+class Lane:
+    def __init__(self, name: str, concurrency: int, max_queue: int, routes: List[Tuple[str, str]]):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.routes = routes
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_env(cls, name: str, concurrency: int, max_queue: int, routes: List[str] = ()):
+        prefix = f"ADMISSION_{name.upper()}"
+        return cls(
+            name,
+            int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+            int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+            _routes(name, list(routes)),
+        )
+
+    def matches(self, method: str, path: str) -> bool:
+        return any(method == m and path.startswith(p) for m, p in self.routes)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self.semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+LANES = [
+    Lane.from_env("heavy", 4, 16, HEAVY_ROUTES),
+    Lane.from_env("bulk", 2, 8, BULK_ROUTES),
+    Lane.from_env("interactive", 16, 64, INTERACTIVE_ROUTES),
+    Lane.from_env("default", 32, 128),
+]
+
+
+def lane_for(method: str, path: str) -> Lane:
+    for lane in LANES[:-1]:
+        if lane.matches(method, path):
+            return lane
+    return LANES[-1]
+
+
+def admission_stats() -> Dict[str, Dict[str, int]]:
+    return {lane.name: lane.stats() for lane in LANES}
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware, so the slot is held until the body (including streams) is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        lane = lane_for(scope["method"], scope["path"])
+        if not await lane.acquire():
+            await self._reject(send, lane)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+    async def _reject(self, send, lane: Lane):
+        body = dumps({"detail": f"Server busy ({lane.name} requests); retry later"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
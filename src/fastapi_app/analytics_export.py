@@ -0,0 +1,201 @@
+"""
+Columnar (Parquet) export of the assessment tables for analysts.
+
+Each table is read through a server-side cursor and written as Arrow record
+batches into a Hive-partitioned Parquet dataset, one partition per month of
+date_completed:
+
+    <ANALYTICS_EXPORT_DIR>/<table>/month=2025-06/<run>-0.parquet
+
+Incremental exports use the sync change log (see init.sql section 17): a
+row's _txid is the transaction that last wrote it, and an export covers every
+transaction below the snapshot horizon, which becomes the table's watermark
+in analytics_export_watermarks. The next incremental run only reads rows
+written at or above that watermark, so a nightly run touches a day's changes
+instead of the whole table. Updated rows are appended again; readers keep the
+row with the highest _txid per id. Deleted rows are not exported.
+
+Usage:
+    python analytics_export.py [--full] [--table prapare_answers] [--out DIR]
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from database import engine
+
+ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR", "analytics_exports")
+EXPORT_BATCH_ROWS = int(os.getenv("ANALYTICS_EXPORT_BATCH_ROWS", "50000"))
+
+# table -> primary key column
+EXPORT_TABLES = {
+    "prapare_answers": "prapare_id",
+    "adl_answers": "adl_id",
+    "iadl_answers": "iadl_id",
+    "questionnaire_summary": "summary_id",
+}
+
+# Postgres type OID -> (Arrow type, value converter or None)
+_json = lambda v: None if v is None else json.dumps(v, default=str)
+_str = lambda v: None if v is None else str(v)
+PG_TYPES: Dict[int, Any] = {
+    16: (pa.bool_(), None),                        # bool
+    20: (pa.int64(), None),                        # int8
+    21: (pa.int16(), None),                        # int2
+    23: (pa.int32(), None),                        # int4
+    25: (pa.string(), None),                       # text
+    114: (pa.string(), _json),                     # json
+    700: (pa.float32(), None),                     # float4
+    701: (pa.float64(), None),                     # float8
+    1009: (pa.list_(pa.string()), None),           # text[]
+    1043: (pa.string(), None),                     # varchar
+    1082: (pa.date32(), None),                     # date
+    1114: (pa.timestamp("us"), None),              # timestamp
+    1184: (pa.timestamp("us", tz="UTC"), None),    # timestamptz
+    1700: (pa.float64(), lambda v: None if v is None else float(v)),  # numeric
+    2950: (pa.string(), _str),                     # uuid
+    3802: (pa.string(), _json),                    # jsonb
+}
+_FALLBACK = (pa.string(), _str)
+
+PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+
+
+def _export_sql(table: str, pk: str, incremental: bool) -> str:
+    # The horizon is computed in the same snapshot as the rows (REPEATABLE READ).
+    changed = (
+        "JOIN sync_changes c ON c.table_name = %(table)s AND c.row_id = t.{pk} "
+        "AND c.txid >= %(since)s AND c.txid < %(horizon)s"
+        if incremental else
+        "LEFT JOIN sync_changes c ON c.table_name = %(table)s AND c.row_id = t.{pk}"
+    ).format(pk=pk)
+    return f"""
+        SELECT t.*, c.txid AS _txid, to_char(t.date_completed, 'YYYY-MM') AS month
+        FROM {table} t
+        {changed}
+    """
+
+
+def _schema(description) -> pa.Schema:
+    return pa.schema([
+        pa.field(col.name, PG_TYPES.get(col.type_code, _FALLBACK)[0]) for col in description
+    ])
+
+
+def _record_batches(cursor, rows: list, schema: pa.Schema, converters: List[Optional[Callable]]) -> Iterator[pa.RecordBatch]:
+    while rows:
+        columns = list(zip(*rows))
+        arrays = [
+            pa.array(col if convert is None else [convert(v) for v in col], type=field.type)
+            for col, convert, field in zip(columns, converters, schema)
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+
+
+def _watermark(cursor, table: str) -> Optional[int]:
+    cursor.execute("SELECT txid FROM analytics_export_watermarks WHERE table_name = %s", (table,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def export_table(table: str, out_dir: str = ANALYTICS_EXPORT_DIR, full: bool = False) -> Dict[str, Any]:
+    """Export one table; incremental from its watermark unless full (or never exported)."""
+    pk = EXPORT_TABLES[table]
+    conn = engine.raw_connection()
+    started = time.perf_counter()
+    write_dir = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        since = None if full else _watermark(cursor, table)
+        cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+        horizon = cursor.fetchone()[0]
+        incremental = since is not None
+
+        rows = conn.cursor(name=f"analytics_export_{table}")
+        rows.execute(_export_sql(table, pk, incremental), {"table": table, "since": since, "horizon": horizon})
+        # A named cursor only has a description after the first fetch.
+        first = rows.fetchmany(EXPORT_BATCH_ROWS)
+        schema = _schema(rows.description)
+        converters = [PG_TYPES.get(col.type_code, _FALLBACK)[1] for col in rows.description]
+
+        run = datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        target = os.path.join(out_dir, table)
+        # A full export is written beside the old one and swapped in at the end.
+        write_dir = f"{target}.{run}.tmp" if not incremental else target
+        exported = 0
+
+        def counted() -> Iterator[pa.RecordBatch]:
+            nonlocal exported
+            for batch in _record_batches(rows, first, schema, converters):
+                exported += batch.num_rows
+                yield batch
+
+        ds.write_dataset(
+            counted(), write_dir, schema=schema, format="parquet",
+            partitioning=PARTITIONING, basename_template=f"{run}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        rows.close()
+        conn.rollback()
+
+        if not incremental:
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            if os.path.isdir(write_dir):
+                os.rename(write_dir, target)
+
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO analytics_export_watermarks (table_name, txid, rows_exported, mode, exported_at)
+            VALUES (%s, %s, %s, %s, NOW())
+            ON CONFLICT (table_name) DO UPDATE SET
+                txid = EXCLUDED.txid, rows_exported = EXCLUDED.rows_exported,
+                mode = EXCLUDED.mode, exported_at = EXCLUDED.exported_at
+        """, (table, horizon, exported, "incremental" if incremental else "full"))
+        conn.commit()
+        return {
+            "table": table,
+            "mode": "incremental" if incremental else "full",
+            "since_txid": since,
+            "watermark_txid": horizon,
+            "rows": exported,
+            "seconds": round(time.perf_counter() - started, 3),
+            "path": target,
+        }
+    except Exception:
+        conn.rollback()
+        # Don't leave a half-written full export behind
+        if write_dir and write_dir != target and os.path.isdir(write_dir):
+            shutil.rmtree(write_dir, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+
+def export_all(out_dir: str = ANALYTICS_EXPORT_DIR, full: bool = False, tables: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    return [export_table(t, out_dir, full) for t in (tables or EXPORT_TABLES)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export assessment tables to partitioned Parquet")
+    parser.add_argument("--full", action="store_true", help="re-export everything instead of changes since the last export")
+    parser.add_argument("--table", action="append", choices=sorted(EXPORT_TABLES), help="repeat to export several tables")
+    parser.add_argument("--out", default=ANALYTICS_EXPORT_DIR)
+    args = parser.parse_args()
+
+    for result in export_all(args.out, args.full, args.table):
+        print(f"✅ {result['table']}: {result['rows']} rows ({result['mode']}) in {result['seconds']}s -> {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
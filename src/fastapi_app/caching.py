@@ -0,0 +1,122 @@
+"""
+Conditional GET support (ETag / If-None-Match / Cache-Control) for
+reference-data endpoints. The ETag is derived from the versions of the tables
+an endpoint reads; table_versions is bumped by a statement-level trigger on
+every write (see init.sql).
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine
+
+REFERENCE_CACHE_MAX_AGE = int(os.getenv("REFERENCE_CACHE_MAX_AGE", "300"))
+
+
+def table_versions(db: Session, tables: Iterable[str]) -> str:
+    """Return a stable "table:version,..." string for the given tables."""
+    tables = sorted(set(tables))
+    rows = db.execute(
+        text("SELECT table_name, version FROM table_versions WHERE table_name = ANY(:tables)"),
+        {"tables": tables},
+    ).fetchall()
+    versions = {row.table_name: row.version for row in rows}
+    return ",".join(f"{t}:{versions.get(t, 0)}" for t in tables)
+
+
+def compute_etag(request: Request, db: Session, tables: Iterable[str], versions: Optional[str] = None) -> str:
+    digest = hashlib.sha1()
+    digest.update((versions if versions is not None else table_versions(db, tables)).encode())
+    # Different query strings (pagination) and representations (NDJSON) are
+    # different resources as far as caches are concerned.
+    digest.update(request.url.query.encode())
+    digest.update(request.headers.get("accept", "").encode())
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    if "*" in candidates:
+        return True
+    # Weak comparison: W/"x" and "x" are equivalent for If-None-Match.
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+
+
+def conditional_response(
+    request: Request,
+    db: Session,
+    tables: Iterable[str],
+    build: Callable[[], Response],
+    max_age: int = REFERENCE_CACHE_MAX_AGE,
+    versions: Optional[str] = None,
+) -> Response:
+    """Answer 304 when the client's ETag is current, otherwise build the response.
+
+    Either way the ETag and Cache-Control headers are attached so clients can
+    keep the body across sessions and revalidate cheaply. Pass `versions` in
+    place of table_versions(db, tables) when the body is cached, so the ETag
+    is built from exactly what the body was built from (it may also carry a
+    digest of the body itself).
+    """
+    etag = compute_etag(request, db, tables, versions)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+        "Vary": "Accept",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response = build()
+    response.headers.update(headers)
+    return response
+
+
+class VersionedCache:
+    """In-process objects built from a table, rebuilt when its table_versions entry changes.
+
+    The version is checked at most every `check_interval` seconds, so hot
+    paths normally never touch the database.
+    """
+
+    def __init__(self, build: Callable[[Any, str], Any], check_interval: float):
+        self.build = build  # (connection, table) -> object
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, Any]] = {}
+        self._checked: Dict[str, float] = {}
+
+    def _fresh(self, table: str):
+        entry = self._entries.get(table)
+        if entry and time.monotonic() - self._checked.get(table, 0) < self.check_interval:
+            return entry
+        return None
+
+    def get(self, table: str) -> Any:
+        entry = self._fresh(table)
+        if entry:
+            return entry[1]
+        with self._lock:
+            entry = self._fresh(table)
+            if entry:
+                return entry[1]
+            entry = self._entries.get(table)
+            with engine.connect() as conn:
+                version = conn.execute(
+                    text("SELECT COALESCE((SELECT version FROM table_versions WHERE table_name = :t), 0)"),
+                    {"t": table},
+                ).scalar()
+                if entry is None or entry[0] != version:
+                    entry = (version, self.build(conn, table))
+                    self._entries[table] = entry
+            self._checked[table] = time.monotonic()
+            return entry[1]
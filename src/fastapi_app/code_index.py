@@ -0,0 +1,153 @@
+"""
+In-memory search index over the code catalogs (dx/tx/rx/sx_codes).
+
+Codes are kept in a sorted list so a code prefix is two bisects, and
+description words go into a sorted vocabulary with postings lists so every
+query word is an exact token match except the last one, which is matched as
+a prefix (autocomplete). The index for a catalog is rebuilt when its
+table_versions entry changes; the version is checked at most every
+CODE_INDEX_CHECK_INTERVAL seconds so searches normally never touch the DB.
+"""
+import heapq
+import os
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+
+from caching import VersionedCache
+
+CODE_INDEX_CHECK_INTERVAL = float(os.getenv("CODE_INDEX_CHECK_INTERVAL", "5"))
+
+# A short last word ("d") can expand to thousands of words; past this many,
+# walk candidates in code order and check their words instead of merging
+# postings lists.
+PREFIX_EXPANSION_LIMIT = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_code(code: str) -> str:
+    """Uppercase and drop dots, so "e11.9", "E119" and "E11.9" all match."""
+    return code.upper().replace(".", "").strip()
+
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN_RE.findall(value.lower())
+
+
+class CodeIndex:
+    def __init__(self, rows: Sequence[Tuple[str, str]]):
+        entries = sorted(((normalize_code(code), code, description or "") for code, description in rows))
+        self.keys = [e[0] for e in entries]
+        self.codes = [e[1] for e in entries]
+        self.descriptions = [e[2] for e in entries]
+        self.tokens = [frozenset(tokenize(d)) for d in self.descriptions]
+        postings: Dict[str, List[int]] = {}
+        for i, tokens in enumerate(self.tokens):
+            for token in tokens:
+                postings.setdefault(token, []).append(i)
+        self.vocabulary = sorted(postings)
+        # ids were appended in code order, so each list is already sorted
+        self.ordered_postings = {token: tuple(ids) for token, ids in postings.items()}
+        self.postings = {token: frozenset(ids) for token, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _code_prefix(self, prefix: str) -> range:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_right(self.keys, prefix + "\uffff")
+        return range(lo, hi)
+
+    def _vocabulary_prefix(self, prefix: str) -> List[str]:
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_right(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[lo:hi]
+
+    def _has_prefix(self, i: int, prefix: str) -> bool:
+        return any(t.startswith(prefix) for t in self.tokens[i])
+
+    def _description_matches(self, tokens: List[str], limit: int, skip: Set[int]) -> List[int]:
+        """First `limit` ids (code order) outside `skip` matching every word, the last as a prefix.
+
+        One sorted id stream drives the walk (the rarest whole word's postings,
+        or the last word's postings merged) and the rest are membership checks,
+        so it stops as soon as `limit` matches are found.
+        """
+        *whole, last = tokens
+        filters = []
+        for token in whole:
+            ids = self.postings.get(token)
+            if not ids:
+                return []
+            filters.append((len(ids), token))
+        filters.sort()
+        expansions = self._vocabulary_prefix(last)
+        if not expansions:
+            return []
+
+        check_prefix = True
+        if len(expansions) <= PREFIX_EXPANSION_LIMIT and (
+            not filters or sum(len(self.postings[t]) for t in expansions) <= filters[0][0]
+        ):
+            driver = heapq.merge(*(self.ordered_postings[t] for t in expansions))
+            check_prefix = False
+        elif len(filters) == 1:
+            driver = self.ordered_postings[filters.pop()[1]]
+        elif filters:
+            # Several whole words: intersect their postings (rarest first) in C,
+            # then sort the usually small intersection once.
+            candidates = self.postings[filters[0][1]]
+            for _, token in filters[1:]:
+                candidates = candidates & self.postings[token]
+                if not candidates:
+                    return []
+            driver = sorted(candidates)
+            filters = []
+        else:
+            driver = range(len(self.codes))
+        required = [self.postings[t] for _, t in filters]
+
+        matches: List[int] = []
+        previous = -1
+        for i in driver:
+            if i == previous or i in skip:
+                continue
+            previous = i
+            if all(i in ids for ids in required) and (not check_prefix or self._has_prefix(i, last)):
+                matches.append(i)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
+        """Code-prefix matches first, then description matches, each in code order."""
+        results: List[int] = []
+        key = normalize_code(query)
+        if key:
+            for i in self._code_prefix(key):
+                results.append(i)
+                if len(results) >= limit:
+                    break
+        tokens = tokenize(query)
+        if tokens and len(results) < limit:
+            results.extend(self._description_matches(tokens, limit - len(results), set(results)))
+        return [{"code": self.codes[i], "description": self.descriptions[i]} for i in results]
+
+    def lookup(self, codes: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Exact (dot/case-insensitive) code -> description; None when unknown."""
+        found = {}
+        for code in codes:
+            key = normalize_code(code)
+            i = bisect_left(self.keys, key)
+            found[code] = self.descriptions[i] if i < len(self.keys) and self.keys[i] == key else None
+        return found
+
+
+def _load_index(conn, table: str) -> CodeIndex:
+    return CodeIndex(conn.execute(text(f"SELECT code, description FROM {table}")).fetchall())
+
+
+catalog_indexes = VersionedCache(_load_index, CODE_INDEX_CHECK_INTERVAL)
@@ -1,14 +1,90 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
+import threading
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/care_db")
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# How often a long-query route checks whether its HTTP client went away
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.5"))
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    """Scope statement_timeout to the transaction and remember which backend runs it."""
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is None:
+        return
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+    with session.info["pid_lock"]:
+        session.info["backend_pid"] = connection.connection.dbapi_connection.get_backend_pid()
+
+
+def _forget_backend(session):
+    # The connection goes back to the pool after this; never cancel it again.
+    lock = session.info.get("pid_lock")
+    if lock is not None:
+        with lock:
+            session.info.pop("backend_pid", None)
+
+event.listen(SessionLocal, "after_commit", _forget_backend)
+event.listen(SessionLocal, "after_rollback", _forget_backend)
+
+
+def cancel_backend_query(db) -> bool:
+    """pg_cancel_backend the session's in-flight query, if it has one."""
+    with db.info["pid_lock"]:
+        pid = db.info.get("backend_pid")
+        if pid is None:
+            return False
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+    return True
+
+
+def _close_session(db):
+    # db.close() does not fire after_rollback, so forget the backend first;
+    # holding pid_lock also waits out a cancel that is already running.
+    _forget_backend(db)
+    db.close()
+
+
+async def _cancel_on_disconnect(request: Request, db):
+    try:
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+        await run_in_threadpool(cancel_backend_query, db)
+    except Exception as e:
+        print("Error in _cancel_on_disconnect:", e)
+
+
+def get_db_with_timeout(timeout_ms: int):
+    """get_db for long-running read routes.
+
+    Every transaction gets SET LOCAL statement_timeout, and the running query
+    is cancelled with pg_cancel_backend as soon as the HTTP client disconnects.
+    """
+    async def dependency(request: Request):
+        db = SessionLocal()
+        db.info["statement_timeout_ms"] = timeout_ms
+        db.info["pid_lock"] = threading.Lock()
+        watcher = asyncio.create_task(_cancel_on_disconnect(request, db))
+        try:
+            yield db
+        finally:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+            await run_in_threadpool(_close_session, db)
+    return dependency
@@ -0,0 +1,127 @@
+"""
+Diagnosis code -> hazard rules from dx_code_hazard_map.
+
+A rule is an exact code ("E11.9"), a prefix covering a code family ("E11"
+matches E11, E11.9, E11.65, ...) or an inclusive range of categories
+("E08".."E13"). Codes are compared case-insensitively without dots. Ranges
+are expanded into prefixes when the rules are loaded, and every prefix goes
+into a character trie, so matching a code walks at most len(code) nodes.
+The most specific rule wins: an exact rule, then the longest prefix.
+
+The compiled rules are cached per worker and rebuilt when the table's
+table_versions entry changes.
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from caching import VersionedCache
+from code_index import normalize_code
+
+HAZARD_RULES_CHECK_INTERVAL = float(os.getenv("HAZARD_RULES_CHECK_INTERVAL", "5"))
+
+# (hazard_subclass_id, hazard_class_id)
+Hazard = Tuple[Optional[str], Optional[str]]
+
+# Cap on the number of prefixes a single range rule may expand into
+MAX_RANGE_EXPANSION = 1000
+
+
+def expand_range(start: str, end: str) -> List[str]:
+    """Expand an inclusive range like E08..E13 or I20.0..I20.9 into prefixes.
+
+    Both ends must have the same length and differ only in a trailing run of
+    digits, which is how ICD-10 categories and subcategories are numbered.
+    """
+    start, end = normalize_code(start), normalize_code(end)
+    if len(start) != len(end) or start > end:
+        raise ValueError(f"invalid range {start}..{end}")
+    common = 0
+    while common < len(start) and start[common] == end[common]:
+        common += 1
+    while common > 0 and start[common - 1].isdigit():
+        common -= 1
+    head, lo, hi = start[:common], start[common:], end[common:]
+    if not lo:
+        return [start]
+    if not (lo.isdigit() and hi.isdigit()):
+        raise ValueError(f"range {start}..{end} must differ only in trailing digits")
+    if int(hi) - int(lo) >= MAX_RANGE_EXPANSION:
+        raise ValueError(f"range {start}..{end} is too wide")
+    return [f"{head}{n:0{len(lo)}d}" for n in range(int(lo), int(hi) + 1)]
+
+
+class _Node:
+    __slots__ = ("children", "hazard", "explicit")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.hazard: Optional[Hazard] = None
+        self.explicit = False
+
+
+class DxHazardRules:
+    def __init__(self, rows: Iterable[Tuple[str, str, Optional[str], Optional[str], Optional[str]]]):
+        """rows: (dx_code, match_type, dx_code_end, hazard_subclass_id, hazard_class_id)."""
+        self.exact: Dict[str, Hazard] = {}
+        self.root = _Node()
+        self.rule_count = 0
+        for dx_code, match_type, dx_code_end, subclass_id, class_id in rows:
+            hazard = (subclass_id, class_id)
+            try:
+                if match_type == "prefix":
+                    self._add_prefix(normalize_code(dx_code), hazard, explicit=True)
+                elif match_type == "range":
+                    for prefix in expand_range(dx_code, dx_code_end or dx_code):
+                        self._add_prefix(prefix, hazard, explicit=False)
+                else:
+                    self.exact[normalize_code(dx_code)] = hazard
+                self.rule_count += 1
+            except ValueError as e:
+                print("Error in DxHazardRules:", e)
+
+    def _add_prefix(self, prefix: str, hazard: Hazard, explicit: bool):
+        node = self.root
+        for ch in prefix:
+            node = node.children.setdefault(ch, _Node())
+        # A prefix spelled out in its own rule beats one that came from a range.
+        if node.hazard is None or explicit or not node.explicit:
+            node.hazard = hazard
+            node.explicit = node.explicit or explicit
+
+    def match(self, code: str) -> Optional[Hazard]:
+        key = normalize_code(code)
+        hazard = self.exact.get(key)
+        if hazard is not None:
+            return hazard
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.hazard is not None:
+                hazard = node.hazard
+        return hazard
+
+    def match_all(self, codes: Iterable[str]) -> List[Tuple[str, Hazard]]:
+        """(code, (subclass_id, class_id)) for every code that has a rule, in input order."""
+        matches = []
+        for code in codes:
+            hazard = self.match(code)
+            if hazard is not None:
+                matches.append((code, hazard))
+        return matches
+
+
+def _load_rules(conn, table: str) -> DxHazardRules:
+    return DxHazardRules(conn.execute(text(
+        f"SELECT dx_code, match_type, dx_code_end, hazard_subclass_id, hazard_class_id FROM {table}"
+    )).fetchall())
+
+
+_rules = VersionedCache(_load_rules, HAZARD_RULES_CHECK_INTERVAL)
+
+
+def dx_hazard_rules() -> DxHazardRules:
+    return _rules.get("dx_code_hazard_map")
@@ -1,4 +1,7 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from responses import ORJSONResponse
+from admission import AdmissionControlMiddleware, admission_stats
 from routers import adl
 from routers import patients
 from routers import patient_history
@@ -15,8 +18,16 @@ from routers import prapare
 from routers import social_hazards
 from routers import social_risk
 from routers import community_resources
+from routers import sync
+from routers import assessment_import
+from routers import fhir
+from routers import analytics
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+# Compress larger bodies (JSON or MessagePack) for clients on slow links
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Per-lane concurrency limits; heavy routes cannot starve interactive submits
+app.add_middleware(AdmissionControlMiddleware)
 app.include_router(adl.router)
 app.include_router(patients.router)
 app.include_router(patient_history.router)
@@ -33,7 +44,16 @@ app.include_router(prapare.router)
 app.include_router(social_hazards.router)
 app.include_router(social_risk.router)
 app.include_router(community_resources.router, prefix="/community_resources")
+app.include_router(sync.router)
+app.include_router(assessment_import.router)
+app.include_router(fhir.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 def root():
     return {"message": "Care Management FastAPI backend"}
+
+@app.get("/admission/stats")
+def get_admission_stats():
+    """Active requests, queue depth and rejection counts per admission lane."""
+    return admission_stats()
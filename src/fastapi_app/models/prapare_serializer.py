@@ -0,0 +1,74 @@
+"""
+Shared mapping from prapare_answers rows to the PRAPARE read responses.
+
+The response field list, the columns to select and the defaults for unset
+answers are worked out once at import. Rows come straight from the database,
+so they are not re-validated: the read routes return the plain dict through
+ORJSONResponse.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import select
+
+from .prapare_answers import PRAPAREAnswers
+from .prapare_schemas import PRAPAREQuestionnaireResponse
+
+RESPONSE_FIELDS = tuple(PRAPAREQuestionnaireResponse.model_fields)
+
+# Multi-select checkboxes: stored as 0/1, returned as booleans
+BOOL_FIELDS = frozenset(
+    name for name, field in PRAPAREQuestionnaireResponse.model_fields.items() if field.annotation is bool
+)
+
+# Returned when an answer was never recorded
+READ_DEFAULTS: Dict[str, Any] = {
+    "assessed_by": "Gradio User",
+    "notes": "",
+    "hispanic": 2,                 # Unknown
+    "farm_work": 2,                # Decline to answer
+    "military_service": 2,         # Decline to answer
+    "primary_language": 0,         # English
+    "household_size": 1,
+    "housing_situation": 3,        # Decline to answer
+    "housing_worry": 3,            # Decline to answer
+    "primary_insurance": 0,        # None
+    "annual_income": 5,            # Unknown
+    "education_level": 6,          # Unknown
+    "employment_status": 4,        # Decline to answer
+    "transportation_barrier": 0,   # No
+    "social_contact": 4,           # Decline to answer
+    "stress_level": 6,             # Decline to answer
+    "incarceration_history": 2,    # Decline to answer
+    "feel_safe": 3,                # Decline to answer
+    "domestic_violence": 0,        # No
+    "food_worry": 4,               # Decline to answer
+    "food_didnt_last": 4,          # Decline to answer
+    "need_food_help": 3,           # Decline to answer
+}
+
+_columns = PRAPAREAnswers.__table__.c
+READ_COLUMNS = tuple(_columns[name] for name in RESPONSE_FIELDS if name in _columns)
+
+
+def latest_prapare_statement(patient_id):
+    """Most recent assessment for a patient, selecting only the response columns."""
+    return (
+        select(*READ_COLUMNS)
+        .where(_columns.patient_id == patient_id)
+        .order_by(_columns.date_completed.desc())
+        .limit(1)
+    )
+
+
+def prapare_response_dict(row) -> Dict[str, Any]:
+    """Response body for a row from latest_prapare_statement (UUID/date values left for orjson)."""
+    data = row._asdict()
+    for name, default in READ_DEFAULTS.items():
+        if data[name] is None:
+            data[name] = default
+    for name in BOOL_FIELDS:
+        data[name] = bool(data[name])
+    data["household_size"] = data["household_size"] or 1
+    data["raw_responses"] = data["raw_responses"] or {}
+    data["z_codes"] = data["z_codes"] or []
+    return data
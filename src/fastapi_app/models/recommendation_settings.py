@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Text, ForeignKey, Numeric, Boolean, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from .adl_answers import Base  # Use the same Base as other models
+
+class RecommendationSettings(Base):
+    __tablename__ = "recommendation_settings"
+    rec_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id", ondelete="CASCADE"))
+    hazard_code = Column(Text, nullable=False)
+    service_description = Column(Text, nullable=False)
+    service_category = Column(Text)
+    frequency = Column(Text)
+    estimated_cost = Column(Numeric(12, 2), default=0.0)
+    provider = Column(Text)
+    priority = Column(Text, default="Medium")
+    notes = Column(Text)
+    selected = Column(Boolean, default=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now())
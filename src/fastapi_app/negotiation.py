@@ -0,0 +1,74 @@
+"""
+MessagePack content negotiation for routers used by low-bandwidth clients.
+Routers built with route_class=MsgPackRoute accept MessagePack request bodies
+(Content-Type: application/msgpack) and return MessagePack when the client
+sends Accept: application/msgpack. JSON stays the default both ways.
+"""
+from typing import Any, Callable, Coroutine
+
+import msgpack
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+
+from responses import MSGPACK_MEDIA_TYPE, MsgPackResponse, ORJSONResponse
+
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Headers that describe the JSON body and must not be copied to the
+# re-rendered MessagePack response.
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def _is_msgpack(media_type: str) -> bool:
+    return any(t in media_type for t in MSGPACK_MEDIA_TYPES)
+
+
+def accepts_msgpack(request: Request) -> bool:
+    return _is_msgpack(request.headers.get("accept", ""))
+
+
+class MsgPackRequest(Request):
+    """Request whose body is MessagePack but is presented to FastAPI as parsed JSON."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            try:
+                self._json = msgpack.unpackb(await self.body(), raw=False)
+            except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError):
+                raise HTTPException(status_code=400, detail="Invalid MessagePack body")
+        return self._json
+
+
+def _as_json_scope(scope: dict) -> dict:
+    # FastAPI only calls request.json() for JSON content types, so relabel
+    # the body; MsgPackRequest.json() does the actual decoding.
+    headers = [
+        (name, b"application/json" if name == b"content-type" else value)
+        for name, value in scope["headers"]
+    ]
+    return {**scope, "headers": headers}
+
+
+class MsgPackRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if _is_msgpack(request.headers.get("content-type", "")):
+                request = MsgPackRequest(_as_json_scope(request.scope), request.receive)
+            response = await original_route_handler(request)
+            if accepts_msgpack(request) and isinstance(response, ORJSONResponse):
+                headers = {
+                    name: value for name, value in response.headers.items()
+                    if name not in _BODY_HEADERS
+                }
+                response = MsgPackResponse(
+                    response.raw_content,
+                    status_code=response.status_code,
+                    headers=headers,
+                    background=response.background,
+                )
+            response.headers.setdefault("vary", "Accept")
+            return response
+
+        return route_handler
@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination and NDJSON streaming for list endpoints.
+Pages are addressed by an opaque `after` cursor built from the last row's
+sort keys, so deep pages cost the same as the first one.
+"""
+import base64
+import binascii
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine
+from responses import ORJSONResponse, dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+
+
+class KeysetQuery:
+    """A list query plus the output columns that give it a stable, unique order.
+
+    `select_sql` must expose every sort key as an output column; the last key
+    should be the primary key so the order is total.
+    """
+
+    def __init__(self, select_sql: str, sort_keys: Sequence[str]):
+        self.select_sql = select_sql
+        self.sort_keys = list(sort_keys)
+
+    def build(self, after: Optional[str], limit: Optional[int]):
+        params: Dict[str, Any] = {}
+        where = ""
+        if after:
+            values = decode_cursor(after, len(self.sort_keys))
+            placeholders = []
+            for i, value in enumerate(values):
+                params[f"_after_{i}"] = value
+                placeholders.append(f":_after_{i}")
+            keys = ", ".join(f"page.{k}" for k in self.sort_keys)
+            where = f"WHERE ({keys}) > ({', '.join(placeholders)})"
+        order = ", ".join(f"page.{k}" for k in self.sort_keys)
+        sql = f"SELECT * FROM ({self.select_sql}) AS page {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT :_limit"
+            params["_limit"] = limit
+        return text(sql), params
+
+    def cursor_for(self, row) -> str:
+        mapping = row._mapping
+        return encode_cursor([mapping[k] for k in self.sort_keys])
+
+
+def encode_cursor(values: Iterable[Any]) -> str:
+    return base64.urlsafe_b64encode(dumps(list(values))).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, width: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, orjson.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != width:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def iter_rows(statement, params: Optional[Dict[str, Any]] = None, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Any]]:
+    """Yield row batches from a server-side cursor on a dedicated connection.
+
+    The connection is opened inside the generator so streaming does not
+    depend on the request-scoped session, which is closed before a
+    StreamingResponse finishes sending.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(statement, params or {})
+        for partition in result.partitions():
+            yield partition
+
+
+def ndjson_response(lines: Iterable[bytes]) -> StreamingResponse:
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+
+def stream_ndjson(statement, params: Dict[str, Any], row_to_dict: Callable[[Any], Dict[str, Any]]) -> StreamingResponse:
+    def generate():
+        for batch in iter_rows(statement, params):
+            yield b"".join(dumps(row_to_dict(row)) + b"\n" for row in batch)
+    return ndjson_response(generate())
+
+
+def paginate(
+    request: Request,
+    db: Session,
+    query: KeysetQuery,
+    row_to_dict: Callable[[Any], Dict[str, Any]],
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    envelope: Optional[str] = None,
+):
+    """Return one keyset page (or the full list when no limit is given).
+
+    JSON responses keep the endpoint's existing body shape and carry the next
+    page's cursor in the X-Next-Cursor header. With Accept: application/x-ndjson
+    rows are streamed one per line instead.
+    """
+    if wants_ndjson(request):
+        statement, params = query.build(after, limit)
+        return stream_ndjson(statement, params, row_to_dict)
+
+    statement, params = query.build(after, limit + 1 if limit is not None else None)
+    rows = db.execute(statement, params).fetchall()
+    has_more = limit is not None and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+    items = [row_to_dict(row) for row in rows]
+    response = ORJSONResponse({envelope: items} if envelope else items)
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = query.cursor_for(rows[-1])
+    return response
@@ -0,0 +1,191 @@
+"""
+Cohort rescoring of PRAPARE assessments.
+
+/prapare/submit scores one assessment at a time, so a change to a scoring
+rule leaves every stored questionnaire_summary row and prapare_answers.z_codes
+array stale. This job reads prapare_answers in keyset-paged chunks, turns each
+chunk into NumPy columns, evaluates the compiled scoring rules
+(prapare_rules.py) on whole columns at once, and writes the results back
+with COPY + UPDATE ... FROM, one transaction per chunk.
+
+Usage:
+    python prapare_rescore.py [--chunk-size 50000]
+    python prapare_rescore.py --check-parity 100000
+"""
+import argparse
+import csv
+import io
+import os
+import time
+import typing
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from models.prapare_schemas import PRAPARESubmission
+from prapare_rules import CompiledRules, active_rules
+from routers.prapare import calculate_prapare_domain_scores, generate_prapare_z_codes
+
+RESCORE_CHUNK_ROWS = int(os.getenv("RESCORE_CHUNK_ROWS", "50000"))
+
+# domain -> questionnaire_summary column (interpersonal_safety has none)
+SUMMARY_COLUMNS = {
+    "housing_stability": "housing_stability_score",
+    "food_security": "food_security_score",
+    "transportation_access": "transportation_score",
+    "financial_strain": "economic_security_score",
+    "employment_education": "education_employment_score",
+    "social_isolation": "social_isolation_score",
+}
+
+
+def to_columns(rows: Sequence[Sequence], columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Row tuples -> {column: float array}; NULL becomes NaN, which fails every comparison."""
+    matrix = np.array(rows, dtype=float).reshape(len(rows), len(columns))
+    return {c: matrix[:, i] for i, c in enumerate(columns)}
+
+
+def z_code_lists(rules: CompiledRules, masks: np.ndarray) -> List[List[str]]:
+    if masks.shape[1] > 62:
+        return [[code for code, hit in zip(rules.z_codes, row) if hit] for row in masks.tolist()]
+    # Few distinct combinations occur, so build each list once per pattern.
+    patterns = masks.astype(np.int64) @ (1 << np.arange(masks.shape[1], dtype=np.int64))
+    unique, inverse = np.unique(patterns, return_inverse=True)
+    lists = [[code for bit, code in enumerate(rules.z_codes) if p >> bit & 1] for p in unique.tolist()]
+    return [lists[i] for i in inverse.tolist()]
+
+
+def rescore(rules: CompiledRules, cols: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], List[List[str]]]:
+    scores = rules.score_columns(cols)
+    return scores, z_code_lists(rules, rules.z_code_masks(cols, scores))
+
+
+def _fetch_chunk(cur, rules: CompiledRules, after: str, limit: int):
+    cur.execute(
+        f"SELECT prapare_id::text, {', '.join(rules.fields)} FROM prapare_answers "
+        "WHERE prapare_id > %s ORDER BY prapare_id LIMIT %s",
+        (after, limit),
+    )
+    return cur.fetchall()
+
+
+def _write_chunk(cur, ids: List[str], scores: Dict[str, np.ndarray], z_codes: List[List[str]]) -> Tuple[int, int]:
+    """COPY one chunk of results and apply them; returns (answers updated, summaries updated)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    score_rows = np.column_stack([scores[d] for d in SUMMARY_COLUMNS]).tolist()
+    for prapare_id, row, codes in zip(ids, score_rows, z_codes):
+        writer.writerow([prapare_id, *row, "{" + ",".join(codes) + "}"])
+    buffer.seek(0)
+    cur.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS prapare_rescored (prapare_id UUID, "
+        + ", ".join(f"{c} INTEGER" for c in SUMMARY_COLUMNS.values())
+        + ", z_codes TEXT[]) ON COMMIT DELETE ROWS"
+    )
+    cur.copy_expert(
+        f"COPY prapare_rescored (prapare_id, {', '.join(SUMMARY_COLUMNS.values())}, z_codes) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    cur.execute("""
+        UPDATE prapare_answers p SET z_codes = r.z_codes
+        FROM prapare_rescored r
+        WHERE p.prapare_id = r.prapare_id AND p.z_codes IS DISTINCT FROM r.z_codes
+    """)
+    answers_updated = cur.rowcount
+    assignments = ", ".join(f"{c} = r.{c}" for c in SUMMARY_COLUMNS.values())
+    changed = " OR ".join(f"q.{c} IS DISTINCT FROM r.{c}" for c in SUMMARY_COLUMNS.values())
+    cur.execute(f"""
+        UPDATE questionnaire_summary q SET {assignments}
+        FROM prapare_rescored r
+        WHERE q.prapare_id = r.prapare_id AND ({changed})
+    """)
+    return answers_updated, cur.rowcount
+
+
+def rescore_all(conn, chunk_size: int = RESCORE_CHUNK_ROWS) -> Dict[str, int]:
+    """Rescore every stored assessment with the active rules.
+
+    Commits after each chunk so the job can be rerun after a failure.
+    """
+    totals = {"assessments": 0, "answers_updated": 0, "summaries_updated": 0}
+    after = "00000000-0000-0000-0000-000000000000"
+    rules = active_rules()
+    cur = conn.cursor()
+    while True:
+        rows = _fetch_chunk(cur, rules, after, chunk_size)
+        if not rows:
+            break
+        ids = [r[0] for r in rows]
+        scores, z_codes = rescore(rules, to_columns([r[1:] for r in rows], rules.fields))
+        answers_updated, summaries_updated = _write_chunk(cur, ids, scores, z_codes)
+        conn.commit()
+        totals["assessments"] += len(rows)
+        totals["answers_updated"] += answers_updated
+        totals["summaries_updated"] += summaries_updated
+        after = ids[-1]
+    return totals
+
+
+def random_assessments(columns: Sequence[str], n: int, seed: int = 0, null_rate: float = 0.05) -> Dict[str, np.ndarray]:
+    """n random but valid assessments as columns; any answer is NULL (NaN) with probability null_rate."""
+    rng = np.random.default_rng(seed)
+    cols = {}
+    for c in columns:
+        annotation = PRAPARESubmission.model_fields[c].annotation
+        allowed = (0, 1) if annotation is bool else typing.get_args(annotation)
+        cols[c] = rng.choice(np.array(allowed, dtype=float), n)
+        # Unanswered questions take the scalar path's "not answered" branch
+        cols[c][rng.random(n) < null_rate] = np.nan
+    return cols
+
+
+def check_parity(rules: CompiledRules, cols: Dict[str, np.ndarray]) -> int:
+    """Compare the batch results with the scalar /prapare/submit functions; returns mismatches."""
+    scores, z_codes = rescore(rules, cols)
+    mismatches = 0
+    n = len(next(iter(cols.values())))
+    for i in range(n):
+        values = {c: (None if np.isnan(cols[c][i]) else int(cols[c][i])) for c in rules.fields}
+        submission = PRAPARESubmission.model_construct(**values)
+        expected = calculate_prapare_domain_scores(submission)
+        got = {d: int(scores[d][i]) for d in rules.domains}
+        if got != expected or z_codes[i] != generate_prapare_z_codes(submission, expected):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"Mismatch for {values}: {got} {z_codes[i]}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore stored PRAPARE assessments")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_ROWS)
+    parser.add_argument("--check-parity", type=int, metavar="N",
+                        help="compare batch and scalar scoring on N random assessments instead of rescoring")
+    args = parser.parse_args()
+
+    if args.check_parity:
+        rules = active_rules()
+        mismatches = check_parity(rules, random_assessments(rules.fields, args.check_parity))
+        print(f"{'✅' if not mismatches else '❌'} {mismatches} mismatches in {args.check_parity} assessments")
+        raise SystemExit(1 if mismatches else 0)
+
+    from database import engine
+    conn = engine.raw_connection()
+    try:
+        started = time.perf_counter()
+        totals = rescore_all(conn, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(
+            f"✅ Rescored {totals['assessments']} assessments in {elapsed:.1f}s "
+            f"({totals['answers_updated']} z_codes and {totals['summaries_updated']} summaries changed)"
+        )
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error rescoring: {e}")
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
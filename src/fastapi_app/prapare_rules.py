@@ -0,0 +1,245 @@
+"""
+Declarative PRAPARE domain scoring and Z-code rules.
+
+The rules live in a versioned JSON file (rules/prapare_scoring_v1.json, or
+PRAPARE_RULES_FILE) and are compiled once into a flat structure:
+
+- leaves: (slot, op, value) comparisons, where a slot is an answer column or,
+  for Z-code rules, an already computed domain score;
+- cases: (kind, leaf indices, points or code), kind "all" or "any";
+- terms: tuples of cases where the first matching case wins (if/elif).
+
+Each domain score is the sum of its terms capped at `max`; each Z-code term
+yields at most one code. A comparison on an unanswered (None/NaN) item is
+false. The same compiled rules back the scalar evaluator used by
+/prapare/submit and the NumPy evaluator used by batch rescoring, so the two
+cannot drift apart. The file is re-read when its mtime changes.
+"""
+import json
+import operator
+import os
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+PRAPARE_RULES_FILE = os.getenv(
+    "PRAPARE_RULES_FILE", os.path.join(os.path.dirname(__file__), "rules", "prapare_scoring_v1.json")
+)
+PRAPARE_RULES_CHECK_INTERVAL = float(os.getenv("PRAPARE_RULES_CHECK_INTERVAL", "5"))
+
+OPS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+}
+
+Case = Tuple[str, Tuple[int, ...], Any]
+
+
+class CompiledRules:
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec.get("name", "prapare_scoring")
+        self.version = spec["version"]
+        self.domains: Tuple[str, ...] = tuple(spec["domains"])
+        self.fields: List[str] = []
+        self.leaves: List[Tuple[int, Any, float]] = []
+        self._leaf_ids: Dict[Tuple[str, str, Any], int] = {}
+
+        self.domain_terms: List[Tuple[str, int, Tuple[Tuple[Case, ...], ...]]] = []
+        for domain, rule in spec["domains"].items():
+            terms = tuple(
+                tuple(self._case(case, case["points"], allow_domains=False) for case in term)
+                for term in rule["terms"]
+            )
+            self.domain_terms.append((domain, int(rule["max"]), terms))
+        # Leaves up to here only read answer columns; Z-code leaves may read domains.
+        self.answer_leaf_count = len(self.leaves)
+        self.z_terms = tuple(
+            tuple(self._case(case, case["code"], allow_domains=True) for case in term)
+            for term in spec["z_codes"]
+        )
+        self.z_codes: Tuple[str, ...] = tuple(case[2] for term in self.z_terms for case in term)
+        self.fields = tuple(self.fields)
+        self._answer_leaves = tuple(self.leaves[:self.answer_leaf_count])
+        self._z_leaves = tuple(self.leaves[self.answer_leaf_count:])
+
+    # --- compilation -----------------------------------------------------
+
+    def _slot(self, condition: Dict[str, Any], allow_domains: bool) -> int:
+        if "domain" in condition:
+            if not allow_domains or condition["domain"] not in self.domains:
+                raise ValueError(f"{self.name} v{self.version}: invalid domain reference {condition}")
+            return -1 - self.domains.index(condition["domain"])
+        field = condition["field"]
+        if field not in self.fields:
+            self.fields.append(field)
+        return self.fields.index(field)
+
+    def _leaf(self, condition: Dict[str, Any], allow_domains: bool) -> int:
+        if condition.get("op") not in OPS:
+            raise ValueError(f"{self.name} v{self.version}: unknown op in {condition}")
+        slot = self._slot(condition, allow_domains)
+        key = (slot, condition["op"], condition["value"])
+        if key not in self._leaf_ids:
+            self._leaf_ids[key] = len(self.leaves)
+            self.leaves.append((slot, OPS[condition["op"]], condition["value"]))
+        return self._leaf_ids[key]
+
+    def _case(self, case: Dict[str, Any], result: Any, allow_domains: bool) -> Case:
+        when = case["when"]
+        for kind in ("all", "any"):
+            if kind in when:
+                return kind, tuple(self._leaf(c, allow_domains) for c in when[kind]), result
+        return "all", (self._leaf(when, allow_domains),), result
+
+    # --- scalar evaluation -------------------------------------------------
+
+    def evaluate(self, answers: Any) -> Tuple[Dict[str, int], List[str]]:
+        """(domain scores, Z-codes) for one assessment (a mapping or an object with attributes)."""
+        if isinstance(answers, Mapping):
+            values = [answers.get(f) for f in self.fields]
+        else:
+            values = [getattr(answers, f, None) for f in self.fields]
+        hits = self._answer_hits(values)
+        scores = self._scores(hits)
+        self._add_z_hits(hits, values, scores)
+        return scores, self._z_codes(hits)
+
+    def _answer_hits(self, values: Sequence[Any]) -> List[bool]:
+        return [values[slot] is not None and op(values[slot], value) for slot, op, value in self._answer_leaves]
+
+    def _add_z_hits(self, hits: List[bool], values: Sequence[Any], scores: Mapping[str, int]):
+        for slot, op, value in self._z_leaves:
+            x = values[slot] if slot >= 0 else scores[self.domains[-1 - slot]]
+            hits.append(x is not None and op(x, value))
+
+    @staticmethod
+    def _case_hit(kind: str, leaves: Tuple[int, ...], hits: List[bool]) -> bool:
+        if len(leaves) == 1:
+            return hits[leaves[0]]
+        if kind == "all":
+            return all(hits[i] for i in leaves)
+        return any(hits[i] for i in leaves)
+
+    def score_values(self, values: Sequence[Any]) -> Dict[str, int]:
+        """Domain scores for one assessment given as values in self.fields order."""
+        return self._scores(self._answer_hits(values))
+
+    def z_codes_for(self, values: Sequence[Any], scores: Mapping[str, int]) -> List[str]:
+        hits = self._answer_hits(values)
+        self._add_z_hits(hits, values, scores)
+        return self._z_codes(hits)
+
+    def _scores(self, hits: List[bool]) -> Dict[str, int]:
+        scores = {}
+        for domain, cap, terms in self.domain_terms:
+            total = 0
+            for term in terms:
+                for kind, leaves, points in term:
+                    if self._case_hit(kind, leaves, hits):
+                        total += points
+                        break
+            scores[domain] = min(total, cap)
+        return scores
+
+    def _z_codes(self, hits: List[bool]) -> List[str]:
+        codes = []
+        for term in self.z_terms:
+            for kind, leaves, code in term:
+                if self._case_hit(kind, leaves, hits):
+                    codes.append(code)
+                    break
+        return codes
+
+    # --- vectorized evaluation ---------------------------------------------
+
+    def _array_hits(self, cols: Mapping[str, np.ndarray], scores: Mapping[str, np.ndarray], leaves) -> List[np.ndarray]:
+        hits = []
+        for slot, op, value in leaves:
+            x = cols[self.fields[slot]] if slot >= 0 else scores[self.domains[-1 - slot]]
+            hit = op(x, value)
+            if x.dtype.kind == "f":
+                hit &= ~np.isnan(x)
+            hits.append(hit)
+        return hits
+
+    @staticmethod
+    def _array_case(kind: str, leaves: Tuple[int, ...], hits: List[np.ndarray]) -> np.ndarray:
+        if len(leaves) == 1:
+            return hits[leaves[0]]
+        reduce = np.logical_and.reduce if kind == "all" else np.logical_or.reduce
+        return reduce([hits[i] for i in leaves])
+
+    def score_columns(self, cols: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Domain scores for n assessments given as {column: float array} (NaN = unanswered)."""
+        hits = self._array_hits(cols, {}, self._answer_leaves)
+        n = len(cols[self.fields[0]])
+        scores = {}
+        for domain, cap, terms in self.domain_terms:
+            total = np.zeros(n, dtype=np.int16)
+            for term in terms:
+                taken = np.zeros(n, dtype=bool)
+                for kind, leaves, points in term:
+                    hit = self._array_case(kind, leaves, hits) & ~taken
+                    total += points * hit
+                    taken |= hit
+            scores[domain] = np.minimum(total, cap)
+        return scores
+
+    def z_code_masks(self, cols: Mapping[str, np.ndarray], scores: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Boolean (n, len(self.z_codes)) matrix, columns in self.z_codes order."""
+        hits = self._array_hits(cols, scores, self.leaves)
+        n = len(cols[self.fields[0]])
+        masks = []
+        for term in self.z_terms:
+            taken = np.zeros(n, dtype=bool)
+            for kind, leaves, _code in term:
+                hit = self._array_case(kind, leaves, hits) & ~taken
+                masks.append(hit)
+                taken |= hit
+        return np.column_stack(masks)
+
+
+def load_rules(path: str = PRAPARE_RULES_FILE) -> CompiledRules:
+    with open(path, encoding="utf-8") as f:
+        return CompiledRules(json.load(f))
+
+
+class _ActiveRules:
+    """The compiled rules file, re-read when its mtime changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._rules = None
+        self._mtime = None
+        self._checked = 0.0
+
+    def get(self) -> CompiledRules:
+        if self._rules is not None and time.monotonic() - self._checked < PRAPARE_RULES_CHECK_INTERVAL:
+            return self._rules
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime
+            if self._rules is None or mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self._rules = load_rules(self.path)
+                except Exception as e:
+                    # Keep serving the last good rules if an edit is broken.
+                    if self._rules is None:
+                        raise
+                    print("Error in prapare_rules reload:", e)
+            self._checked = time.monotonic()
+            return self._rules
+
+
+_active = _ActiveRules(PRAPARE_RULES_FILE)
+
+
+def active_rules() -> CompiledRules:
+    return _active.get()
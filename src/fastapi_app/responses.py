@@ -0,0 +1,75 @@
+"""
+orjson-backed JSON response used as the app-wide default response class,
+plus a MessagePack response for clients that negotiate it.
+UUID, date and datetime values are serialized natively by orjson; Decimal and
+pydantic models go through a small fallback hook.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import msgpack
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize on its own."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the app's orjson settings."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Returning one of these directly from a route skips FastAPI's
+    jsonable_encoder pass, so large row lists can carry raw UUID, date and
+    Decimal values instead of pre-stringified copies.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # Kept so content negotiation can re-render without parsing the JSON.
+        self.raw_content = content
+        return dumps(content)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not MessagePack serializable: {type(obj).__name__}")
+
+
+def packb(content: Any) -> bytes:
+    """Serialize content to MessagePack with the same type mapping as JSON."""
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+class MsgPackResponse(Response):
+    """MessagePack response; values map to the same shapes as the JSON body."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
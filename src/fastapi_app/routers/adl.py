@@ -7,6 +7,7 @@ import uuid
 
 from models.adl_answers import ADLAnswers
 from database import get_db
+from negotiation import MsgPackRoute
 
 class ADLSubmission(BaseModel):
     patient_id: uuid.UUID
@@ -23,7 +24,7 @@ class ADLSubmission(BaseModel):
     stairs: Optional[int]
     answers: Dict[str, int]
 
-router = APIRouter(prefix="/adl", tags=["adl"])
+router = APIRouter(prefix="/adl", tags=["adl"], route_class=MsgPackRoute)
 
 @router.get("/by_patient/{patient_id}")
 def get_adl_by_patient(patient_id: str, db: Session = Depends(get_db)):
@@ -0,0 +1,53 @@
+"""
+Parquet exports of the assessment tables for analysts (see analytics_export.py).
+
+POST /analytics/export starts an incremental (default) or full export in the
+background; GET /analytics/exports shows each table's last export and
+watermark.
+"""
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from analytics_export import ANALYTICS_EXPORT_DIR, EXPORT_TABLES, export_table
+from database import get_db
+from responses import ORJSONResponse
+from singleflight import single_flight
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+ExportTable = Literal["prapare_answers", "adl_answers", "iadl_answers", "questionnaire_summary"]
+
+
+def run_exports(tables: List[str], full: bool):
+    for table in tables:
+        try:
+            # A second request for the same table waits for the running export.
+            result = single_flight("analytics_export", table, lambda: export_table(table, ANALYTICS_EXPORT_DIR, full))
+            print(f"Analytics export {table}: {result['rows']} rows ({result['mode']}) in {result['seconds']}s")
+        except Exception as e:
+            print("Error in run_exports:", e)
+
+
+@router.post("/export", status_code=202)
+def start_export(
+    background_tasks: BackgroundTasks,
+    mode: Literal["incremental", "full"] = "incremental",
+    table: Optional[List[ExportTable]] = Query(None),
+):
+    """Export the assessment tables (repeat `table` to pick some) to partitioned Parquet."""
+    tables = list(table or EXPORT_TABLES)
+    background_tasks.add_task(run_exports, tables, mode == "full")
+    return {"status": "started", "mode": mode, "tables": tables}
+
+
+@router.get("/exports")
+def list_exports(db: Session = Depends(get_db)):
+    try:
+        rows = db.execute(text("SELECT * FROM analytics_export_watermarks ORDER BY table_name")).mappings().all()
+        return ORJSONResponse([dict(r) for r in rows])
+    except Exception as e:
+        print("Error in list_exports:", e)
+        raise HTTPException(status_code=500, detail=f"Error fetching exports: {str(e)}")
@@ -0,0 +1,443 @@
+"""
+Bulk import of historical ADL, IADL and PRAPARE assessments.
+
+POST /import/{assessment_type} takes a CSV or NDJSON body, spools it to disk
+and returns a job id straight away. A background job validates the rows in
+column-wise batches (NumPy), COPYs the valid ones into a temp staging table
+and merges them with ON CONFLICT (patient_id, date_completed) in a single
+transaction (PRAPARE also updates questionnaire_summary, like /prapare/submit). GET /import/jobs/{job_id} reports progress and rejected rows.
+"""
+import csv
+import io
+import os
+import tempfile
+import typing
+import uuid
+from datetime import date
+from typing import Any, Dict, Iterator, List, Literal, Optional
+
+import numpy as np
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine, get_db
+from models.prapare_schemas import PRAPARESubmission
+from responses import ORJSONResponse
+from routers.prapare import calculate_prapare_domain_scores, generate_prapare_z_codes
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+MAX_REPORTED_ERRORS = 100
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class ImportSpec:
+    """Target table and per-column validation rules for one assessment type."""
+
+    def __init__(self, table: str, items: Dict[str, np.ndarray], required=(), text_columns=(), json_column=None):
+        self.table = table
+        self.items = items  # integer column -> allowed codes
+        self.required = set(required)
+        self.text_columns = list(text_columns)
+        self.json_column = json_column
+        self.extra_columns: List[str] = []  # derived TEXT[] columns
+        self.score_columns: List[str] = []  # derived INTEGER columns, staged only (not in the target table)
+        self.defaults: Dict[str, int] = {}  # stored when an item is absent, instead of NULL
+
+    @property
+    def columns(self) -> List[str]:
+        cols = list(self.items) + self.text_columns + self.extra_columns
+        if self.json_column:
+            cols.append(self.json_column)
+        return cols
+
+    @property
+    def stage_columns(self) -> List[str]:
+        cols = list(self.items) + self.text_columns + self.extra_columns + self.score_columns
+        if self.json_column:
+            cols.append(self.json_column)
+        return cols
+
+    def stage_ddl(self) -> str:
+        types = {c: "INTEGER" for c in self.items}
+        types.update({c: "TEXT" for c in self.text_columns})
+        types.update({c: "TEXT[]" for c in self.extra_columns})
+        types.update({c: "INTEGER" for c in self.score_columns})
+        if self.json_column:
+            types[self.json_column] = "JSONB"
+        cols = ", ".join(f"{c} {types[c]}" for c in self.stage_columns)
+        return f"CREATE TEMP TABLE import_stage (_line BIGINT, patient_id UUID, date_completed DATE, {cols}) ON COMMIT DROP"
+
+    def summary_sql(self) -> str:
+        """Data-modifying CTEs run after the merge (reading `merged`), or ''."""
+        return ""
+
+    def build_extra(self, values: Dict[str, Any], raw: Dict[str, Any]) -> List[Any]:
+        """Derived columns for one valid row, in extra_columns + score_columns + json_column order."""
+        # ADL/IADL store the item scores again in `answers`, like /adl/submit.
+        return [{c: values[c] for c in self.items if values[c] is not None}]
+
+
+# PRAPARE domain score -> questionnaire_summary column (as in /prapare/submit)
+PRAPARE_SUMMARY_SCORES = {
+    "housing_stability": "housing_stability_score",
+    "food_security": "food_security_score",
+    "transportation_access": "transportation_score",
+    "financial_strain": "economic_security_score",
+    "employment_education": "education_employment_score",
+    "social_isolation": "social_isolation_score",
+}
+
+
+class PRAPAREImportSpec(ImportSpec):
+    def __init__(self):
+        items, required, bools = {}, [], []
+        for name, field in PRAPARESubmission.model_fields.items():
+            if name == "patient_id":
+                continue
+            annotation = field.annotation
+            if typing.get_origin(annotation) is Literal:
+                items[name] = np.array(typing.get_args(annotation), dtype=float)
+            elif annotation is bool:
+                items[name] = np.array([0, 1], dtype=float)
+                bools.append(name)
+            elif name == "household_size":
+                items[name] = np.arange(1, 21, dtype=float)
+            else:
+                continue
+            if field.is_required():
+                required.append(name)
+        super().__init__("prapare_answers", items, required, ("assessed_by", "notes"), "raw_responses")
+        self.extra_columns = ["z_codes"]
+        self.score_columns = list(PRAPARE_SUMMARY_SCORES.values())
+        # Unticked checkboxes are stored as 0, like /prapare/submit
+        self.defaults = {name: 0 for name in bools}
+
+    def summary_sql(self) -> str:
+        # Point each patient's summary at their newest imported assessment,
+        # unless the summary already shows a newer one.
+        scores = list(PRAPARE_SUMMARY_SCORES.values())
+        return f"""
+        , summary AS (
+            INSERT INTO questionnaire_summary (patient_id, prapare_id, date_completed, {", ".join(scores)})
+            SELECT DISTINCT ON (m.patient_id) m.patient_id, m.prapare_id, m.date_completed, {", ".join(f"s.{c}" for c in scores)}
+            FROM merged m
+            JOIN import_stage s ON s.patient_id = m.patient_id AND s.date_completed = m.date_completed
+            ORDER BY m.patient_id, m.date_completed DESC, s._line DESC
+            ON CONFLICT (patient_id) WHERE prapare_id IS NOT NULL DO UPDATE SET
+                prapare_id = EXCLUDED.prapare_id,
+                date_completed = EXCLUDED.date_completed,
+                {", ".join(f"{c} = EXCLUDED.{c}" for c in scores)}
+            WHERE NOT EXISTS (
+                SELECT 1 FROM prapare_answers p
+                WHERE p.prapare_id = questionnaire_summary.prapare_id
+                  AND p.date_completed > EXCLUDED.date_completed
+            )
+        )"""
+
+    def build_extra(self, values: Dict[str, Any], raw: Dict[str, Any]) -> List[Any]:
+        submission = PRAPARESubmission.model_construct(**values)
+        domain_scores = calculate_prapare_domain_scores(submission)
+        z_codes = generate_prapare_z_codes(submission, domain_scores)
+        raw_responses = raw.get("raw_responses") or {}
+        if isinstance(raw_responses, str):
+            raw_responses = orjson.loads(raw_responses)
+        return [z_codes, *(domain_scores.get(d) for d in PRAPARE_SUMMARY_SCORES), raw_responses]
+
+
+def _codes(*values):
+    return np.array(values, dtype=float)
+
+
+# Barthel ADL item scores, as offered by the ADL form
+ADL_ITEMS = {
+    "feeding": _codes(0, 1, 2),
+    "bathing": _codes(0, 1),
+    "grooming": _codes(0, 1),
+    "dressing": _codes(0, 1, 2),
+    "bowels": _codes(0, 1, 2),
+    "bladder": _codes(0, 1, 2),
+    "toilet_use": _codes(0, 1, 2),
+    "transfers": _codes(0, 1, 2, 3),
+    "mobility": _codes(0, 1, 2, 3),
+    "stairs": _codes(0, 1, 2),
+}
+
+# Lawton IADL items are scored 0/1
+IADL_ITEMS = {
+    item: _codes(0, 1)
+    for item in (
+        "telephone", "shopping", "food_preparation", "housekeeping",
+        "laundry", "transportation", "medication", "finances",
+    )
+}
+
+IMPORT_SPECS = {
+    "adl": ImportSpec("adl_answers", ADL_ITEMS, json_column="answers"),
+    "iadl": ImportSpec("iadl_answers", IADL_ITEMS, json_column="answers"),
+    "prapare": PRAPAREImportSpec(),
+}
+
+
+# --- Parsing -----------------------------------------------------------------
+
+class _BadLine:
+    """An NDJSON line that is not a JSON object; rejected in validate_batch."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def _read_rows(path: str, fmt: str) -> Iterator[Any]:
+    with open(path, "rb") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+            for row in reader:
+                yield row
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = orjson.loads(line)
+                except orjson.JSONDecodeError as e:
+                    yield _BadLine(f"Malformed JSON: {e}")
+                    continue
+                yield row if isinstance(row, dict) else _BadLine("Expected a JSON object")
+
+
+def _batches(rows: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_BOOL_WORDS = {"true": 1.0, "false": 0.0, "yes": 1.0, "no": 0.0}
+
+
+def _to_number(value: Any) -> float:
+    """NaN for a missing value, -inf (never an allowed code) when unparseable."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _BOOL_WORDS.get(str(value).strip().lower(), -np.inf)
+
+
+# --- Validation ----------------------------------------------------------------
+
+def validate_batch(spec: ImportSpec, rows: List[Any], first_line: int):
+    """Validate a batch column by column; return (staged records, errors)."""
+    n = len(rows)
+    valid = np.ones(n, dtype=bool)
+    errors: List[Dict[str, Any]] = []
+
+    def reject(mask: np.ndarray, field: str, message: str):
+        for i in np.flatnonzero(mask & valid):
+            errors.append({"line": first_line + int(i), "field": field, "error": message})
+        valid[mask] = False
+
+    # Unparseable lines are rejected up front and checked as empty rows below
+    for i, row in enumerate(rows):
+        if isinstance(row, _BadLine):
+            errors.append({"line": first_line + i, "field": None, "error": row.error})
+            valid[i] = False
+    rows = [{} if isinstance(row, _BadLine) else row for row in rows]
+
+    patient_ids: List[Optional[uuid.UUID]] = [None] * n
+    bad = np.zeros(n, dtype=bool)
+    for i, row in enumerate(rows):
+        try:
+            patient_ids[i] = uuid.UUID(str(row.get("patient_id")))
+        except (TypeError, ValueError):
+            bad[i] = True
+    reject(bad, "patient_id", "Invalid or missing patient_id")
+
+    # Historical imports must say when they were taken; never default to today
+    dates: List[Optional[date]] = [None] * n
+    bad = np.zeros(n, dtype=bool)
+    for i, row in enumerate(rows):
+        try:
+            dates[i] = date.fromisoformat(row.get("date_completed"))
+        except (TypeError, ValueError):
+            bad[i] = True
+    reject(bad, "date_completed", "Invalid or missing date_completed (expected YYYY-MM-DD)")
+
+    matrix = np.array([[_to_number(row.get(c)) for c in spec.items] for row in rows], dtype=float).reshape(n, len(spec.items))
+    for j, (column, allowed) in enumerate(spec.items.items()):
+        values = matrix[:, j]
+        if column in spec.defaults:
+            values[np.isnan(values)] = spec.defaults[column]
+        missing = np.isnan(values)
+        if column in spec.required:
+            reject(missing, column, "Required value missing")
+        reject(~missing & ~np.isin(values, allowed), column, f"Value not in {allowed.astype(int).tolist()}")
+
+    records = []
+    item_columns = list(spec.items)
+    for i in np.flatnonzero(valid):
+        row = rows[i]
+        values = {c: (None if np.isnan(v) else int(v)) for c, v in zip(item_columns, matrix[i])}
+        try:
+            extra = spec.build_extra(values, row)
+        except (TypeError, ValueError) as e:
+            errors.append({"line": first_line + int(i), "field": None, "error": str(e)})
+            continue
+        texts = [row.get(c) or None for c in spec.text_columns]
+        records.append([first_line + int(i), patient_ids[i], dates[i], *values.values(), *texts, *extra])
+    return records, errors
+
+
+# --- Staging and merge -------------------------------------------------------------
+
+def _pg_array(values: List[str]) -> str:
+    return "{" + ",".join('"' + v.replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values) + "}"
+
+
+def _copy_batch(cursor, spec: ImportSpec, records: List[List[Any]]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    n_extra, n_scores = len(spec.extra_columns), len(spec.score_columns)
+    for record in records:
+        derived = record[-1 - n_extra - n_scores:-1]
+        head, extra, scores = record[:-1 - n_extra - n_scores], derived[:n_extra], derived[n_extra:]
+        writer.writerow(head + [_pg_array(v) for v in extra] + scores + [orjson.dumps(record[-1]).decode()])
+    buffer.seek(0)
+    columns = ", ".join(["_line", "patient_id", "date_completed"] + spec.stage_columns)
+    cursor.copy_expert(f"COPY import_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _merge_sql(spec: ImportSpec) -> str:
+    columns = ["patient_id", "date_completed"] + spec.columns
+    col_list = ", ".join(columns)
+    select_list = ", ".join(f"s.{c}" for c in columns)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in spec.columns)
+    # DISTINCT ON keeps the last occurrence when a file repeats a patient/date,
+    # which ON CONFLICT would otherwise reject within a single statement.
+    # Returns the number of rows merged.
+    return f"""
+        WITH merged AS (
+            INSERT INTO {spec.table} ({col_list})
+            SELECT DISTINCT ON (s.patient_id, s.date_completed) {select_list}
+            FROM import_stage s
+            WHERE EXISTS (SELECT 1 FROM patients p WHERE p.patient_id = s.patient_id)
+            ORDER BY s.patient_id, s.date_completed, s._line DESC
+            ON CONFLICT (patient_id, date_completed) DO UPDATE SET {updates}
+            RETURNING *
+        ){spec.summary_sql()}
+        SELECT count(*) FROM merged
+    """
+
+
+def _update_job(job_id: uuid.UUID, finished: bool = False, **fields):
+    """Record progress in its own short transaction so it is visible mid-import."""
+    assignments = ", ".join([f"{k} = :{k}" for k in fields] + (["finished_at = NOW()"] if finished else []))
+    params = {k: (orjson.dumps(v).decode() if k == "errors" else v) for k, v in fields.items()}
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"UPDATE import_jobs SET {assignments}, updated_at = NOW() WHERE job_id = :job_id"),
+            {**params, "job_id": str(job_id)},
+        )
+
+
+def run_import(job_id: uuid.UUID, assessment_type: str, path: str, fmt: str):
+    spec = IMPORT_SPECS[assessment_type]
+    rows_read = rows_staged = rows_rejected = 0
+    errors: List[Dict[str, Any]] = []
+    conn = engine.raw_connection()
+    try:
+        _update_job(job_id, status="running")
+        cursor = conn.cursor()
+        cursor.execute(spec.stage_ddl())
+        # Line numbers are 1-based data rows (CSV header not counted).
+        for batch in _batches(_read_rows(path, fmt), IMPORT_BATCH_SIZE):
+            records, batch_errors = validate_batch(spec, batch, rows_read + 1)
+            if records:
+                _copy_batch(cursor, spec, records)
+            rows_read += len(batch)
+            rows_staged += len(records)
+            rows_rejected += len(batch) - len(records)
+            errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+            _update_job(job_id, rows_read=rows_read, rows_valid=rows_staged, rows_rejected=rows_rejected, errors=errors)
+
+        _update_job(job_id, status="merging")
+        cursor.execute(
+            "SELECT count(*) FROM import_stage s WHERE NOT EXISTS (SELECT 1 FROM patients p WHERE p.patient_id = s.patient_id)"
+        )
+        unknown_patients = cursor.fetchone()[0]
+        cursor.execute(_merge_sql(spec))
+        rows_merged = cursor.fetchone()[0]
+        conn.commit()
+        _update_job(
+            job_id, status="completed", rows_merged=rows_merged,
+            rows_unknown_patient=unknown_patients, finished=True,
+        )
+    except Exception as e:
+        conn.rollback()
+        print("Error in run_import:", e)
+        _update_job(job_id, status="failed", detail=str(e), errors=errors, finished=True)
+    finally:
+        conn.close()
+        os.unlink(path)
+
+
+def _body_format(request: Request, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    content_type = request.headers.get("content-type", "")
+    if any(t in content_type for t in CSV_MEDIA_TYPES):
+        return "csv"
+    if any(t in content_type for t in NDJSON_MEDIA_TYPES):
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)")
+
+
+@router.post("/{assessment_type}", status_code=202)
+async def import_assessments(
+    assessment_type: Literal["adl", "iadl", "prapare"],
+    request: Request,
+    background_tasks: BackgroundTasks,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    db: Session = Depends(get_db),
+):
+    """Queue a bulk import; poll GET /import/jobs/{job_id} for progress."""
+    fmt = _body_format(request, format)
+    # Spool to disk so large uploads never sit in memory.
+    spool = tempfile.NamedTemporaryFile(prefix=f"import_{assessment_type}_", suffix=f".{fmt}", delete=False)
+    try:
+        with spool:
+            async for chunk in request.stream():
+                spool.write(chunk)
+        job_id = db.execute(
+            text("INSERT INTO import_jobs (assessment_type, format) VALUES (:t, :f) RETURNING job_id"),
+            {"t": assessment_type, "f": fmt},
+        ).scalar()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        os.unlink(spool.name)
+        print("Error in import_assessments:", e)
+        raise HTTPException(status_code=500, detail=f"Error queuing import: {str(e)}")
+    background_tasks.add_task(run_import, job_id, assessment_type, spool.name, fmt)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}")
+def get_import_job(job_id: uuid.UUID, db: Session = Depends(get_db)):
+    row = db.execute(text("SELECT * FROM import_jobs WHERE job_id = :id"), {"id": str(job_id)}).mappings().first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ORJSONResponse(dict(row))
@@ -1,63 +1,125 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from typing import List, Literal
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from database import get_db
+import hashlib
+import os
+import time
+from database import get_db_with_timeout
+from caching import conditional_response, table_versions
+from code_index import catalog_indexes
+from responses import ORJSONResponse, dumps
 
 router = APIRouter(prefix="/codes", tags=["codes"])
 
+CODES_STATEMENT_TIMEOUT_MS = int(os.getenv("CODES_STATEMENT_TIMEOUT_MS", "5000"))
+get_codes_db = get_db_with_timeout(CODES_STATEMENT_TIMEOUT_MS)
+
+# code type -> catalog table; patient_history stores the same codes in a
+# column with the same name as the catalog table.
+CODE_TABLES = {
+    "dx": "dx_codes",
+    "tx": "tx_codes",
+    "rx": "rx_codes",
+    "sx": "sx_codes",
+}
+
+# Top codes are kept in memory per code type for CODES_CACHE_TTL seconds (or
+# until the catalog changes). code_usage has no table version, so the ETag
+# hashes the list itself: a body is only ever served with its own ETag, and
+# the ETag only changes when the top-N list does.
+CODES_CACHE_TTL = float(os.getenv("CODES_CACHE_TTL", "30"))
+TOP_CODES_LIMIT = 20
+_top_codes_cache = {}  # code_type -> (catalog versions, built_at, rows, digest)
+
+def _top_codes(code_type: str, db: Session, versions: str):
+    """Most frequently used codes of one type (top 20) and their digest, from the code_usage counters."""
+    cached = _top_codes_cache.get(code_type)
+    if cached and cached[0] == versions and time.monotonic() - cached[1] < CODES_CACHE_TTL:
+        return cached[2], cached[3]
+    table = CODE_TABLES[code_type]
+    # Used codes by count, topped up with unused catalog codes when fewer
+    # than TOP_CODES_LIMIT have been used, so new installs still get a list.
+    rows = db.execute(text(f'''
+        SELECT code, description, freq FROM (
+            (SELECT c.code, c.description, u.usage_count AS freq
+             FROM code_usage u
+             JOIN {table} c ON c.code = u.code
+             WHERE u.code_type = :code_type AND u.usage_count > 0
+             ORDER BY u.usage_count DESC, u.code
+             LIMIT :limit)
+            UNION ALL
+            (SELECT c.code, c.description, 0 AS freq
+             FROM {table} c
+             WHERE NOT EXISTS (
+                 SELECT 1 FROM code_usage u
+                 WHERE u.code_type = :code_type AND u.code = c.code AND u.usage_count > 0
+             )
+             ORDER BY c.code
+             LIMIT :limit)
+        ) top
+        ORDER BY freq DESC, code
+        LIMIT :limit
+    '''), {"code_type": code_type, "limit": TOP_CODES_LIMIT}).fetchall()
+    result = [{"code": r[0], "description": r[1]} for r in rows]
+    digest = hashlib.sha1(dumps(result)).hexdigest()
+    _top_codes_cache[code_type] = (versions, time.monotonic(), result, digest)
+    return result, digest
+
+def _codes_response(code_type: str, request: Request, db: Session):
+    tables = [CODE_TABLES[code_type]]
+    versions = table_versions(db, tables)
+    rows, digest = _top_codes(code_type, db, versions)
+    return conditional_response(
+        request, db, tables,
+        lambda: ORJSONResponse(rows),
+        versions=f"{versions},top:{digest}",
+    )
+
 @router.get("/dx")
-def get_dx_codes(db: Session = Depends(get_db)):
-    rows = db.execute(text('''
-        SELECT c.code, c.description, COUNT(u.code) as freq
-        FROM dx_codes c
-        LEFT JOIN (
-            SELECT unnest(dx_codes) as code FROM patient_history
-        ) u ON c.code = u.code
-        GROUP BY c.code, c.description
-        ORDER BY freq DESC
-        LIMIT 20
-    ''')).fetchall()
-    return [{"code": r[0], "description": r[1]} for r in rows]
+def get_dx_codes(request: Request, db: Session = Depends(get_codes_db)):
+    return _codes_response("dx", request, db)
 
 @router.get("/tx")
-def get_tx_codes(db: Session = Depends(get_db)):
-    rows = db.execute(text('''
-        SELECT c.code, c.description, COUNT(u.code) as freq
-        FROM tx_codes c
-        LEFT JOIN (
-            SELECT unnest(tx_codes) as code FROM patient_history
-        ) u ON c.code = u.code
-        GROUP BY c.code, c.description
-        ORDER BY freq DESC
-        LIMIT 20
-    ''')).fetchall()
-    return [{"code": r[0], "description": r[1]} for r in rows]
+def get_tx_codes(request: Request, db: Session = Depends(get_codes_db)):
+    return _codes_response("tx", request, db)
 
 @router.get("/rx")
-def get_rx_codes(db: Session = Depends(get_db)):
-    rows = db.execute(text('''
-        SELECT c.code, c.description, COUNT(u.code) as freq
-        FROM rx_codes c
-        LEFT JOIN (
-            SELECT unnest(rx_codes) as code FROM patient_history
-        ) u ON c.code = u.code
-        GROUP BY c.code, c.description
-        ORDER BY freq DESC
-        LIMIT 20
-    ''')).fetchall()
-    return [{"code": r[0], "description": r[1]} for r in rows]
+def get_rx_codes(request: Request, db: Session = Depends(get_codes_db)):
+    return _codes_response("rx", request, db)
 
 @router.get("/sx")
-def get_sx_codes(db: Session = Depends(get_db)):
-    rows = db.execute(text('''
-        SELECT c.code, c.description, COUNT(u.code) as freq
-        FROM sx_codes c
-        LEFT JOIN (
-            SELECT unnest(sx_codes) as code FROM patient_history
-        ) u ON c.code = u.code
-        GROUP BY c.code, c.description
-        ORDER BY freq DESC
-        LIMIT 20
-    '''))
-    rows = rows.fetchall()
-    return [{"code": r[0], "description": r[1]} for r in rows]
+def get_sx_codes(request: Request, db: Session = Depends(get_codes_db)):
+    return _codes_response("sx", request, db)
+
+@router.get("/{code_type}/search")
+def search_codes(
+    code_type: Literal["dx", "tx", "rx", "sx"],
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Autocomplete over the full catalog: code prefix, then description words."""
+    return ORJSONResponse(catalog_indexes.get(CODE_TABLES[code_type]).search(q, limit))
+
+# Upper bound on codes per type in one /codes/resolve call
+RESOLVE_MAX_CODES = 1000
+
+class CodeResolveRequest(BaseModel):
+    dx: List[str] = Field(default_factory=list, max_length=RESOLVE_MAX_CODES)
+    tx: List[str] = Field(default_factory=list, max_length=RESOLVE_MAX_CODES)
+    rx: List[str] = Field(default_factory=list, max_length=RESOLVE_MAX_CODES)
+    sx: List[str] = Field(default_factory=list, max_length=RESOLVE_MAX_CODES)
+
+@router.post("/resolve")
+def resolve_codes(body: CodeResolveRequest):
+    """Descriptions for arbitrary codes, e.g. {"dx": ["E11.9"]} -> {"dx": {"E11.9": "..."}}.
+
+    Served from the in-memory catalog indexes; unknown codes map to null.
+    """
+    result = {}
+    for code_type, table in CODE_TABLES.items():
+        codes = getattr(body, code_type)
+        if codes:
+            result[code_type] = catalog_indexes.get(table).lookup(codes)
+    return ORJSONResponse(result)
@@ -1,53 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from database import get_db
 from sqlalchemy import text
+from typing import Optional
+from pagination import KeysetQuery, MAX_PAGE_LIMIT, paginate
+from caching import conditional_response
 
 router = APIRouter()
 
+RESOURCE_LIST_QUERY = KeysetQuery("""
+    SELECT 
+        cr.resource_id,
+        cr.name,
+        cr.description,
+        cr.address,
+        cr.city,
+        cr.state,
+        cr.zip_code,
+        cr.phone,
+        cr.website,
+        sms.label as subclass_label,
+        sm.label as class_label
+    FROM community_resources cr
+    LEFT JOIN sdoh_mitigation_subclasses sms ON cr.resource_subclass_id = sms.subclass_id
+    LEFT JOIN sdoh_mitigations sm ON sms.parent_class_id = sm.class_id
+""", ["name", "resource_id"])
+
 @router.get("/")  
-async def get_community_resources(db: Session = Depends(get_db)):
+async def get_community_resources(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    db: Session = Depends(get_db),
+):
     """Get all community resources for social risk recommendations"""
     try:
-        query = text("""
-            SELECT 
-                cr.resource_id,
-                cr.name,
-                cr.description,
-                cr.address,
-                cr.city,
-                cr.state,
-                cr.zip_code,
-                cr.phone,
-                cr.website,
-                sms.label as subclass_label,
-                sm.label as class_label
-            FROM community_resources cr
-            LEFT JOIN sdoh_mitigation_subclasses sms ON cr.resource_subclass_id = sms.subclass_id
-            LEFT JOIN sdoh_mitigations sm ON sms.parent_class_id = sm.class_id
-            ORDER BY cr.name
-        """)
-        
-        result = db.execute(query)
-        resources = []
-        
-        for row in result:
-            resources.append({
-                "resource_id": str(row.resource_id),
-                "name": row.name,
-                "description": row.description,
-                "address": row.address,
-                "city": row.city,
-                "state": row.state,
-                "zip_code": row.zip_code,
-                "phone": row.phone,
-                "website": row.website,
-                "subclass_label": row.subclass_label,
-                "class_label": row.class_label
-            })
-        
-        return {"resources": resources}
+        return conditional_response(
+            request, db, ["community_resources", "sdoh_mitigation_subclasses", "sdoh_mitigations"],
+            lambda: paginate(
+                request, db, RESOURCE_LIST_QUERY,
+                lambda row: {
+                    "resource_id": row.resource_id,
+                    "name": row.name,
+                    "description": row.description,
+                    "address": row.address,
+                    "city": row.city,
+                    "state": row.state,
+                    "zip_code": row.zip_code,
+                    "phone": row.phone,
+                    "website": row.website,
+                    "subclass_label": row.subclass_label,
+                    "class_label": row.class_label
+                },
+                after=after, limit=limit, envelope="resources",
+            ),
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching community resources: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching community resources: {str(e)}")
@@ -1,31 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from database import get_db
-from typing import List, Dict, Any
+from pagination import KeysetQuery, MAX_PAGE_LIMIT, paginate
+from caching import conditional_response
+from typing import List, Dict, Any, Optional
 
 router = APIRouter(prefix="/contractors", tags=["contractors"])
 
+CONTRACTOR_LIST_QUERY = KeysetQuery("""
+    SELECT contractor_id, name, contact_info, qualifications
+    FROM contractors
+""", ["name", "contractor_id"])
+
 @router.get("/")
-def get_contractors(db: Session = Depends(get_db)):
+def get_contractors(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    db: Session = Depends(get_db),
+):
     """Get all available contractors"""
     try:
-        contractors = db.execute(text("""
-            SELECT contractor_id, name, contact_info, qualifications 
-            FROM contractors 
-            ORDER BY name
-        """)).fetchall()
-        
-        contractor_list = []
-        for row in contractors:
-            contractor_list.append({
-                "contractor_id": str(row[0]),
-                "name": row[1],
-                "contact_info": row[2],
-                "qualifications": row[3]
-            })
-        
-        return {"contractors": contractor_list}
-        
+        return conditional_response(
+            request, db, ["contractors"],
+            lambda: paginate(
+                request, db, CONTRACTOR_LIST_QUERY,
+                lambda row: {
+                    "contractor_id": row.contractor_id,
+                    "name": row.name,
+                    "contact_info": row.contact_info,
+                    "qualifications": row.qualifications
+                },
+                after=after, limit=limit, envelope="contractors",
+            ),
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching contractors: {str(e)}")
@@ -0,0 +1,190 @@
+"""
+FHIR R4 export of patients and assessments.
+
+GET /fhir/Bundle?patient=... returns a collection Bundle for one or more
+patients; GET /fhir/$export streams every resource as FHIR NDJSON (one
+resource per line, Bulk Data style). Both read from server-side cursors and
+write resources as they arrive, so memory use does not grow with the export.
+
+Resources: Patient, QuestionnaireResponse (ADL, IADL, PRAPARE) and Condition
+(one per dx code in patient_history).
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+
+from pagination import iter_rows
+from responses import dumps
+from routers.assessment_import import IMPORT_SPECS
+
+router = APIRouter(prefix="/fhir", tags=["fhir"])
+
+FHIR_JSON_MEDIA_TYPE = "application/fhir+json"
+FHIR_NDJSON_MEDIA_TYPE = "application/fhir+ndjson"
+
+ICD10_SYSTEM = "http://hl7.org/fhir/sid/icd-10-cm"
+CONDITION_CATEGORY = {
+    "coding": [{
+        "system": "http://terminology.hl7.org/CodeSystem/condition-category",
+        "code": "problem-list-item",
+    }]
+}
+
+# Canonical questionnaire per assessment table (PRAPARE is LOINC panel 93025-5)
+QUESTIONNAIRES = {
+    "adl": ("adl_answers", "adl_id", "urn:caregiving:questionnaire:adl"),
+    "iadl": ("iadl_answers", "iadl_id", "urn:caregiving:questionnaire:iadl"),
+    "prapare": ("prapare_answers", "prapare_id", "http://loinc.org/q/93025-5"),
+}
+
+GENDERS = {"male", "female", "other"}
+
+
+def _reference(patient_id) -> Dict[str, str]:
+    return {"reference": f"Patient/{patient_id}"}
+
+
+def patient_resource(row) -> Dict[str, Any]:
+    gender = (row.gender or "").lower()
+    resource = {
+        "resourceType": "Patient",
+        "id": row.patient_id,
+        "gender": gender if gender in GENDERS else "unknown",
+    }
+    if row.name:
+        resource["name"] = [{"text": row.name}]
+    if row.dob:
+        resource["birthDate"] = row.dob
+    telecom = []
+    if row.phone:
+        telecom.append({"system": "phone", "value": row.phone})
+    if row.email:
+        telecom.append({"system": "email", "value": row.email})
+    if telecom:
+        resource["telecom"] = telecom
+    return resource
+
+
+def questionnaire_response_builder(assessment_type: str) -> Callable[[Any], Dict[str, Any]]:
+    _, pk, questionnaire = QUESTIONNAIRES[assessment_type]
+    items = list(IMPORT_SPECS[assessment_type].items)
+
+    def build(row) -> Dict[str, Any]:
+        mapping = row._mapping
+        resource = {
+            "resourceType": "QuestionnaireResponse",
+            "id": mapping[pk],
+            "questionnaire": questionnaire,
+            "status": "completed",
+            "subject": _reference(mapping["patient_id"]),
+            "item": [
+                {"linkId": item, "answer": [{"valueInteger": mapping[item]}]}
+                for item in items if mapping[item] is not None
+            ],
+        }
+        if mapping["date_completed"]:
+            resource["authored"] = mapping["date_completed"]
+        return resource
+
+    return build
+
+
+def condition_resource(row) -> Dict[str, Any]:
+    resource = {
+        "resourceType": "Condition",
+        "id": f"{row.history_id}-{row.code}",
+        "category": [CONDITION_CATEGORY],
+        "code": {"coding": [{"system": ICD10_SYSTEM, "code": row.code, "display": row.description}]},
+        "subject": _reference(row.patient_id),
+    }
+    if row.created_at:
+        resource["recordedDate"] = row.created_at
+    return resource
+
+
+def _patient_filter(column: str, patients: Optional[List[UUID]]) -> str:
+    return f"WHERE {column} = ANY(CAST(:patients AS uuid[]))" if patients else ""
+
+
+def resource_queries(types: List[str], patients: Optional[List[UUID]]):
+    """(statement, builder) pairs, one server-side cursor each, in export order."""
+    queries = []
+    if "Patient" in types:
+        queries.append((
+            text(f"SELECT patient_id, name, dob, gender, phone, email FROM patients {_patient_filter('patient_id', patients)}"),
+            patient_resource,
+        ))
+    if "QuestionnaireResponse" in types:
+        for assessment_type, (table, _, _) in QUESTIONNAIRES.items():
+            queries.append((
+                text(f"SELECT * FROM {table} {_patient_filter('patient_id', patients)}"),
+                questionnaire_response_builder(assessment_type),
+            ))
+    if "Condition" in types:
+        queries.append((
+            text(f"""
+                SELECT h.history_id, h.patient_id, h.created_at, c.code, d.description
+                FROM patient_history h
+                CROSS JOIN LATERAL unnest(h.dx_codes) AS c(code)
+                LEFT JOIN dx_codes d ON d.code = c.code
+                {_patient_filter('h.patient_id', patients)}
+            """),
+            condition_resource,
+        ))
+    params = {"patients": [str(p) for p in patients]} if patients else {}
+    return queries, params
+
+
+def iter_resources(types: List[str], patients: Optional[List[UUID]] = None) -> Iterator[List[bytes]]:
+    """Yield batches of serialized resources."""
+    queries, params = resource_queries(types, patients)
+    for statement, build in queries:
+        for batch in iter_rows(statement, params):
+            yield [dumps(build(row)) for row in batch]
+
+
+RESOURCE_TYPES = ["Patient", "QuestionnaireResponse", "Condition"]
+
+
+def _parse_types(_type: Optional[str]) -> List[str]:
+    if not _type:
+        return RESOURCE_TYPES
+    types = [t.strip() for t in _type.split(",") if t.strip()]
+    unknown = [t for t in types if t not in RESOURCE_TYPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported resource type(s): {', '.join(unknown)}")
+    return types
+
+
+@router.get("/Bundle")
+def get_bundle(patient: List[UUID] = Query(...), _type: Optional[str] = None):
+    """Collection Bundle with every resource for the given patient(s)."""
+    types = _parse_types(_type)
+
+    def generate():
+        yield b'{"resourceType":"Bundle","type":"collection","entry":['
+        first = True
+        for batch in iter_resources(types, patient):
+            chunk = b",".join(b'{"resource":' + resource + b"}" for resource in batch)
+            if not first:
+                chunk = b"," + chunk
+            first = False
+            yield chunk
+        yield b"]}"
+
+    return StreamingResponse(generate(), media_type=FHIR_JSON_MEDIA_TYPE)
+
+
+@router.get("/$export")
+def export_resources(_type: Optional[str] = None, patient: Optional[List[UUID]] = Query(None)):
+    """Stream resources as FHIR NDJSON (all patients unless `patient` is given)."""
+    types = _parse_types(_type)
+
+    def generate():
+        for batch in iter_resources(types, patient):
+            yield b"\n".join(batch) + b"\n"
+
+    return StreamingResponse(generate(), media_type=FHIR_NDJSON_MEDIA_TYPE)
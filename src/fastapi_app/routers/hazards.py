@@ -7,6 +7,7 @@ from models.adl_answers import ADLAnswers
 from models.iadl_answers import IADLAnswers
 from models.patient_history import PatientHistory
 from database import get_db
+from hazard_engine import dx_hazard_rules
 
 router = APIRouter(prefix="/hazards", tags=["hazards"])
 
@@ -74,14 +75,11 @@ def get_hazards_by_patient(patient_id: str, db: Session = Depends(get_db)):
                             hazards.append({"type": "sx", "code": code, "hazard_class_id": row[2]})
         # Dx
         if history.dx_codes:
-            dx_map = db.execute(text("SELECT dx_code, hazard_subclass_id, hazard_class_id FROM dx_code_hazard_map")).fetchall()
-            for code in history.dx_codes:
-                for row in dx_map:
-                    if row[0] == code:
-                        if row[1]:
-                            hazards.append({"type": "dx", "code": code, "hazard_subclass_id": row[1]})
-                        elif row[2]:
-                            hazards.append({"type": "dx", "code": code, "hazard_class_id": row[2]})
+            for code, (subclass_id, class_id) in dx_hazard_rules().match_all(history.dx_codes):
+                if subclass_id:
+                    hazards.append({"type": "dx", "code": code, "hazard_subclass_id": subclass_id})
+                elif class_id:
+                    hazards.append({"type": "dx", "code": code, "hazard_class_id": class_id})
         # Rx
         if history.rx_codes:
             rx_map = db.execute(text("SELECT rx_code, hazard_subclass_id, hazard_class_id FROM rx_code_hazard_map")).fetchall()
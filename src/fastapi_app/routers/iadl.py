@@ -7,8 +7,9 @@ from uuid import UUID
 
 from models.iadl_answers import IADLAnswers
 from database import get_db
+from negotiation import MsgPackRoute
 
-router = APIRouter(prefix="/iadl", tags=["iadl"])
+router = APIRouter(prefix="/iadl", tags=["iadl"], route_class=MsgPackRoute)
 
 @router.get("/by_patient/{patient_id}")
 def get_iadl_by_patient(patient_id: str, db: Session = Depends(get_db)):
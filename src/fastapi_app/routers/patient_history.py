@@ -6,8 +6,9 @@ from uuid import UUID
 
 from models.patient_history import PatientHistory
 from database import get_db
+from negotiation import MsgPackRoute
 
-router = APIRouter(prefix="/history", tags=["patient_history"])
+router = APIRouter(prefix="/history", tags=["patient_history"], route_class=MsgPackRoute)
 
 @router.get("/by_patient/{patient_id}")
 def get_history_by_patient(patient_id: str, db: Session = Depends(get_db)):
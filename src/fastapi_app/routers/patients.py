@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from datetime import date
@@ -8,6 +9,7 @@ from uuid import UUID
 
 from models.patients import Patients
 from database import get_db
+from pagination import KeysetQuery, MAX_PAGE_LIMIT, paginate
 
 class PatientCreate(BaseModel):
     name: str
@@ -44,13 +46,23 @@ def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
         print("Error in create_patient:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+PATIENT_LIST_QUERY = KeysetQuery(
+    "SELECT patient_id, name, COALESCE(name, '') AS sort_name FROM patients",
+    ["sort_name", "patient_id"],
+)
+
 @router.get("/all")
-def list_patients(db: Session = Depends(get_db)):
-    patients = db.query(Patients).all()
-    return [
-        {"patient_id": str(p.patient_id), "name": p.name}
-        for p in patients
-    ]
+def list_patients(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    db: Session = Depends(get_db),
+):
+    return paginate(
+        request, db, PATIENT_LIST_QUERY,
+        lambda p: {"patient_id": p.patient_id, "name": p.name},
+        after=after, limit=limit,
+    )
 
 @router.get("/{patient_id}")
 def get_patient(patient_id: UUID, db: Session = Depends(get_db)):
@@ -65,3 +77,101 @@ def get_patient(patient_id: UUID, db: Session = Depends(get_db)):
         "phone": patient.phone,
         "email": patient.email
     }
+
+# Everything the intake forms need for one patient, assembled by Postgres in a
+# single statement: each section is a LATERAL subquery rendered with
+# row_to_json/json_agg, and the whole document is returned as JSON text.
+PATIENT_SNAPSHOT_SQL = text("""
+    SELECT json_build_object(
+        'patient_id', p.patient_id,
+        'identity', json_build_object(
+            'patient_id', p.patient_id,
+            'name', p.name,
+            'dob', p.dob,
+            'gender', p.gender,
+            'phone', p.phone,
+            'email', p.email
+        ),
+        'history', h.doc,
+        'adl', a.doc,
+        'iadl', i.doc,
+        'prapare', pr.doc,
+        'risks', COALESCE(r.docs, '[]'::json),
+        'social_risks', COALESCE(sr.docs, '[]'::json)
+    )::text AS snapshot
+    FROM patients p
+    LEFT JOIN LATERAL (
+        SELECT row_to_json(x) AS doc FROM (
+            SELECT history_id, patient_id, dx_codes, tx_codes, rx_codes, sx_codes, notes, created_at
+            FROM patient_history
+            WHERE patient_id = p.patient_id
+            ORDER BY created_at DESC
+            LIMIT 1
+        ) x
+    ) h ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT row_to_json(x) AS doc FROM (
+            SELECT adl_id, patient_id, date_completed, feeding, bathing, grooming, dressing,
+                   bowels, bladder, toilet_use, transfers, mobility, stairs, answers
+            FROM adl_answers
+            WHERE patient_id = p.patient_id
+            ORDER BY date_completed DESC
+            LIMIT 1
+        ) x
+    ) a ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT row_to_json(x) AS doc FROM (
+            SELECT iadl_id, patient_id, date_completed, telephone, shopping, food_preparation,
+                   housekeeping, laundry, transportation, medication, finances, answers
+            FROM iadl_answers
+            WHERE patient_id = p.patient_id
+            ORDER BY date_completed DESC
+            LIMIT 1
+        ) x
+    ) i ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT row_to_json(x) AS doc FROM (
+            SELECT pa.*
+            FROM prapare_answers pa
+            WHERE pa.patient_id = p.patient_id
+            ORDER BY pa.date_completed DESC
+            LIMIT 1
+        ) x
+    ) pr ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(x) AS docs FROM (
+            SELECT r.risk_id,
+                   hz.hazard_type AS hazard_code,
+                   hz.description AS hazard_description,
+                   r.severity,
+                   r.likelihood,
+                   r.severity * r.likelihood AS risk_score
+            FROM risks r
+            LEFT JOIN hazards hz ON hz.hazard_id = r.hazard_id
+            WHERE r.patient_id = p.patient_id
+        ) x
+    ) r ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(x ORDER BY x.created_at) AS docs FROM (
+            SELECT social_risk_id, patient_id, social_hazard_code, social_hazard_type,
+                   social_hazard_label, social_hazard_description, severity, likelihood,
+                   risk_score, notes, created_at, updated_at
+            FROM social_risks
+            WHERE patient_id = p.patient_id
+        ) x
+    ) sr ON TRUE
+    WHERE p.patient_id = :patient_id
+""")
+
+@router.get("/{patient_id}/snapshot")
+def get_patient_snapshot(patient_id: UUID, db: Session = Depends(get_db)):
+    """Identity, latest history/ADL/IADL/PRAPARE, risks and social risks in one round trip."""
+    try:
+        row = db.execute(PATIENT_SNAPSHOT_SQL, {"patient_id": str(patient_id)}).fetchone()
+    except Exception as e:
+        print("Error in get_patient_snapshot:", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    if not row:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    # Postgres already rendered the JSON; pass it through without re-encoding.
+    return Response(content=row.snapshot, media_type="application/json")
@@ -10,7 +10,11 @@ from docx import Document
 from docx.shared import Inches
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 import markdown2
-from database import get_db
+from database import get_db, get_db_with_timeout
+from negotiation import MsgPackRoute
+from responses import ORJSONResponse
+from hazard_engine import dx_hazard_rules
+from singleflight import single_flight
 from uuid import UUID as UUID_type
 from models.adl_answers import ADLAnswers
 from models.iadl_answers import IADLAnswers
@@ -18,14 +22,25 @@ from models.patient_history import PatientHistory
 from models.risk import Risk
 from models.hazards import Hazard
 
-router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+router = APIRouter(prefix="/recommendations", tags=["recommendations"], route_class=MsgPackRoute)
 logger = logging.getLogger(__name__)
 
+# Abandoned or runaway recommendation queries are cancelled rather than run to completion
+RECOMMENDATIONS_STATEMENT_TIMEOUT_MS = int(os.getenv("RECOMMENDATIONS_STATEMENT_TIMEOUT_MS", "20000"))
+get_recommendations_db = get_db_with_timeout(RECOMMENDATIONS_STATEMENT_TIMEOUT_MS)
+
 @router.get("/by_patient/{patient_id}")
-def get_recommendations(patient_id: str, db: Session = Depends(get_db)):
+def get_recommendations(patient_id: str, db: Session = Depends(get_recommendations_db)):
     """
     Get service recommendations for a patient based on their hazards and risk ratings.
     """
+    return ORJSONResponse(build_recommendations(patient_id, db))
+
+
+def build_recommendations(patient_id: str, db: Session) -> dict:
+    """
+    Build the recommendations payload; shared by the by_patient endpoint and report generation.
+    """
     try:
         try:
             uuid_obj = UUID_type(patient_id)
@@ -99,18 +114,15 @@ def get_recommendations(patient_id: str, db: Session = Depends(get_db)):
             
             # Dx
             if history.dx_codes:
-                dx_map = db.execute(text("SELECT dx_code, hazard_subclass_id, hazard_class_id FROM dx_code_hazard_map")).fetchall()
-                for code in history.dx_codes:
-                    for row in dx_map:
-                        if row[0] == code:
-                            hazard = {"type": "dx", "code": code}
-                            if row[1]:  # hazard_subclass_id
-                                hazard["hazard_subclass_id"] = row[1]
-                                hazard["hazard_code"] = row[1]
-                            elif row[2]:  # hazard_class_id
-                                hazard["hazard_class_id"] = row[2]
-                                hazard["hazard_code"] = row[2]
-                            hazards.append(hazard)
+                for code, (subclass_id, class_id) in dx_hazard_rules().match_all(history.dx_codes):
+                    hazard = {"type": "dx", "code": code}
+                    if subclass_id:
+                        hazard["hazard_subclass_id"] = subclass_id
+                        hazard["hazard_code"] = subclass_id
+                    elif class_id:
+                        hazard["hazard_class_id"] = class_id
+                        hazard["hazard_code"] = class_id
+                    hazards.append(hazard)
 
         # --- Social Hazards (from existing social_risks table) ---
         # Use existing social risks that are already processed and stored
@@ -140,7 +152,7 @@ def get_recommendations(patient_id: str, db: Session = Depends(get_db)):
         for risk, hazard in risks_query:
             # Index by the hazard_type (which matches hazard_code)
             risks_by_hazard[hazard.hazard_type] = {
-                "risk_id": str(risk.risk_id),
+                "risk_id": risk.risk_id,
                 "severity": risk.severity,
                 "likelihood": risk.likelihood,
                 "risk_score": risk.severity * risk.likelihood if risk.severity and risk.likelihood else 0,
@@ -154,7 +166,7 @@ def get_recommendations(patient_id: str, db: Session = Depends(get_db)):
             if social_risk.risk_score and social_risk.risk_score > 0:  # Only include active risks
                 # Index by social_hazard_code to match hazard lookup
                 risks_by_hazard[social_risk.social_hazard_code] = {
-                    "risk_id": str(social_risk.social_risk_id),
+                    "risk_id": social_risk.social_risk_id,
                     "severity": None,  # Social risks use direct risk_score
                     "likelihood": None,
                     "risk_score": social_risk.risk_score,
@@ -423,16 +435,21 @@ def filter_selected_recommendations(patient_id: str, recommendations: dict, db:
     return filtered_recommendations
 
 @router.post("/generate_report/{patient_id}")
-async def generate_recommendation_report(patient_id: str, db: Session = Depends(get_db)):
+def generate_recommendation_report(patient_id: str, db: Session = Depends(get_db)):
     """
     Generate and save a comprehensive recommendation report for a patient.
     Stores the report in the recommendation_report table.
     """
+    # Concurrent requests for the same patient share one report instead of saving duplicates
+    return single_flight("recommendations.generate_report", patient_id, lambda: _generate_recommendation_report(patient_id, db))
+
+
+def _generate_recommendation_report(patient_id: str, db: Session):
     try:
         logger.info(f"Starting generate_recommendation_report for patient {patient_id}")
         
         # Get recommendations data
-        recommendations = get_recommendations(patient_id, db)
+        recommendations = build_recommendations(patient_id, db)
         logger.info(f"Retrieved recommendations data with {len(recommendations.get('service_categories', []))} categories")
         
         # Filter recommendations to only include selected services
@@ -6,6 +6,8 @@ from uuid import UUID
 from models.risk import Risk
 from models.hazards import Hazard
 from database import get_db
+from hazard_engine import dx_hazard_rules
+from singleflight import single_flight
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/risk", tags=["risk"])
@@ -120,7 +122,11 @@ def auto_generate_risks(patient_id: str, db: Session = Depends(get_db)):
         uuid_obj = UUID_type(patient_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid patient_id format (must be UUID)")
+    # Concurrent calls for the same patient share one run instead of racing on inserts
+    return single_flight("risk.auto_generate", uuid_obj, lambda: _auto_generate_risks(uuid_obj, db))
 
+
+def _auto_generate_risks(uuid_obj: UUID, db: Session):
     # --- Hazard computation logic (same as /hazards/by_patient) ---
     from models.adl_answers import ADLAnswers
     from models.iadl_answers import IADLAnswers
@@ -173,14 +179,11 @@ def auto_generate_risks(patient_id: str, db: Session = Depends(get_db)):
                             hazards.append({"type": "sx", "code": code, "hazard_class_id": row[2]})
         # Dx
         if history.dx_codes:
-            dx_map = db.execute(text("SELECT dx_code, hazard_subclass_id, hazard_class_id FROM dx_code_hazard_map")).fetchall()
-            for code in history.dx_codes:
-                for row in dx_map:
-                    if row[0] == code:
-                        if row[1]:
-                            hazards.append({"type": "dx", "code": code, "hazard_subclass_id": row[1]})
-                        elif row[2]:
-                            hazards.append({"type": "dx", "code": code, "hazard_class_id": row[2]})
+            for code, (subclass_id, class_id) in dx_hazard_rules().match_all(history.dx_codes):
+                if subclass_id:
+                    hazards.append({"type": "dx", "code": code, "hazard_subclass_id": subclass_id})
+                elif class_id:
+                    hazards.append({"type": "dx", "code": code, "hazard_class_id": class_id})
         # Rx
         if history.rx_codes:
             rx_map = db.execute(text("SELECT rx_code, hazard_subclass_id, hazard_class_id FROM rx_code_hazard_map")).fetchall()
@@ -198,7 +201,7 @@ def auto_generate_risks(patient_id: str, db: Session = Depends(get_db)):
     created = []
     from models.hazards import Hazard
     
-    print(f"DEBUG: Found {len(hazards)} hazards for patient {patient_id}")
+    print(f"DEBUG: Found {len(hazards)} hazards for patient {uuid_obj}")
     for i, hz in enumerate(hazards):
         print(f"DEBUG: Processing hazard {i+1}: {hz}")
         
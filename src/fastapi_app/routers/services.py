@@ -1,72 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from database import get_db
-from typing import List, Dict, Any
+from pagination import KeysetQuery, MAX_PAGE_LIMIT, paginate
+from caching import conditional_response
+from typing import List, Dict, Any, Optional
 
 router = APIRouter(prefix="/services", tags=["services"])
 
+SERVICE_LIST_QUERY = KeysetQuery("""
+    SELECT service_id, service_name, service_category, default_frequency, description,
+           COALESCE(service_category, '') AS sort_category
+    FROM services
+""", ["sort_category", "service_name", "service_id"])
+
+COST_LIST_QUERY = KeysetQuery("""
+    SELECT 
+        c.cost_id,
+        c.amount,
+        c.billing_cycle,
+        c.payer,
+        co.contractor_id,
+        co.name as contractor_name,
+        s.service_id,
+        s.service_name,
+        s.service_category,
+        COALESCE(s.service_category, '') AS sort_category
+    FROM costs c
+    JOIN contractors co ON c.contractor_id = co.contractor_id
+    JOIN services s ON c.service_id = s.service_id
+""", ["sort_category", "service_name", "contractor_name", "cost_id"])
+
 @router.get("/")
-def get_services(db: Session = Depends(get_db)):
+def get_services(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    db: Session = Depends(get_db),
+):
     """Get all available services"""
     try:
-        services = db.execute(text("""
-            SELECT service_id, service_name, service_category, default_frequency, description 
-            FROM services 
-            ORDER BY service_category, service_name
-        """)).fetchall()
-        
-        service_list = []
-        for row in services:
-            service_list.append({
-                "service_id": str(row[0]),
-                "service_name": row[1],
-                "service_category": row[2],
-                "default_frequency": row[3],
-                "description": row[4]
-            })
-        
-        return {"services": service_list}
+        return conditional_response(
+            request, db, ["services"],
+            lambda: paginate(
+                request, db, SERVICE_LIST_QUERY,
+                lambda row: {
+                    "service_id": row.service_id,
+                    "service_name": row.service_name,
+                    "service_category": row.service_category,
+                    "default_frequency": row.default_frequency,
+                    "description": row.description
+                },
+                after=after, limit=limit, envelope="services",
+            ),
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching services: {str(e)}")
 
 @router.get("/costs")
-def get_service_costs(db: Session = Depends(get_db)):
+def get_service_costs(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    db: Session = Depends(get_db),
+):
     """Get all service costs with contractor and service details"""
     try:
-        costs = db.execute(text("""
-            SELECT 
-                c.cost_id,
-                c.amount,
-                c.billing_cycle,
-                c.payer,
-                co.contractor_id,
-                co.name as contractor_name,
-                s.service_id,
-                s.service_name,
-                s.service_category
-            FROM costs c
-            JOIN contractors co ON c.contractor_id = co.contractor_id
-            JOIN services s ON c.service_id = s.service_id
-            ORDER BY s.service_category, s.service_name, co.name
-        """)).fetchall()
-        
-        cost_list = []
-        for row in costs:
-            cost_list.append({
-                "cost_id": str(row[0]),
-                "amount": float(row[1]) if row[1] else None,
-                "billing_cycle": row[2],
-                "payer": row[3],
-                "contractor_id": str(row[4]),
-                "contractor_name": row[5],
-                "service_id": str(row[6]),
-                "service_name": row[7],
-                "service_category": row[8]
-            })
-        
-        return {"costs": cost_list}
+        return conditional_response(
+            request, db, ["costs", "contractors", "services"],
+            lambda: paginate(
+                request, db, COST_LIST_QUERY,
+                lambda row: {
+                    "cost_id": row.cost_id,
+                    "amount": row.amount,
+                    "billing_cycle": row.billing_cycle,
+                    "payer": row.payer,
+                    "contractor_id": row.contractor_id,
+                    "contractor_name": row.contractor_name,
+                    "service_id": row.service_id,
+                    "service_name": row.service_name,
+                    "service_category": row.service_category
+                },
+                after=after, limit=limit, envelope="costs",
+            ),
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching costs: {str(e)}")
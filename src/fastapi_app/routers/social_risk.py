@@ -5,6 +5,7 @@ from uuid import UUID
 
 from models.social_risk import SocialRisk
 from database import get_db
+from singleflight import single_flight
 from pydantic import BaseModel
 import requests
 import os
@@ -114,6 +115,11 @@ def auto_generate_social_risks(patient_id: str, db: Session = Depends(get_db)):
     """
     Compute social hazards for the patient and upsert a social risk for each (no likelihood/risk_score assigned).
     """
+    # Concurrent calls for the same patient share one run instead of racing on inserts
+    return single_flight("social_risk.auto_generate", patient_id, lambda: _auto_generate_social_risks(patient_id, db))
+
+
+def _auto_generate_social_risks(patient_id: str, db: Session):
     try:
         from uuid import UUID as UUID_type
         uuid_obj = UUID_type(patient_id)
@@ -0,0 +1,269 @@
+"""
+Delta sync for offline field tablets.
+
+GET /sync/changes returns every synced row (patients, assessments, risks,
+recommendation settings) changed since an opaque cursor, in one response.
+POST /sync/push applies a batch of offline edits; each edit carries the
+_version the tablet last saw so concurrent server-side changes are reported
+as conflicts instead of being overwritten.
+
+Changes are recorded by the log_sync_change trigger (see init.sql). A row's
+_version is the id of the transaction that last wrote it, and a pull only
+returns changes from transactions older than every transaction still in
+flight, so a change can never commit "behind" a cursor a tablet already holds.
+"""
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Date, DateTime, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models.adl_answers import ADLAnswers
+from models.hazards import Hazard
+from models.iadl_answers import IADLAnswers
+from models.patient_history import PatientHistory
+from models.patients import Patients
+from models.prapare_answers import PRAPAREAnswers
+from models.recommendation_settings import RecommendationSettings
+from models.risk import Risk
+from models.social_risk import SocialRisk
+from negotiation import MsgPackRoute
+from pagination import decode_cursor, encode_cursor
+from responses import ORJSONResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=MsgPackRoute)
+
+SYNC_TABLES = {
+    model.__tablename__: model.__table__
+    for model in (
+        Patients, PatientHistory, ADLAnswers, IADLAnswers, PRAPAREAnswers,
+        Hazard, Risk, SocialRisk, RecommendationSettings,
+    )
+}
+
+DEFAULT_SYNC_LIMIT = 5000
+MAX_SYNC_LIMIT = 20000
+MAX_PUSH_BATCH = 1000
+
+OPS = {"U": "upsert", "D": "delete"}
+
+
+def _pk(table):
+    return list(table.primary_key.columns)[0]
+
+
+def _row_data_sql() -> str:
+    cases = " ".join(
+        f"WHEN '{name}' THEN (SELECT to_jsonb(t) FROM {name} t WHERE t.{_pk(table).name} = c.row_id)"
+        for name, table in SYNC_TABLES.items()
+    )
+    return f"CASE c.table_name {cases} END"
+
+
+# One statement, so the horizon and the rows come from the same snapshot.
+CHANGES_SQL = """
+    SELECT h.horizon, c.*
+    FROM (SELECT txid_snapshot_xmin(txid_current_snapshot()) AS horizon) h
+    LEFT JOIN LATERAL (
+        SELECT c.table_name, c.row_id, c.op, c.txid, c.change_seq,
+               CASE WHEN c.op = 'U' THEN {row_data} END AS data
+        FROM sync_changes c
+        WHERE (c.txid, c.change_seq) > (:after_txid, :after_seq)
+          AND c.txid < h.horizon
+          AND c.table_name = ANY(:tables)
+          {patient_filter}
+        ORDER BY c.txid, c.change_seq
+        LIMIT :limit
+    ) c ON TRUE
+"""
+
+
+@router.get("/changes")
+def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_SYNC_LIMIT, ge=1, le=MAX_SYNC_LIMIT),
+    patient_id: Optional[List[UUID]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Rows changed since `since` (omit for a full sync of the caseload).
+
+    Repeat `patient_id` to limit the pull to a tablet's caseload. Keep calling
+    with the returned cursor while has_more is true.
+    """
+    after_txid, after_seq = decode_cursor(since, 2) if since else (0, 0)
+    if not isinstance(after_txid, int) or not isinstance(after_seq, int):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    try:
+        params: Dict[str, Any] = {
+            "after_txid": after_txid, "after_seq": after_seq, "limit": limit + 1,
+            # The log also holds tables kept only for analytics exports.
+            "tables": list(SYNC_TABLES),
+        }
+        patient_filter = ""
+        if patient_id:
+            patient_filter = "AND c.patient_id = ANY(:patients)"
+            params["patients"] = [str(p) for p in patient_id]
+        sql = CHANGES_SQL.format(row_data=_row_data_sql(), patient_filter=patient_filter)
+        rows = db.execute(text(sql), params).fetchall()
+
+        horizon = rows[0].horizon
+        rows = [r for r in rows if r.table_name is not None]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = [
+            {
+                "table": r.table_name,
+                "id": r.row_id,
+                "op": OPS[r.op],
+                "_version": r.txid,
+                "data": r.data,
+            }
+            for r in rows
+        ]
+        if has_more:
+            cursor = [rows[-1].txid, rows[-1].change_seq]
+        else:
+            # Everything below the horizon has been delivered; start there next time.
+            cursor = max([after_txid, after_seq], [horizon, 0])
+            if rows:
+                cursor = max(cursor, [rows[-1].txid, rows[-1].change_seq])
+        return ORJSONResponse({"changes": changes, "cursor": encode_cursor(cursor), "has_more": has_more})
+    except Exception as e:
+        print("Error in get_changes:", e)
+        raise HTTPException(status_code=500, detail=f"Error fetching changes: {str(e)}")
+
+
+class SyncEdit(BaseModel):
+    table: str
+    id: UUID
+    op: Literal["upsert", "delete"] = "upsert"
+    base_version: Optional[int] = None  # _version the tablet edited; None for rows created offline
+    data: Dict[str, Any] = {}
+
+
+class SyncPushRequest(BaseModel):
+    changes: List[SyncEdit]
+
+
+def _coerce(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, PG_UUID):
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    if isinstance(column.type, (DateTime, Date)):
+        kind = datetime if isinstance(column.type, DateTime) else date
+        if isinstance(value, kind):
+            return value
+        # fromisoformat raises TypeError for numbers; report those as invalid too
+        if not isinstance(value, str):
+            raise ValueError(f"{column.name} must be an ISO {kind.__name__} string")
+        return kind.fromisoformat(value)
+    return value
+
+
+def _values(table, data: Dict[str, Any]) -> Dict[str, Any]:
+    pk = _pk(table).name
+    values = {}
+    for key, value in data.items():
+        if key == pk or key.startswith("_"):
+            continue
+        if key not in table.columns:
+            raise ValueError(f"Unknown column {key}")
+        values[key] = _coerce(table.columns[key], value)
+    return values
+
+
+def _current(db: Session, table, row_id: UUID):
+    """Lock the row (if present) and return (data, version) as the tablet would see it."""
+    pk = _pk(table)
+    row = db.execute(
+        text(f"SELECT to_jsonb(t) AS data FROM {table.name} t WHERE t.{pk.name} = :id FOR UPDATE"),
+        {"id": str(row_id)},
+    ).first()
+    if row is None:
+        return None, None
+    version = db.execute(
+        text("SELECT txid FROM sync_changes WHERE table_name = :t AND row_id = :id"),
+        {"t": table.name, "id": str(row_id)},
+    ).scalar()
+    return row.data, version
+
+
+def _apply(db: Session, table, edit: SyncEdit) -> Optional[Dict[str, Any]]:
+    """Apply one edit; return a conflict dict instead when it cannot be applied."""
+    pk = _pk(table)
+    current, version = _current(db, table, edit.id)
+    conflict = {"table": edit.table, "id": edit.id, "server_version": version, "server_data": current}
+
+    if edit.base_version is None:
+        if current is not None:
+            return {**conflict, "reason": "exists"}
+    elif current is None:
+        return {**conflict, "reason": "deleted"}
+    elif version != edit.base_version:
+        return {**conflict, "reason": "stale"}
+
+    if edit.op == "delete":
+        if current is not None:
+            db.execute(table.delete().where(pk == edit.id))
+        return None
+
+    values = _values(table, edit.data)
+    if current is None:
+        db.execute(table.insert().values({pk.name: edit.id, **values}))
+    elif values:
+        db.execute(table.update().where(pk == edit.id).values(values))
+    return None
+
+
+@router.post("/push")
+def push_changes(batch: SyncPushRequest, db: Session = Depends(get_db)):
+    """Apply a batch of offline edits in one transaction.
+
+    Each edit is applied in its own savepoint: edits that conflict or are
+    rejected by the database are reported back and the rest still commit.
+    """
+    if len(batch.changes) > MAX_PUSH_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_PUSH_BATCH} changes per push")
+    unknown = sorted({edit.table for edit in batch.changes} - SYNC_TABLES.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Tables not synced: {', '.join(unknown)}")
+
+    applied, conflicts = [], []
+    try:
+        for edit in batch.changes:
+            table = SYNC_TABLES[edit.table]
+            savepoint = db.begin_nested()
+            try:
+                conflict = _apply(db, table, edit)
+            except ValueError as e:
+                savepoint.rollback()
+                conflicts.append({"table": edit.table, "id": edit.id, "reason": "invalid", "detail": str(e)})
+                continue
+            except (IntegrityError, DataError) as e:
+                savepoint.rollback()
+                conflicts.append({"table": edit.table, "id": edit.id, "reason": "rejected", "detail": str(e.orig)})
+                continue
+            if conflict:
+                savepoint.rollback()
+                conflicts.append(conflict)
+            else:
+                savepoint.commit()
+                applied.append({"table": edit.table, "id": edit.id, "op": edit.op})
+
+        version = db.execute(text("SELECT txid_current()")).scalar()
+        db.commit()
+        for item in applied:
+            item["_version"] = version
+        return ORJSONResponse({"applied": applied, "conflicts": conflicts})
+    except Exception as e:
+        db.rollback()
+        print("Error in push_changes:", e)
+        raise HTTPException(status_code=500, detail=f"Error applying changes: {str(e)}")
@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing for expensive per-patient computations.
+
+Concurrent callers with the same key (e.g. a double-clicked "generate
+report") share one in-flight call and its result inside a worker. Across
+workers the leader also holds a Postgres session advisory lock on the key,
+so a second worker waits for the first to finish instead of racing it on
+inserts, then runs against the rows the first one committed.
+
+A leader holds two pool connections while it runs: the advisory-lock
+connection and the request's own session (or the export's raw connection).
+Every single-flight route is in the admission "heavy" or "bulk" lane, so at
+the default concurrencies of 4 and 2 they use at most 12 of the engine's 15
+(pool_size 5 + max_overflow 10); raise the pool if you raise those limits.
+"""
+import threading
+import uuid
+from typing import Any, Callable, Dict
+
+from sqlalchemy import text
+
+from database import engine
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key at a time; concurrent callers get the same result or error."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            with advisory_lock(key):
+                call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class advisory_lock:
+    """Session-level pg_advisory_lock on a dedicated connection, released on exit."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.conn = None
+
+    def __enter__(self):
+        self.conn = engine.connect()
+        try:
+            self.conn.execute(text("SELECT pg_advisory_lock(hashtextextended(:key, 0))"), {"key": self.key})
+            # End the implicit transaction so the connection does not sit idle in one.
+            self.conn.commit()
+        except Exception:
+            self.conn.close()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.conn.execute(text("SELECT pg_advisory_unlock(hashtextextended(:key, 0))"), {"key": self.key})
+            self.conn.commit()
+        except Exception as e:
+            # Never hand a connection that may still hold the lock back to the pool.
+            print("Error in advisory_lock unlock:", e)
+            self.conn.invalidate()
+        finally:
+            self.conn.close()
+        return False
+
+
+_flights = SingleFlight()
+
+
+def flight_key(patient_id: Any) -> str:
+    """Canonical UUID text, so every spelling of one patient id shares a flight."""
+    try:
+        return str(uuid.UUID(str(patient_id)))
+    except ValueError:
+        return str(patient_id)
+
+
+def single_flight(route: str, patient_id: Any, fn: Callable[[], Any]) -> Any:
+    return _flights.do(f"{route}:{flight_key(patient_id)}", fn)
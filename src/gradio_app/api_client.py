@@ -0,0 +1,105 @@
+"""
+Shared HTTP client for the FastAPI backend.
+
+Every form goes through the one `api` instance. It is a pooled
+requests.Session, so keep-alive connections are reused across forms and
+Gradio worker threads. It adds connect/read timeouts and bounded retries
+with backoff, and logs the latency of every call. Connection failures are
+retried for any method. Read failures and 502/503/504 responses are only
+retried for idempotent methods, so a POST is never replayed once the server
+has received it.
+
+The base URL is API_URL (default http://localhost:8000), so paths are
+passed relative: api.get("/contractors").
+"""
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.getenv("API_URL", "http://localhost:8000").rstrip("/")
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+# Calls slower than this are logged as warnings, the rest at debug level
+API_SLOW_MS = float(os.getenv("API_SLOW_MS", "1000"))
+
+logger = logging.getLogger(__name__)
+
+
+class ApiClient:
+    def __init__(self, base_url=API_URL, connect_timeout=API_CONNECT_TIMEOUT,
+                 read_timeout=API_READ_TIMEOUT, retries=API_RETRIES, pool_size=API_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.25,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # url -> last 200 response carrying an ETag (for revalidating GETs)
+        self._validated = {}
+        self._lock = threading.Lock()
+
+    def url(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+        started = time.perf_counter()
+        try:
+            resp = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            logger.warning("%s %s failed after %.0f ms: %s", method, url, (time.perf_counter() - started) * 1000, e)
+            raise
+        elapsed = (time.perf_counter() - started) * 1000
+        level = logging.WARNING if elapsed >= API_SLOW_MS else logging.DEBUG
+        logger.log(level, "%s %s -> %s in %.0f ms", method, url, resp.status_code, elapsed)
+        return resp
+
+    def get(self, path, revalidate=False, **kwargs):
+        """GET; with revalidate, send If-None-Match and return the cached response on 304."""
+        if not revalidate:
+            return self.request("GET", path, **kwargs)
+        url = self.url(path)
+        with self._lock:
+            cached = self._validated.get(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached is not None:
+            headers["If-None-Match"] = cached.headers["ETag"]
+        resp = self.request("GET", url, headers=headers, **kwargs)
+        if resp.status_code == 304 and cached is not None:
+            return cached
+        if resp.status_code == 200 and resp.headers.get("ETag"):
+            with self._lock:
+                self._validated[url] = resp
+        return resp
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+
+api = ApiClient()
@@ -1,6 +1,6 @@
 import gradio as gr
-import os
-import requests
+
+from api_client import api
 from datetime import datetime
 
 adl_instructions = """
@@ -33,10 +33,7 @@ def build_adl_ui(patient_id_state, form_data_state):
                 **responses,
                 "answers": responses
             }
-            api_url = os.getenv("API_URL", "http://localhost:8000")
-            if not api_url.endswith("/adl/submit"):
-                api_url = api_url.rstrip("/") + "/adl/submit"
-            resp = requests.post(api_url, json=data)
+            resp = api.post("/adl/submit", json=data)
             if resp.ok:
                 result = resp.json()
                 if result.get("was_update"):
@@ -1,6 +1,6 @@
 import gradio as gr
-import requests
-import os
+
+from api_client import api
 from datetime import datetime
 
 IADL_INFO = {
@@ -28,10 +28,7 @@ def build_iadl_ui(patient_id_state, form_data_state):
                 **answers,
                 "answers": answers
             }
-            api_url = os.getenv("API_URL", "http://localhost:8000")
-            if not api_url.endswith("/iadl/submit"):
-                api_url = api_url.rstrip("/") + "/iadl/submit"
-            resp = requests.post(api_url, json=data)
+            resp = api.post("/iadl/submit", json=data)
             if resp.ok:
                 result = resp.json()
                 if result.get("was_update"):
@@ -1,6 +1,10 @@
 import gradio as gr
-import os
-import requests
+
+from api_client import api
+
+# url -> (etag, rows); shared by every session in this process so form builds
+# revalidate the code lists instead of converting them again.
+_code_cache = {}
 
 def build_patient_history_ui(patient_id_state, form_data_state):
     def submit_patient_history(patient_id, dx_codes, tx_codes, rx_codes, sx_codes, notes):
@@ -17,10 +21,7 @@ def build_patient_history_ui(patient_id_state, form_data_state):
                 "sx_codes": sx_list,
                 "notes": notes,
             }
-            api_url = os.getenv("API_URL", "http://localhost:8000")
-            if not api_url.endswith("/history/submit"):
-                api_url = api_url.rstrip("/") + "/history/submit"
-            resp = requests.post(api_url, json=data)
+            resp = api.post("/history/submit", json=data)
             if resp.ok:
                 result = resp.json()
                 # Update form_data_state
@@ -34,17 +35,22 @@ def build_patient_history_ui(patient_id_state, form_data_state):
             return {"status": "error", "error": str(e)}, {}
 
     def fetch_codes(endpoint):
-        api_url = os.getenv("API_URL", "http://localhost:8000")
-        url = api_url.rstrip("/") + endpoint
+        cached = _code_cache.get(endpoint)
         try:
-            resp = requests.get(url)
+            resp = api.get(endpoint, revalidate=True)
+            etag = resp.headers.get("ETag")
+            if cached and etag and cached[0] == etag:
+                return cached[1]
             if resp.ok:
                 data = resp.json()
-                return [[row['code'], row['description']] for row in data]
+                rows = [[row['code'], row['description']] for row in data]
+                if etag:
+                    _code_cache[endpoint] = (etag, rows)
+                return rows
             else:
                 return []
         except Exception:
-            return []
+            return cached[1] if cached else []
 
     def populate_fields(form_data, patient_id):
         if not isinstance(form_data, dict) or form_data is None:
@@ -1,9 +1,9 @@
 import gradio as gr
 
-import requests
-import os
 import json
 
+from api_client import api
+
 def build_patient_identity_ui(patient_id_state, form_data_state):
 
     def submit_patient(name, dob, gender, phone, email):
@@ -14,11 +14,8 @@ def build_patient_identity_ui(patient_id_state, form_data_state):
             "phone": phone,
             "email": email
         }
-        api_url = os.getenv("API_URL", "http://localhost:8000")
-        if not api_url.endswith("/patients/create"):
-            api_url = api_url.rstrip("/") + "/patients/create"
         try:
-            resp = requests.post(api_url, json=data)
+            resp = api.post("/patients/create", json=data)
             if resp.ok:
                 result = resp.json()
                 patient_id = result.get("patient_id", "")
@@ -5,14 +5,11 @@ Follows ADL/IADL form pattern with patient_id_state integration
 """
 
 import gradio as gr
-import requests
 import json
-import os
 from datetime import date
 from typing import Dict, Any, Optional, List
 
-# Get API URL from environment
-API_URL = os.getenv("API_URL", "http://localhost:8000")
+from api_client import api
 
 def build_prapare_ui(patient_id_state, form_data_state):
     """Build the PRAPARE questionnaire form interface - follows ADL/IADL pattern"""
@@ -25,8 +22,7 @@ def build_prapare_ui(patient_id_state, form_data_state):
             form_data["patient_id"] = patient_id
             
             # Submit to API
-            api_url = f"{API_URL}/prapare/submit"
-            resp = requests.post(api_url, json=form_data)
+            resp = api.post("/prapare/submit", json=form_data)
             
             if resp.ok:
                 result = resp.json()
@@ -92,9 +88,15 @@ def build_prapare_ui(patient_id_state, form_data_state):
                     ""      # notes
                 ]
             
+            # Use the PRAPARE row from the loaded patient snapshot when present
+            snapshot = (form_data or {}).get("prapare")
+            if snapshot and str(snapshot.get("patient_id")) == str(patient_id):
+                form_values = populate_form_from_data(snapshot)
+                if form_values:
+                    return form_values
+            
             # Try to get existing PRAPARE data
-            api_url = f"{API_URL}/prapare/by_patient/{patient_id}"
-            resp = requests.get(api_url)
+            resp = api.get(f"/prapare/by_patient/{patient_id}")
             
             if resp.ok and resp.status_code != 404:
                 data = resp.json()
@@ -552,14 +554,7 @@ def build_prapare_ui(patient_id_state, form_data_state):
         Submit PRAPARE form data to the backend
         Handles the new PRAPARE form structure with 23 questions
         """
-        import requests
-        import json
         from datetime import datetime
-        import os
-        
-        # Get API URL from environment or use default
-        api_url = os.getenv("API_URL", "http://localhost:8000")
-        endpoint = f"{api_url}/prapare/submit"
         
         # Prepare the data payload
         data = {
@@ -706,12 +701,7 @@ def build_prapare_ui(patient_id_state, form_data_state):
         
         try:
             # Send POST request to the backend
-            response = requests.post(
-                endpoint,
-                json=data,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+            response = api.post("/prapare/submit", json=data)
             
             if response.status_code == 200:
                 # Update form data state with the submitted data
@@ -1,8 +1,10 @@
 import gradio as gr
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 
+from api_client import api
+
 def create_recommendations_ui(patient_id_state: gr.State):
     """Create Service Recommendations UI with risk dashboard and hazard-to-service mapping"""
     
@@ -228,105 +230,116 @@ def create_recommendations_ui(patient_id_state: gr.State):
                 gr.update(value="Please select a patient first", visible=True)
             )
         
-        api_url = "http://care_fastapi:8000"
-        clinical_risk = 0
-        clinical_hazards = 0
+        def fetch_clinical_risk():
+            """Average clinical risk and hazard count (auto-generating risks on 404)"""
+            clinical_risk = 0
+            clinical_hazards = 0
         
-        try:
-            # Fetch clinical risks
-            resp = requests.get(f"{api_url}/risk/by_patient/{patient_id}")
-            if resp.ok:
-                clinical_data = resp.json()
-                print(f"DEBUG: Clinical risks response: {clinical_data}")
+            try:
+                # Fetch clinical risks
+                resp = api.get(f"/risk/by_patient/{patient_id}")
+                if resp.ok:
+                    clinical_data = resp.json()
+                    print(f"DEBUG: Clinical risks response: {clinical_data}")
                 
-                # Handle list of clinical risks
-                if isinstance(clinical_data, list):
-                    clinical_risks = [r for r in clinical_data if r.get('risk_score', 0) > 0]
-                    if clinical_risks:
-                        clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks)
-                        clinical_hazards = len(clinical_risks)
-                    else:
-                        clinical_risk = 0
-                        clinical_hazards = len(clinical_data)
-                # Handle object with risks array
-                else:
-                    clinical_risks = clinical_data.get('risks', [])
-                    if clinical_risks:
-                        clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks) if clinical_risks else 0
-                    clinical_hazards = len(clinical_risks)
-                print(f"DEBUG: Calculated clinical_risk={clinical_risk}, hazards={clinical_hazards}")
-            elif resp.status_code == 404:
-                # No clinical risks found - try auto-generation
-                print(f"DEBUG: No clinical risks found, attempting auto-generation...")
-                gen_resp = requests.post(f"{api_url}/risk/auto_generate/{patient_id}")
-                if gen_resp.ok:
-                    print(f"DEBUG: Auto-generated clinical risks successfully")
-                    # Retry fetching after generation
-                    resp = requests.get(f"{api_url}/risk/by_patient/{patient_id}")
-                    if resp.ok:
-                        clinical_data = resp.json()
-                        if isinstance(clinical_data, list):
-                            clinical_risks = [r for r in clinical_data if r.get('risk_score', 0) > 0]
-                            if clinical_risks:
-                                clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks)
+                    # Handle list of clinical risks
+                    if isinstance(clinical_data, list):
+                        clinical_risks = [r for r in clinical_data if r.get('risk_score', 0) > 0]
+                        if clinical_risks:
+                            clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks)
+                            clinical_hazards = len(clinical_risks)
+                        else:
+                            clinical_risk = 0
                             clinical_hazards = len(clinical_data)
-        except Exception as e:
-            print(f"DEBUG: Clinical risk fetch error: {e}")
-            
-        # Fetch social risks (PRAPARE)
-        social_risk = 0
-        social_hazards = 0
-        try:
-            resp = requests.get(f"{api_url}/social_risk/by_patient/{patient_id}")
-            if resp.ok:
-                social_data = resp.json()
-                print(f"DEBUG: Social risks response: {social_data}")
-                
-                # Handle API response format: {"social_risks": [...], "total": count}
-                if isinstance(social_data, dict) and 'social_risks' in social_data:
-                    social_risks_list = social_data.get('social_risks', [])
-                    social_risks = [r for r in social_risks_list if r.get('risk_score', 0) > 0]
-                    if social_risks:
-                        social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
-                        social_hazards = len(social_risks)
+                    # Handle object with risks array
                     else:
-                        social_risk = 0
-                        social_hazards = len(social_risks_list)
-                # Handle legacy list format
-                elif isinstance(social_data, list):
-                    social_risks = [r for r in social_data if r.get('risk_score', 0) > 0]
-                    if social_risks:
-                        social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
-                        social_hazards = len(social_risks)
-                # Handle object with composite score
-                else:
-                    social_risk = social_data.get('composite_score', 0)
-                    social_hazards = len(social_data.get('hazards', []))
+                        clinical_risks = clinical_data.get('risks', [])
+                        if clinical_risks:
+                            clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks) if clinical_risks else 0
+                        clinical_hazards = len(clinical_risks)
+                    print(f"DEBUG: Calculated clinical_risk={clinical_risk}, hazards={clinical_hazards}")
+                elif resp.status_code == 404:
+                    # No clinical risks found - try auto-generation
+                    print(f"DEBUG: No clinical risks found, attempting auto-generation...")
+                    gen_resp = api.post(f"/risk/auto_generate/{patient_id}")
+                    if gen_resp.ok:
+                        print(f"DEBUG: Auto-generated clinical risks successfully")
+                        # Retry fetching after generation
+                        resp = api.get(f"/risk/by_patient/{patient_id}")
+                        if resp.ok:
+                            clinical_data = resp.json()
+                            if isinstance(clinical_data, list):
+                                clinical_risks = [r for r in clinical_data if r.get('risk_score', 0) > 0]
+                                if clinical_risks:
+                                    clinical_risk = sum(r.get('risk_score', 0) for r in clinical_risks) / len(clinical_risks)
+                                clinical_hazards = len(clinical_data)
+            except Exception as e:
+                print(f"DEBUG: Clinical risk fetch error: {e}")
+            return clinical_risk, clinical_hazards
+        
+        def fetch_social_risk():
+            """Average social risk and hazard count (auto-generating risks on 404)"""
+            social_risk = 0
+            social_hazards = 0
+            try:
+                resp = api.get(f"/social_risk/by_patient/{patient_id}")
+                if resp.ok:
+                    social_data = resp.json()
+                    print(f"DEBUG: Social risks response: {social_data}")
                 
-                print(f"DEBUG: Calculated social_risk={social_risk}, hazards={social_hazards}")
-            elif resp.status_code == 404:
-                # No social risks found - try auto-generation
-                print(f"DEBUG: No social risks found, attempting auto-generation...")
-                gen_resp = requests.post(f"{api_url}/social_risk/auto_generate/{patient_id}")
-                if gen_resp.ok:
-                    print(f"DEBUG: Auto-generated social risks successfully")
-                    # Retry fetching after generation
-                    resp = requests.get(f"{api_url}/social_risk/by_patient/{patient_id}")
-                    if resp.ok:
-                        social_data = resp.json()
-                        if isinstance(social_data, dict) and 'social_risks' in social_data:
-                            social_risks_list = social_data.get('social_risks', [])
-                            social_risks = [r for r in social_risks_list if r.get('risk_score', 0) > 0]
-                            if social_risks:
-                                social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
+                    # Handle API response format: {"social_risks": [...], "total": count}
+                    if isinstance(social_data, dict) and 'social_risks' in social_data:
+                        social_risks_list = social_data.get('social_risks', [])
+                        social_risks = [r for r in social_risks_list if r.get('risk_score', 0) > 0]
+                        if social_risks:
+                            social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
+                            social_hazards = len(social_risks)
+                        else:
+                            social_risk = 0
                             social_hazards = len(social_risks_list)
-                        elif isinstance(social_data, list):
-                            social_risks = [r for r in social_data if r.get('risk_score', 0) > 0]
-                            if social_risks:
-                                social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
-                            social_hazards = len(social_data)
-        except Exception as e:
-            print(f"DEBUG: Social risk fetch error: {e}")
+                    # Handle legacy list format
+                    elif isinstance(social_data, list):
+                        social_risks = [r for r in social_data if r.get('risk_score', 0) > 0]
+                        if social_risks:
+                            social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
+                            social_hazards = len(social_risks)
+                    # Handle object with composite score
+                    else:
+                        social_risk = social_data.get('composite_score', 0)
+                        social_hazards = len(social_data.get('hazards', []))
+                
+                    print(f"DEBUG: Calculated social_risk={social_risk}, hazards={social_hazards}")
+                elif resp.status_code == 404:
+                    # No social risks found - try auto-generation
+                    print(f"DEBUG: No social risks found, attempting auto-generation...")
+                    gen_resp = api.post(f"/social_risk/auto_generate/{patient_id}")
+                    if gen_resp.ok:
+                        print(f"DEBUG: Auto-generated social risks successfully")
+                        # Retry fetching after generation
+                        resp = api.get(f"/social_risk/by_patient/{patient_id}")
+                        if resp.ok:
+                            social_data = resp.json()
+                            if isinstance(social_data, dict) and 'social_risks' in social_data:
+                                social_risks_list = social_data.get('social_risks', [])
+                                social_risks = [r for r in social_risks_list if r.get('risk_score', 0) > 0]
+                                if social_risks:
+                                    social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
+                                social_hazards = len(social_risks_list)
+                            elif isinstance(social_data, list):
+                                social_risks = [r for r in social_data if r.get('risk_score', 0) > 0]
+                                if social_risks:
+                                    social_risk = sum(r.get('risk_score', 0) for r in social_risks) / len(social_risks)
+                                social_hazards = len(social_data)
+            except Exception as e:
+                print(f"DEBUG: Social risk fetch error: {e}")
+            return social_risk, social_hazards
+        
+        # The clinical and social branches are independent, so fetch them in parallel
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            clinical_future = pool.submit(fetch_clinical_risk)
+            social_future = pool.submit(fetch_social_risk)
+            clinical_risk, clinical_hazards = clinical_future.result()
+            social_risk, social_hazards = social_future.result()
         
         # Calculate composite risk and urgency
         total_hazards_count = clinical_hazards + social_hazards
@@ -362,23 +375,28 @@ def create_recommendations_ui(patient_id_state: gr.State):
             return [gr.update(visible=False)] * 450 + [gr.update(value="Please select a patient first", visible=True)]
         
         try:
-            # Load contractors for clinical risks
-            contractors_response = requests.get("http://care_fastapi:8000/contractors")
+            # Contractors (clinical), community resources (social) and the
+            # recommendations themselves are independent; fetch them together
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                contractors_future = pool.submit(api.get, "/contractors", revalidate=True)
+                community_future = pool.submit(api.get, "/community_resources", revalidate=True)
+                recommendations_future = pool.submit(api.get, f"/recommendations/by_patient/{patient_id}")
+                contractors_response = contractors_future.result()
+                community_response = community_future.result()
+                response = recommendations_future.result()
+            
+            # Contractors for clinical risks
             contractors = []
             if contractors_response.status_code == 200:
                 contractor_data = contractors_response.json()
                 contractors = [c["name"] for c in contractor_data.get("contractors", [])]
             
-            # Load community resources for social risks
-            community_response = requests.get("http://care_fastapi:8000/community_resources")
+            # Community resources for social risks
             community_resources = []
             if community_response.status_code == 200:
                 community_data = community_response.json()
                 community_resources = [r["name"] for r in community_data.get("resources", [])]
             
-            # Load recommendations
-            response = requests.get(f"http://care_fastapi:8000/recommendations/by_patient/{patient_id}")
-            
             if response.status_code != 200:
                 return [gr.update(visible=False)] * 450 + [gr.update(value=f"Error loading recommendations: {response.text}", visible=True)]
             
@@ -540,8 +558,7 @@ def create_recommendations_ui(patient_id_state: gr.State):
             
             # Call backend API to save recommendations
             if recommendations:
-                api_url = "http://care_fastapi:8000"
-                response = requests.post(f"{api_url}/recommendations/save", json={
+                response = api.post("/recommendations/save", json={
                     "patient_id": patient_id,
                     "recommendations": recommendations
                 })
@@ -563,7 +580,7 @@ def create_recommendations_ui(patient_id_state: gr.State):
             return gr.update(value="Please select a patient first", visible=True)
         
         try:
-            response = requests.post(f"http://care_fastapi:8000/recommendations/generate_report/{patient_id}")
+            response = api.post(f"/recommendations/generate_report/{patient_id}")
             
             if response.status_code == 200:
                 return gr.update(value="✅ Report generated successfully! Report content saved to database.", visible=True)
@@ -1,6 +1,6 @@
 import gradio as gr
-import requests
-import os
+
+from api_client import api
 
 def risk_ui(patient_id_state, form_data_state):
     """Static Risk Management UI - 20 predefined risk rows"""
@@ -116,10 +116,9 @@ def build_risk_ui(patient_id_state, form_data_state):
                 status = "No patient selected"
                 return (*risk_ids, *hazards, *severities, *likelihoods, *risk_scores, *notes_list, status)
             
-            api_url = os.getenv("API_URL", "http://localhost:8000").rstrip("/")
             try:
                 # First, get all patient hazards
-                hazards_resp = requests.get(f"{api_url}/hazards/by_patient/{patient_id}")
+                hazards_resp = api.get(f"/hazards/by_patient/{patient_id}")
                 if not hazards_resp.ok:
                     risk_ids = [""] * 20
                     hazards = [""] * 20
@@ -133,7 +132,7 @@ def build_risk_ui(patient_id_state, form_data_state):
                 patient_hazards = hazards_resp.json().get("hazards", [])
                 
                 # Then, get any existing risk ratings
-                risks_resp = requests.get(f"{api_url}/risk/by_patient/{patient_id}")
+                risks_resp = api.get(f"/risk/by_patient/{patient_id}")
                 existing_risks = {}
                 if risks_resp.ok:
                     try:
@@ -217,9 +216,8 @@ def build_risk_ui(patient_id_state, form_data_state):
                 status = "No patient selected"
                 return (*risk_ids, *hazards, *severities, *likelihoods, *risk_scores, *notes_list, status)
             
-            api_url = os.getenv("API_URL", "http://localhost:8000").rstrip("/")
             try:
-                resp = requests.post(f"{api_url}/risk/auto_generate/{patient_id}")
+                resp = api.post(f"/risk/auto_generate/{patient_id}")
                 if resp.ok:
                     # Fetch the newly generated risks
                     return populate_risks(patient_id)
@@ -255,7 +253,6 @@ def build_risk_ui(patient_id_state, form_data_state):
             risk_scores = all_inputs[80:100]
             notes_list = all_inputs[100:120]
             
-            api_url = os.getenv("API_URL", "http://localhost:8000").rstrip("/")
             saved_count = 0
             
             for i in range(20):
@@ -282,7 +279,7 @@ def build_risk_ui(patient_id_state, form_data_state):
                     
                     if risk_id:
                         print(f"Updating existing risk {risk_id}")
-                        resp = requests.post(f"{api_url}/risk/update/{risk_id}", json=payload)
+                        resp = api.post(f"/risk/update/{risk_id}", json=payload)
                         
                         if resp.ok:
                             saved_count += 1
@@ -1,6 +1,6 @@
 import gradio as gr
-import requests
-import os
+
+from api_client import api
 
 def social_risk_ui(patient_id_state, form_data_state):
     """Social Risk Management UI - 20 predefined social risk rows"""
@@ -91,15 +91,14 @@ def build_social_risk_ui(patient_id_state, form_data_state):
                         empty_values.extend(["", "", None, None, None, ""])
                     return "❌ No patient selected", {}, *empty_values
                 
-                api_url = os.getenv("API_URL", "http://localhost:8000")
-                resp = requests.post(f"{api_url}/social_risk/auto_generate/{patient_id}")
+                resp = api.post(f"/social_risk/auto_generate/{patient_id}")
                 
                 if resp.ok:
                     result = resp.json()
                     status_msg = f"✅ Generated {result['created']} new social risks, updated {result['updated']} existing ones from {result['total_hazards']} social hazards"
                     
                     # Fetch updated social risks
-                    resp2 = requests.get(f"{api_url}/social_risk/by_patient/{patient_id}")
+                    resp2 = api.get(f"/social_risk/by_patient/{patient_id}")
                     if resp2.ok:
                         risks_data = resp2.json()
                         social_risks = risks_data.get("social_risks", [])
@@ -148,7 +147,6 @@ def build_social_risk_ui(patient_id_state, form_data_state):
                 if not patient_id:
                     return "❌ No patient selected", {}
                 
-                api_url = os.getenv("API_URL", "http://localhost:8000")
                 saved_count = 0
                 
                 # Process each row (6 fields per row)
@@ -178,7 +176,7 @@ def build_social_risk_ui(patient_id_state, form_data_state):
                         "notes": notes or ""
                     }
                     
-                    resp = requests.post(f"{api_url}/social_risk/update/{social_risk_id}", json=update_data)
+                    resp = api.post(f"/social_risk/update/{social_risk_id}", json=update_data)
                     if resp.ok:
                         saved_count += 1
                     else:
@@ -203,12 +201,15 @@ def build_social_risk_ui(patient_id_state, form_data_state):
                         empty_values.extend(["", "", None, None, None, ""])
                     return tuple(empty_values)
                 
-                api_url = os.getenv("API_URL", "http://localhost:8000")
-                resp = requests.get(f"{api_url}/social_risk/by_patient/{patient_id}")
+                # Prefer social risks from the loaded patient snapshot
+                form_data = form_data or {}
+                if "social_risks" in form_data and str(form_data.get("patient_id")) == str(patient_id):
+                    social_risks = form_data["social_risks"]
+                else:
+                    resp = api.get(f"/social_risk/by_patient/{patient_id}")
+                    social_risks = resp.json().get("social_risks", []) if resp.ok else None
                 
-                if resp.ok:
-                    risks_data = resp.json()
-                    social_risks = risks_data.get("social_risks", [])
+                if social_risks is not None:
                     
                     outputs = []
                     for i in range(20):
@@ -13,8 +13,8 @@ from forms.prapare import build_prapare_ui
 
 from forms.social_risk_gradio_ui import social_risk_ui
 
-import requests
-import os
+
+from api_client import api
 
 def build_forms_menu():
     with gr.Blocks() as menu:
@@ -81,36 +81,17 @@ def build_forms_menu():
             outputs=[patient_id_box, form_data_state, patient_id_state]
         )
 
-        # Load Client logic: fetch all data from backend and populate states
+        # Load Client logic: fetch the patient snapshot (identity, history, ADL,
+        # IADL, PRAPARE, risks, social risks) in one request and populate states
         def load_client(patient_id):
-            api_url = os.getenv("API_URL", "http://localhost:8000")
             result = {"patient_id": patient_id}
-            # Fetch patient
-            try:
-                resp = requests.get(f"{api_url}/patients/{patient_id}")
-                if resp.ok:
-                    result["identity"] = resp.json()
-            except Exception:
-                pass
-            # Fetch history
-            try:
-                resp = requests.get(f"{api_url}/history/by_patient/{patient_id}")
-                if resp.ok:
-                    result["history"] = resp.json()
-            except Exception:
-                pass
-            # Fetch ADL
-            try:
-                resp = requests.get(f"{api_url}/adl/by_patient/{patient_id}")
-                if resp.ok:
-                    result["adl"] = resp.json()
-            except Exception:
-                pass
-            # Fetch IADL
             try:
-                resp = requests.get(f"{api_url}/iadl/by_patient/{patient_id}")
+                resp = api.get(f"/patients/{patient_id}/snapshot")
                 if resp.ok:
-                    result["iadl"] = resp.json()
+                    snapshot = resp.json()
+                    for section in ("identity", "history", "adl", "iadl", "prapare", "risks", "social_risks"):
+                        if snapshot.get(section) is not None:
+                            result[section] = snapshot[section]
             except Exception:
                 pass
             return patient_id, result, patient_id